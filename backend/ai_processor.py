@@ -1,5 +1,9 @@
 import os
-import pdfplumber
+import json
+import time
+import hashlib
+import logging
+import threading
 from docx import Document
 import pytesseract
 from PIL import Image
@@ -16,6 +20,24 @@ import re
 from rapidfuzz import fuzz, process
 from collections import Counter
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import multiprocessing
+import zipfile
+from pdf_engines import extract_pdf_pages, is_scanned_page, render_pdf_page
+from docx_stream import extract_docx_text
+from experience_extractor import extract_experience_entries
+
+# Version of the extract_text / extract_structured_data output. Bump it whenever
+# parsing changes so stored parse results (see parse_cache.py) are not reused.
+PARSER_VERSION = "4"
+
+# Version of the rank_resumes scoring formula. Bump it whenever scoring changes so
+# stored scores (resumes.score_fingerprint) are recomputed on the next ranking run.
+SCORING_VERSION = "2"
+
+# Component scores rank_resumes combines, and their default weights - skills matter most
+SCORE_COMPONENTS = ("skills", "semantic", "experience", "education")
+DEFAULT_WEIGHTS = {"skills": 0.45, "semantic": 0.30, "experience": 0.20, "education": 0.05}
 
 # Load spaCy model (singleton pattern)
 _nlp_model = None
@@ -32,6 +54,64 @@ def get_nlp_model():
             _nlp_model = None
     return _nlp_model
 
+# Engine for the semantic component: "transformer" (SentenceTransformer embeddings, EMBEDDING_MODEL)
+# or "tfidf" (hashed term vectors with sparse cosine similarity; no model weights, thousands of resumes/s)
+SEMANTIC_BACKEND = os.getenv("SEMANTIC_BACKEND", "transformer").lower()
+TFIDF_FEATURES = 2 ** 18
+
+# Load SentenceTransformer models once per process (loading takes seconds and hundreds of MB)
+_sentence_models = {}
+_sentence_models_lock = threading.Lock()
+
+def get_sentence_model(model_name=None):
+    """Return the shared SentenceTransformer for model_name (default: EMBEDDING_MODEL); raises if it cannot load."""
+    model_name = model_name or os.getenv('EMBEDDING_MODEL', 'all-MiniLM-L6-v2')
+    with _sentence_models_lock:
+        if model_name not in _sentence_models:
+            from sentence_transformers import SentenceTransformer
+            _sentence_models[model_name] = SentenceTransformer(model_name)
+        return _sentence_models[model_name]
+
+def semantic_model_name():
+    """Identity of the configured semantic engine, for scoring fingerprints and the embedding cache."""
+    if SEMANTIC_BACKEND == "tfidf":
+        return f"tfidf-hashing-{TFIDF_FEATURES}"
+    return os.getenv('EMBEDDING_MODEL', 'all-MiniLM-L6-v2')
+
+
+_hashing_vectorizer = None
+
+def _get_hashing_vectorizer():
+    global _hashing_vectorizer
+    if _hashing_vectorizer is None:
+        from sklearn.feature_extraction.text import HashingVectorizer
+        # Stateless (no vocabulary or IDF fitted to a batch), so scores from different
+        # pages, shards and runs are comparable; raw counts are damped in tfidf_similarities
+        _hashing_vectorizer = HashingVectorizer(
+            n_features=TFIDF_FEATURES, ngram_range=(1, 2), stop_words="english",
+            alternate_sign=False, norm=None, dtype=np.float32,
+        )
+    return _hashing_vectorizer
+
+
+def tfidf_similarities(query_text, texts):
+    """
+    Cosine similarity of each text to query_text over hashed unigram and bigram term vectors.
+
+    Term counts are log-scaled (sublinear tf) and the vectors L2-normalised, so the whole
+    batch is scored with one sparse matrix-vector product.
+
+    Returns:
+        numpy array of similarities in [0, 1], one per text
+    """
+    from sklearn.preprocessing import normalize
+    vectorizer = _get_hashing_vectorizer()
+    matrix = vectorizer.transform(list(texts) + [query_text]).tocsr()
+    np.log1p(matrix.data, out=matrix.data)
+    matrix = normalize(matrix, copy=False)
+    return np.asarray((matrix[:-1] @ matrix[-1].T).todense()).ravel()
+
+
 def extract_skills_from_text(text, use_fuzzy=True):
     """
     Extract skills and requirements from text using advanced NLP and fuzzy matching.
@@ -144,46 +224,186 @@ def extract_skills_from_text(text, use_fuzzy=True):
     
     return result if result else []
 
+# OCR budgets for scanned PDF pages
+OCR_DPI = min(int(os.getenv("OCR_DPI", "200")), 400)
+OCR_MAX_PAGES = int(os.getenv("OCR_MAX_PAGES", "5"))
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+def _binarize(img):
+    return cv2.threshold(img, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)[1]
+
 def preprocess_image(file_path):
     img = cv2.imread(file_path, cv2.IMREAD_GRAYSCALE)
-    img = cv2.threshold(img, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)[1]
-    return img
+    return _binarize(img)
+
+def _ocr_pdf_page(args):
+    """Rasterise one PDF page and OCR it. Runs in a worker process."""
+    file_path, page_index, dpi = args
+    img = _binarize(np.array(render_pdf_page(file_path, page_index, dpi)))
+    return pytesseract.image_to_string(Image.fromarray(img))
+
+def ocr_scanned_pages(file_path, pages, stats=None):
+    """
+    OCR the pages of a PDF that have no text layer, in parallel worker processes.
+
+    Only the first OCR_MAX_PAGES scanned pages are rasterised (at OCR_DPI), so a
+    long image-only upload cannot monopolise the workers. Digital pages are untouched.
+
+    Args:
+        file_path: Path to the PDF file
+        pages: Per-page texts from the text engine (updated in place)
+        stats: Optional dict that receives OCR page counts and timing
+
+    Returns:
+        The pages list with OCR text filled in for scanned pages
+    """
+    scanned = [i for i, page_text in enumerate(pages) if is_scanned_page(page_text)]
+    if not scanned:
+        return pages
+
+    started = time.perf_counter()
+    budgeted = scanned[:OCR_MAX_PAGES]
+    jobs = [(file_path, i, OCR_DPI) for i in budgeted]
+    try:
+        if len(jobs) == 1 or OCR_WORKERS <= 1:
+            results = [_ocr_pdf_page(job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=min(OCR_WORKERS, len(jobs))) as pool:
+                results = list(pool.map(_ocr_pdf_page, jobs))
+        for i, ocr_text in zip(budgeted, results):
+            pages[i] = ocr_text or ""
+    except Exception as e:
+        logging.warning(f"[EXTRACT] OCR of scanned pages failed for {file_path}: {e}")
 
-def extract_text(file_path, file_type):
+    elapsed_ms = round((time.perf_counter() - started) * 1000, 2)
+    logging.info(f"[EXTRACT] OCR scanned_pages={len(scanned)} ocr_pages={len(budgeted)} dpi={OCR_DPI} elapsed_ms={elapsed_ms}")
+    if stats is not None:
+        stats.update({
+            "ocr_pages": len(budgeted),
+            "ocr_skipped_pages": len(scanned) - len(budgeted),
+            "ocr_elapsed_ms": elapsed_ms,
+        })
+    return pages
+
+def extract_text(file_path, file_type, stats=None):
+    """
+    Extract plain text from an uploaded resume.
+
+    Args:
+        file_path: Path to the resume on disk
+        file_type: MIME type of the upload
+        stats: Optional dict that receives the engine used and elapsed time,
+            so extraction cost can be measured across the real upload mix
+
+    Returns:
+        Extracted text
+    """
+    started = time.perf_counter()
+    if stats is None:
+        stats = {}
     if file_type == "application/pdf":
-        with pdfplumber.open(file_path) as pdf:
-            text = "".join(page.extract_text() for page in pdf.pages)
+        pages = extract_pdf_pages(file_path, stats=stats)
+        pages = ocr_scanned_pages(file_path, pages, stats=stats)
+        text = "\n".join(pages)
     elif file_type in ["application/msword", "application/vnd.openxmlformats-officedocument.wordprocessingml.document"]:
-        doc = Document(file_path)
-        text = "".join(paragraph.text for paragraph in doc.paragraphs)
+        if zipfile.is_zipfile(file_path):
+            # Streaming reader: low memory, and keeps tables, text boxes, headers and footers
+            text = extract_docx_text(file_path)
+            stats["engine"] = "docx-stream"
+        else:
+            doc = Document(file_path)
+            text = "\n".join(paragraph.text for paragraph in doc.paragraphs)
+            stats["engine"] = "python-docx"
     elif file_type in ["image/png", "image/jpeg"]:
         img = preprocess_image(file_path)
         text = pytesseract.image_to_string(Image.fromarray(img))
+        stats["engine"] = "tesseract"
     else:
         raise ValueError("Unsupported file type")
+    stats["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    logging.info(f"[EXTRACT] file_type={file_type} engine={stats.get('engine')} chars={len(text)} elapsed_ms={stats['elapsed_ms']}")
     return text
 
+# Precompiled patterns for extract_structured_data (compiled once at import)
+_SKILL_NOISE_YEARS = re.compile(r'\d+\s*(?:year|yr)')
+_SKILL_NOISE_DEGREE = re.compile(r'bachelor|master|phd|b\.tech|m\.tech')
+
+# Pattern 2: total years of experience mentioned
+_YEARS_PATTERNS = [
+    re.compile(r'(\d+)\+?\s*(?:years?|yrs?)\s+(?:of\s+)?(?:experience|exp)'),
+    re.compile(r'experience[:\s]+(\d+)\+?\s*(?:years?|yrs?)'),
+    re.compile(r'total[:\s]+(\d+)\+?\s*(?:years?|yrs?)'),
+]
+
+_DEGREE_PATTERN = re.compile(
+    r'(bachelor\'?s?(?:\s+(?:of\s+)?(?:science|arts|engineering|technology))?|'
+    r'master\'?s?(?:\s+(?:of\s+)?(?:science|arts|engineering|technology|business administration))?|'
+    r'phd|doctorate|mba|b\.?tech|m\.?tech|b\.?sc|m\.?sc|b\.?e|m\.?e|b\.?a|m\.?a)'
+)
+
+_JOB_TITLE_PATTERN = re.compile(
+    r'\b((?:senior|junior|lead|principal|staff)?\s*(?:software|data|machine learning|frontend|backend|fullstack|full stack)?\s*(?:engineer|developer|scientist|analyst|manager|consultant|designer|architect|programmer|intern|trainee))\b'
+)
+
+# Section headings recognised by segment_resume_sections (matched on the whole line)
+_SECTION_ALIASES = {
+    "experience": ["experience", "work experience", "professional experience", "employment",
+                   "employment history", "work history", "career history", "internships", "internship"],
+    "education": ["education", "academic background", "academics", "educational qualifications",
+                  "academic qualifications", "qualifications"],
+    "skills": ["skills", "technical skills", "key skills", "core competencies", "technologies", "skills & tools"],
+    "projects": ["projects", "personal projects", "academic projects", "key projects"],
+}
+_HEADING_LOOKUP = {alias: section for section, aliases in _SECTION_ALIASES.items() for alias in aliases}
+_HEADING_NOISE = re.compile(r'[^a-z& ]+')
+_MAX_HEADING_LENGTH = max(len(alias) for alias in _HEADING_LOOKUP)
+
+def segment_resume_sections(text):
+    """
+    Split resume text into sections in one linear pass over its lines.
+
+    A line counts as a heading when, lowercased and stripped of punctuation, it is
+    one of the known section names (e.g. "WORK EXPERIENCE:", "Education").
+    Text before the first heading goes to "summary".
+
+    Returns:
+        Dict of section name ("summary", "experience", "education", "skills", "projects") to text
+    """
+    sections = {}
+    current = "summary"
+    for line in text.splitlines():
+        if len(line) <= _MAX_HEADING_LENGTH + 10:
+            key = _HEADING_NOISE.sub("", line.lower()).strip()
+            section = _HEADING_LOOKUP.get(key)
+            if section:
+                current = section
+                sections.setdefault(current, [])
+                continue
+        sections.setdefault(current, []).append(line)
+    return {name: "\n".join(lines) for name, lines in sections.items()}
+
 def extract_structured_data(text):
     # Extract skills using NLP/keyword matching
     skills = extract_skills_from_text(text)
     
     # Remove year/degree entries from skills (they were added by extract_skills_from_text)
-    skills = [s for s in skills if not re.search(r'\d+\s*(?:year|yr)', s.lower()) and not re.search(r'bachelor|master|phd|b\.tech|m\.tech', s.lower())]
+    skills = [s for s in skills if not _SKILL_NOISE_YEARS.search(s.lower()) and not _SKILL_NOISE_DEGREE.search(s.lower())]
+
+    # Run each pattern only on the section it belongs to; fall back to the
+    # whole text when the resume has no recognisable heading for it
+    sections = segment_resume_sections(text)
+    experience_text = sections.get("experience") or text
+    education_text = sections.get("education") or text
+    if len(sections) > 1:
+        years_text = "\n".join(v for k, v in sections.items() if k not in ("education", "skills"))
+    else:
+        years_text = text
 
     # Extract experience entries with enhanced patterns
     experience = []
-    text_lower = text.lower()
-    
-    # Pattern 1: "Title at Company (dates)" or "Title, Company dates"
-    exp_pattern1 = re.findall(
-        r'([\w\s]+(?:engineer|developer|manager|analyst|scientist|consultant|designer|architect|specialist|lead|director|coordinator|intern|associate|administrator))'
-        r'\s+(?:at|@|,|-|\|)\s+'
-        r'([\w\s\-&\.]+?)'
-        r'(?:\s*[\(\[]?\s*(?:(\d{4})\s*[-–—to]+\s*(\d{4}|present|current))?[\)\]]?)?',
-        text, re.IGNORECASE
-    )
     
-    for match in exp_pattern1:
+    # Pattern 1: "Title at Company (dates)" or "Title, Company dates" (linear-time state machine)
+    for match in extract_experience_entries(experience_text):
         role = match[0].strip()
         company = match[1].strip()
         start_year = match[2] if len(match) > 2 else None
@@ -209,15 +429,10 @@ def extract_structured_data(text):
             experience.append(exp_entry)
     
     # Pattern 2: Extract total years of experience mentioned
-    years_patterns = [
-        r'(\d+)\+?\s*(?:years?|yrs?)\s+(?:of\s+)?(?:experience|exp)',
-        r'experience[:\s]+(\d+)\+?\s*(?:years?|yrs?)',
-        r'total[:\s]+(\d+)\+?\s*(?:years?|yrs?)'
-    ]
-    
+    years_text_lower = years_text.lower()
     total_years = 0
-    for pattern in years_patterns:
-        matches = re.findall(pattern, text_lower)
+    for pattern in _YEARS_PATTERNS:
+        matches = pattern.findall(years_text_lower)
         if matches:
             total_years = max([int(m) for m in matches] + [total_years])
     
@@ -229,12 +444,7 @@ def extract_structured_data(text):
 
     # Extract education entries with enhanced patterns
     education = []
-    degree_patterns = re.findall(
-        r'(bachelor\'?s?(?:\s+(?:of\s+)?(?:science|arts|engineering|technology))?|'
-        r'master\'?s?(?:\s+(?:of\s+)?(?:science|arts|engineering|technology|business administration))?|'
-        r'phd|doctorate|mba|b\.?tech|m\.?tech|b\.?sc|m\.?sc|b\.?e|m\.?e|b\.?a|m\.?a)',
-        text.lower()
-    )
+    degree_patterns = _DEGREE_PATTERN.findall(education_text.lower())
     
     for degree in degree_patterns:
         degree_clean = degree.strip()
@@ -251,8 +461,7 @@ def extract_structured_data(text):
 
     # If no structured experience found, extract job titles
     if not experience:
-        job_title_pattern = r'\b((?:senior|junior|lead|principal|staff)?\s*(?:software|data|machine learning|frontend|backend|fullstack|full stack)?\s*(?:engineer|developer|scientist|analyst|manager|consultant|designer|architect|programmer|intern|trainee))\b'
-        job_titles = re.findall(job_title_pattern, text_lower)
+        job_titles = _JOB_TITLE_PATTERN.findall(experience_text.lower())
         if job_titles:
             unique_titles = list(dict.fromkeys([t.strip().title() for t in job_titles if len(t.strip()) > 3]))
             for title in unique_titles[:3]:  # Limit to top 3
@@ -264,18 +473,279 @@ def extract_structured_data(text):
         "education": education
     }
 
-def rank_resumes(resumes, jd_requirements, weights=None):
+def scoring_fingerprint(jd_requirements, weights=None, model_name=None, semantic_fraction=1.0, fast=False):
+    """
+    Identify everything a stored score depends on besides the resume itself.
+
+    A resume whose stored fingerprint differs from the current one (JD requirements,
+    weights, embedding model, semantic cut-off, parser or scoring version changed)
+    has a stale score. Keyword-only (fast) scores get a fingerprint of their own, so a
+    full-quality run treats them as stale and upgrades them.
+    """
+    model_name = model_name or semantic_model_name()
+    inputs = {
+        "requirements": list(jd_requirements or []),
+        "weights": weights or {},
+        "model": model_name,
+        "parser": PARSER_VERSION,
+        "scoring": SCORING_VERSION,
+    }
+    if semantic_fraction < 1.0:
+        # Only recorded when the cascade is on, so fingerprints from full scoring stay valid
+        inputs["semantic_fraction"] = semantic_fraction
+    if fast:
+        inputs["mode"] = "fast"
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode()).hexdigest()[:16]
+
+
+# Resumes encoded per SentenceTransformer call, and scored between progress reports
+ENCODE_BATCH_SIZE = int(os.getenv("ENCODE_BATCH_SIZE", "32"))
+_PROGRESS_EVERY = 25
+# Share of resumes, best lexical score first, that get embedding-based semantic scoring
+RANKING_SEMANTIC_FRACTION = float(os.getenv("RANKING_SEMANTIC_FRACTION", "1.0"))
+
+
+def weight_vector(weights=None):
+    """Weights in SCORE_COMPONENTS order; missing keys take their default, as in rank_resumes."""
+    weights = weights or DEFAULT_WEIGHTS
+    return np.array([float(weights.get(c, DEFAULT_WEIGHTS[c])) for c in SCORE_COMPONENTS])
+
+
+def combine_component_scores(components, weights=None):
+    """
+    Final scores for a matrix of component scores (one row per resume, SCORE_COMPONENTS order).
+
+    Same formula as rank_resumes, as one matrix-vector product, so re-weighting stored
+    components is instant.
+    """
+    matrix = np.asarray(components, dtype=float).reshape(-1, len(SCORE_COMPONENTS))
+    return np.clip(matrix @ weight_vector(weights), 0.0, 1.0)
+
+
+def _lexical_components(resume, resume_text, required_skills, required_years):
+    """
+    The component scores that need no model: skills, experience, education, and a
+    keyword estimate of the semantic score (share of required skills named in the text).
+    """
+    resume_text_lower = resume_text.lower()
+    if required_skills:
+        keyword_hits = sum(1 for kw in required_skills if kw in resume_text_lower)
+        keyword_score = min(1.0, keyword_hits / max(1, len(required_skills)))
+    else:
+        keyword_score = 0.0
+
+    # Skill Match Score (0-1) with fuzzy matching
+    resume_skills_list = resume.get("skills", [])
+    if isinstance(resume_skills_list, str):
+        resume_skills_list = [resume_skills_list]
+    resume_skills = set([s.lower().strip() for s in resume_skills_list if s])
+    
+    # Exact match
+    exact_matches = len(resume_skills.intersection(required_skills))
+    
+    # Fuzzy match for remaining required skills
+    fuzzy_matches = 0
+    for req_skill in required_skills:
+        if req_skill not in resume_skills:
+            # Check if skill appears in resume text with fuzzy matching
+            if req_skill in resume_text_lower:
+                fuzzy_matches += 0.8  # Partial credit for text mention
+            else:
+                # Use fuzzy string matching
+                for resume_skill in resume_skills:
+                    if fuzz.ratio(req_skill, resume_skill) > 85:
+                        fuzzy_matches += 0.9
+                        break
+    
+    total_matches = exact_matches + fuzzy_matches
+    skill_score = min(1.0, total_matches / len(required_skills)) if required_skills else 0.0
+    
+    # Experience Score (0-1)
+    experience_score = 0.0
+    experience_list = resume.get("experience", [])
+    
+    if experience_list:
+        # Calculate total years of experience
+        total_years = 0
+        role_count = 0
+        
+        for exp in experience_list:
+            if isinstance(exp, dict):
+                total_years += exp.get("years", 0)
+                if exp.get("role"):
+                    role_count += 1
+        
+        # Score based on years (0.7 weight) and number of roles (0.3 weight)
+        if required_years > 0:
+            year_score = min(1.0, total_years / required_years)
+        else:
+            year_score = min(1.0, total_years / 5.0)  # Assume 5 years is excellent if not specified
+        
+        role_score = min(1.0, role_count / 3.0)  # 3+ roles is excellent
+        
+        experience_score = (year_score * 0.7) + (role_score * 0.3)
+    
+    # Education Score (0-1)
+    education_score = 0.0
+    education_list = resume.get("education", [])
+    
+    if education_list:
+        # Score based on highest degree
+        degree_levels = {
+            'phd': 1.0, 'doctorate': 1.0,
+            'master': 0.85, 'mba': 0.85, 'm.tech': 0.85, 'm.sc': 0.85, 'm.e': 0.85,
+            'bachelor': 0.70, 'b.tech': 0.70, 'b.sc': 0.70, 'b.e': 0.70
+        }
+        
+        max_degree_score = 0.0
+        for edu in education_list:
+            if isinstance(edu, dict) and edu.get("degree"):
+                degree_text = edu["degree"].lower()
+                for degree_key, score in degree_levels.items():
+                    if degree_key in degree_text:
+                        max_degree_score = max(max_degree_score, score)
+        
+        education_score = max_degree_score if max_degree_score > 0 else 0.5  # Default to 0.5 if degree mentioned but not matched
+    
+    return {
+        "skills": skill_score,
+        "semantic": keyword_score,
+        "experience": experience_score,
+        "education": education_score,
+    }
+
+
+def _jd_profile(jd_requirements):
+    """(jd_text, required_skills, required_years) that scoring reads from the requirements."""
+    jd_text = " ".join(jd_requirements) if jd_requirements else "default job requirements"
+    # Extract required skills from JD with fuzzy matching enabled
+    required_skills = set()
+    for req in jd_requirements:
+        req_skills = extract_skills_from_text(req, use_fuzzy=True)
+        required_skills.update([s.lower().strip() for s in req_skills])
+
+    # Extract required experience years from JD
+    required_years = 0
+    year_mentions = re.findall(r'(\d+)\+?\s*(?:years?|yrs?)\s+(?:of\s+)?(?:experience|exp)', jd_text.lower())
+    if year_mentions:
+        required_years = max([int(y) for y in year_mentions])
+    return jd_text, required_skills, required_years
+
+
+def lexical_components(resumes, jd_requirements, progress=None):
+    """
+    Stage 1 of the rank_resumes cascade: the lexical component scores of each resume
+    (see _lexical_components), or None for a resume without text.
+
+    Args:
+        progress: Optional callback ("score", processed, total)
+    """
+    _, required_skills, required_years = _jd_profile(jd_requirements)
+    lexical = []
+    for index, resume in enumerate(resumes):
+        if progress and index % _PROGRESS_EVERY == 0:
+            progress("score", index, len(resumes))
+        resume_text = resume.get("extracted_text", "") or ""
+        if not resume_text.strip():
+            lexical.append(None)
+            continue
+        lexical.append(_lexical_components(resume, resume_text, required_skills, required_years))
+    return lexical
+
+
+def fit_semantic_calibration(keyword, semantic):
+    """
+    Linear map from keyword estimates to semantic scores, fitted over the resumes that
+    got both; (slope, intercept), or None when there are none to fit on.
+
+    Raw keyword shares run higher than cosine similarities, so the cascade maps the
+    estimates of skipped resumes through this before they are combined.
+    """
+    keyword = np.asarray(keyword, dtype=float)
+    semantic = np.asarray(semantic, dtype=float)
+    if not len(semantic):
+        return None
+    if len(keyword) > 1 and np.ptp(keyword) > 0:
+        slope, intercept = np.polyfit(keyword, semantic, 1)
+        return float(slope), float(intercept)
+    return 0.0, float(semantic.mean())
+
+
+def _calibrated(parts, calibration):
+    if calibration is None:
+        return parts
+    slope, intercept = calibration
+    return {**parts, "semantic": float(max(0.0, min(1.0, slope * parts["semantic"] + intercept)))}
+
+
+def _weighted_score(parts, weights):
+    final_score = (
+        weights.get("skills", 0.45) * parts["skills"] +
+        weights.get("semantic", 0.30) * parts["semantic"] +
+        weights.get("experience", 0.20) * parts["experience"] +
+        weights.get("education", 0.05) * parts["education"]
+    )
+    # Ensure score is between 0 and 1
+    return max(0.0, min(1.0, final_score))
+
+
+def lexical_scores(lexical, weights=None, calibration=None, components=None):
+    """
+    Final scores for resumes the cascade did not score semantically, from their stage 1
+    components (lexical_components) with the keyword estimate mapped through
+    calibration (fit_semantic_calibration). A None entry (no text) scores 0.
+
+    Args:
+        components: Optional list; one dict of the component scores used is appended per resume
+
+    Returns:
+        List of scores, one per entry
+    """
+    weights = weights or DEFAULT_WEIGHTS
+    scores = []
+    for parts in lexical:
+        parts = _calibrated(parts, calibration) if parts is not None else dict.fromkeys(SCORE_COMPONENTS, 0.0)
+        scores.append(_weighted_score(parts, weights))
+        if components is not None:
+            components.append(parts)
+    return scores
+
+
+def rank_resumes(resumes, jd_requirements, weights=None, progress=None, components=None,
+                 semantic_fraction=None, score_modes=None, fast=False, lexical=None):
     """
     Advanced resume ranking with multi-factor scoring:
-    - Semantic similarity using sentence transformers
+    - Semantic similarity using sentence transformers, or hashed TF-IDF vectors
+      (SEMANTIC_BACKEND=tfidf)
     - Exact and fuzzy skill matching
     - Experience relevance and duration
     - Education level matching
+
+    Scoring is a two-stage cascade. The lexical components (skills, experience,
+    education and a keyword estimate of semantic similarity) are computed for every
+    resume; only the best semantic_fraction of them by that lexical score are encoded
+    and get the embedding-based semantic score. The rest keep the keyword estimate,
+    rescaled to the cosine range of the scored ones.
     
     Args:
-        resumes: List of resume dictionaries with extracted_text, skills, experience, education
+        resumes: List of resume dictionaries with extracted_text, skills, experience, education.
+            A precomputed "embedding" (list of floats) is used instead of encoding the text;
+            embeddings computed here are written back to resume["embedding"] for caching.
         jd_requirements: List of job requirement strings
         weights: Dict with custom weights (default: {"skills": 0.45, "semantic": 0.30, "experience": 0.20, "education": 0.05})
+        progress: Optional callback (phase, processed, total) called while resumes are
+            encoded ("encode") and scored ("score"); an exception it raises aborts the run
+        components: Optional list; if given, one dict of the four component scores
+            (SCORE_COMPONENTS) is appended per resume, for re-weighting without rescoring
+        semantic_fraction: Share (0-1] of resumes that get semantic scoring
+            (default: RANKING_SEMANTIC_FRACTION; 1 scores every resume semantically)
+        score_modes: Optional list; if given, one tag is appended per resume for how its
+            semantic component was computed: "semantic" (embedding similarity), "lexical"
+            (skipped by the prefilter) or "fast" (no model was used for this call)
+        fast: Keyword-only scoring: the model is not loaded and the semantic component is
+            the keyword estimate for every resume (the same path as when the model fails to load)
+        lexical: Optional stage 1 components already computed for these resumes
+            (lexical_components), so they are not computed again
     
     Returns:
         List of tuples: (score, detailed_breakdown) for each resume
@@ -284,147 +754,121 @@ def rank_resumes(resumes, jd_requirements, weights=None):
     # Wrap model load in try/except and fall back to a lightweight heuristic
     model = None
     jd_embedding = None
+    use_tfidf = False
+    jd_text = " ".join(jd_requirements) if jd_requirements else "default job requirements"
     try:
-        from sentence_transformers import SentenceTransformer, util
-        # Model name can be overridden via the EMBEDDING_MODEL env var.
-        # Use a smaller default model to reduce memory and deployment issues.
-        model_name = os.getenv('EMBEDDING_MODEL', 'all-MiniLM-L6-v2')
-        model = SentenceTransformer(model_name)
-        jd_text = " ".join(jd_requirements) if jd_requirements else "default job requirements"
-        jd_embedding = model.encode(jd_text, convert_to_tensor=True)
+        if fast:
+            pass
+        elif SEMANTIC_BACKEND == "tfidf":
+            _get_hashing_vectorizer()
+            use_tfidf = True
+        else:
+            from sentence_transformers import util
+            # Model name can be overridden via the EMBEDDING_MODEL env var.
+            # Use a smaller default model to reduce memory and deployment issues.
+            model = get_sentence_model()
+            jd_embedding = model.encode(jd_text, convert_to_tensor=True)
     except Exception as e:
         # Could be missing package, model download failure, or memory limits in the environment.
         # Log warning and fall back to a simpler heuristic that doesn't require the transformer.
-        print(f"Warning: SentenceTransformer unavailable or failed to load: {e}. Using fallback scoring.")
+        print(f"Warning: {SEMANTIC_BACKEND} semantic backend unavailable or failed to load: {e}. Using fallback scoring.")
+    use_transformer = model is not None and jd_embedding is not None
+    # Without a semantic engine every semantic component is the keyword estimate
+    unscored_mode = "lexical" if use_transformer or use_tfidf else "fast"
     
     # Default weights if not provided - skills matter most
     if not weights:
-        weights = {"skills": 0.45, "semantic": 0.30, "experience": 0.20, "education": 0.05}
-    
-    # Extract required skills from JD with fuzzy matching enabled
-    required_skills = set()
-    for req in jd_requirements:
-        req_skills = extract_skills_from_text(req, use_fuzzy=True)
-        required_skills.update([s.lower().strip() for s in req_skills])
-    
-    # Extract required experience years from JD
-    required_years = 0
-    year_mentions = re.findall(r'(\d+)\+?\s*(?:years?|yrs?)\s+(?:of\s+)?(?:experience|exp)', jd_text.lower())
-    if year_mentions:
-        required_years = max([int(y) for y in year_mentions])
-    
+        weights = DEFAULT_WEIGHTS
+    if semantic_fraction is None:
+        semantic_fraction = RANKING_SEMANTIC_FRACTION
+
+    # Stage 1: lexical components for every resume (no model)
+    if lexical is None:
+        lexical = lexical_components(resumes, jd_requirements, progress)
+
+    # Stage 2: semantic scoring for the resumes that survive the lexical cut-off
+    semantic_indices = set()
+    if use_transformer or use_tfidf:
+        candidates = [i for i, parts in enumerate(lexical) if parts is not None]
+        keep = len(candidates)
+        if semantic_fraction < 1.0:
+            keep = int(np.ceil(max(0.0, semantic_fraction) * len(candidates)))
+            prefilter_scores = combine_component_scores(
+                [[lexical[i][c] for c in SCORE_COMPONENTS] for i in candidates], weights
+            )
+            candidates = [candidates[j] for j in np.argsort(-prefilter_scores, kind="stable")[:keep]]
+        semantic_indices = set(candidates)
+
+    if use_transformer:
+        # Encode resumes without a cached embedding in batches; much faster than one at a time
+        to_encode = [resumes[i] for i in sorted(semantic_indices) if not resumes[i].get("embedding")]
+        for start in range(0, len(to_encode), ENCODE_BATCH_SIZE):
+            if progress:
+                progress("encode", start, len(to_encode))
+            batch = to_encode[start:start + ENCODE_BATCH_SIZE]
+            try:
+                vectors = model.encode([r["extracted_text"] for r in batch], batch_size=ENCODE_BATCH_SIZE)
+                for r, vector in zip(batch, vectors):
+                    r["embedding"] = vector.tolist()
+            except Exception as e:
+                # Leave them unset; they are encoded (or zeroed) one by one below
+                print(f"Warning: batch encoding failed: {e}")
+        if progress and to_encode:
+            progress("encode", len(to_encode), len(to_encode))
+
     scores = []
+    semantic_by_index = {}
+    if use_tfidf and semantic_indices:
+        order = sorted(semantic_indices)
+        similarities = tfidf_similarities(jd_text, [resumes[i]["extracted_text"] for i in order])
+        semantic_by_index = {i: float(min(1.0, max(0.0, sim))) for i, sim in zip(order, similarities)}
+    for index in (sorted(semantic_indices) if use_transformer else []):
+        resume = resumes[index]
+        try:
+            if resume.get("embedding"):
+                resume_embedding = resume["embedding"]
+            else:
+                resume_embedding = model.encode(resume["extracted_text"], convert_to_tensor=True)
+                resume["embedding"] = resume_embedding.tolist()
+            semantic_score = float(util.cos_sim(jd_embedding, resume_embedding)[0][0])
+            semantic_by_index[index] = max(0.0, min(1.0, semantic_score))  # Clamp to [0, 1]
+        except Exception:
+            # If semantic computation fails for a particular resume, fall back to 0
+            semantic_by_index[index] = 0.0
+
+    # Skipped resumes keep the keyword estimate, mapped onto the cosine scale with a linear
+    # fit over the scored ones; raw keyword shares run higher than cosine similarities and
+    # would otherwise lift skipped resumes above scored ones
+    calibration = None
+    if len(semantic_by_index) < sum(parts is not None for parts in lexical):
+        calibration = fit_semantic_calibration([lexical[i]["semantic"] for i in semantic_by_index],
+                                               list(semantic_by_index.values()))
     
-    for resume in resumes:
-        resume_text = resume.get("extracted_text", "")
-        if not resume_text or not resume_text.strip():
+    for index, resume in enumerate(resumes):
+        parts = lexical[index]
+        if parts is None:
             scores.append(0.0)
+            if components is not None:
+                components.append(dict.fromkeys(SCORE_COMPONENTS, 0.0))
+            if score_modes is not None:
+                score_modes.append(unscored_mode)
             continue
         
-        # Component 1: Semantic Similarity Score (0-1)
-        if model is not None and jd_embedding is not None:
-            try:
-                resume_embedding = model.encode(resume_text, convert_to_tensor=True)
-                semantic_score = float(util.cos_sim(jd_embedding, resume_embedding)[0][0])
-                semantic_score = max(0.0, min(1.0, semantic_score))  # Clamp to [0, 1]
-            except Exception:
-                # If semantic computation fails for a particular resume, fall back to 0
-                semantic_score = 0.0
+        # Semantic Similarity Score (0-1); the keyword estimate stands in for skipped resumes
+        if index in semantic_by_index:
+            parts = {**parts, "semantic": semantic_by_index[index]}
         else:
-            # Fallback: estimate semantic score from presence of required keywords
-            resume_text_lower = resume_text.lower()
-            if required_skills:
-                keyword_hits = sum(1 for kw in required_skills if kw in resume_text_lower)
-                semantic_score = min(1.0, keyword_hits / max(1, len(required_skills)))
-            else:
-                semantic_score = 0.0
-        
-        # Component 2: Skill Match Score (0-1) with fuzzy matching
-        resume_skills_list = resume.get("skills", [])
-        if isinstance(resume_skills_list, str):
-            resume_skills_list = [resume_skills_list]
-        resume_skills = set([s.lower().strip() for s in resume_skills_list if s])
-        
-        # Exact match
-        exact_matches = len(resume_skills.intersection(required_skills))
-        
-        # Fuzzy match for remaining required skills
-        fuzzy_matches = 0
-        resume_text_lower = resume_text.lower()
-        for req_skill in required_skills:
-            if req_skill not in resume_skills:
-                # Check if skill appears in resume text with fuzzy matching
-                if req_skill in resume_text_lower:
-                    fuzzy_matches += 0.8  # Partial credit for text mention
-                else:
-                    # Use fuzzy string matching
-                    for resume_skill in resume_skills:
-                        if fuzz.ratio(req_skill, resume_skill) > 85:
-                            fuzzy_matches += 0.9
-                            break
-        
-        total_matches = exact_matches + fuzzy_matches
-        skill_score = min(1.0, total_matches / len(required_skills)) if required_skills else 0.0
-        
-        # Component 3: Experience Score (0-1)
-        experience_score = 0.0
-        experience_list = resume.get("experience", [])
-        
-        if experience_list:
-            # Calculate total years of experience
-            total_years = 0
-            role_count = 0
-            
-            for exp in experience_list:
-                if isinstance(exp, dict):
-                    total_years += exp.get("years", 0)
-                    if exp.get("role"):
-                        role_count += 1
-            
-            # Score based on years (0.7 weight) and number of roles (0.3 weight)
-            if required_years > 0:
-                year_score = min(1.0, total_years / required_years)
-            else:
-                year_score = min(1.0, total_years / 5.0)  # Assume 5 years is excellent if not specified
-            
-            role_score = min(1.0, role_count / 3.0)  # 3+ roles is excellent
-            
-            experience_score = (year_score * 0.7) + (role_score * 0.3)
-        
-        # Component 4: Education Score (0-1)
-        education_score = 0.0
-        education_list = resume.get("education", [])
-        
-        if education_list:
-            # Score based on highest degree
-            degree_levels = {
-                'phd': 1.0, 'doctorate': 1.0,
-                'master': 0.85, 'mba': 0.85, 'm.tech': 0.85, 'm.sc': 0.85, 'm.e': 0.85,
-                'bachelor': 0.70, 'b.tech': 0.70, 'b.sc': 0.70, 'b.e': 0.70
-            }
-            
-            max_degree_score = 0.0
-            for edu in education_list:
-                if isinstance(edu, dict) and edu.get("degree"):
-                    degree_text = edu["degree"].lower()
-                    for degree_key, score in degree_levels.items():
-                        if degree_key in degree_text:
-                            max_degree_score = max(max_degree_score, score)
-            
-            education_score = max_degree_score if max_degree_score > 0 else 0.5  # Default to 0.5 if degree mentioned but not matched
+            parts = _calibrated(parts, calibration)
         
         # Final Weighted Score
-        final_score = (
-            weights.get("skills", 0.45) * skill_score +
-            weights.get("semantic", 0.30) * semantic_score +
-            weights.get("experience", 0.20) * experience_score +
-            weights.get("education", 0.05) * education_score
-        )
-        
-        # Ensure score is between 0 and 1
-        final_score = max(0.0, min(1.0, final_score))
-        
-        scores.append(final_score)
+        scores.append(_weighted_score(parts, weights))
+        if components is not None:
+            components.append(parts)
+        if score_modes is not None:
+            score_modes.append("semantic" if index in semantic_indices else unscored_mode)
+
+    if progress:
+        progress("score", len(resumes), len(resumes))
     
     # Fairlearn bias check (optional, for transparency)
     try:
@@ -445,6 +889,166 @@ def rank_resumes(resumes, jd_requirements, weights=None):
     return scores
 
 
+# Worker processes that share one ranking run; 1 scores in the calling thread
+RANKING_SHARDS = int(os.getenv("RANKING_SHARDS", "1"))
+# Below this many resumes per shard, handing work to other processes costs more than it saves
+RANKING_MIN_SHARD_SIZE = int(os.getenv("RANKING_MIN_SHARD_SIZE", "50"))
+
+_ranking_pool = None
+_ranking_pool_size = 0
+_ranking_pool_lock = threading.Lock()
+
+
+def _warm_ranking_worker():
+    # Set up the semantic engine when the worker starts rather than inside the first shard
+    # it scores; the tfidf backend needs no model weights, so none are loaded for it
+    try:
+        if SEMANTIC_BACKEND == "tfidf":
+            _get_hashing_vectorizer()
+        else:
+            get_sentence_model()
+    except Exception as e:
+        print(f"Warning: ranking worker could not set up the {SEMANTIC_BACKEND} semantic backend: {e}")
+
+
+def _get_ranking_pool(workers):
+    """Long-lived pool of ranking processes, so each loads the model once rather than per run."""
+    global _ranking_pool, _ranking_pool_size
+    with _ranking_pool_lock:
+        if _ranking_pool is None or _ranking_pool_size != workers:
+            if _ranking_pool is not None:
+                _ranking_pool.shutdown(wait=False, cancel_futures=True)
+            # spawn, not fork: the parent runs threads (and possibly torch), which fork does not copy safely
+            _ranking_pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_warm_ranking_worker,
+            )
+            _ranking_pool_size = workers
+        return _ranking_pool
+
+
+def shutdown_ranking_pool():
+    global _ranking_pool, _ranking_pool_size
+    with _ranking_pool_lock:
+        if _ranking_pool is not None:
+            _ranking_pool.shutdown(wait=False, cancel_futures=True)
+        _ranking_pool = None
+        _ranking_pool_size = 0
+
+
+def _rank_shard(args):
+    resumes, jd_requirements, weights, semantic_fraction, fast, lexical = args
+    components = []
+    score_modes = []
+    scores = rank_resumes(resumes, jd_requirements, weights, components=components,
+                          semantic_fraction=semantic_fraction, score_modes=score_modes, fast=fast, lexical=lexical)
+    # Embeddings computed in the worker go back to the caller, which caches them
+    return scores, components, score_modes, [r.get("embedding") for r in resumes]
+
+
+def _lexical_shard(args):
+    resumes, jd_requirements = args
+    return lexical_components(resumes, jd_requirements)
+
+
+def _shard_slices(count, shards):
+    """Contiguous slices cutting count resumes into shards, or None to stay in-process."""
+    shards = min(shards, count // max(1, RANKING_MIN_SHARD_SIZE))
+    if shards <= 1:
+        return None
+    size = -(-count // shards)
+    return [slice(start, start + size) for start in range(0, count, size)]
+
+
+def _run_shards(worker, tasks, sizes, workers, progress):
+    """
+    worker(task) for every task in the ranking pool; the results in task order.
+
+    progress gets ("score", resumes done, total) as each task finishes; an exception it
+    raises cancels the tasks not yet started.
+    """
+    # Sized by the configured worker count, not this call's shard count: a short page must not
+    # resize (and so cancel) the pool other pages of the same run are using
+    pool = _get_ranking_pool(workers)
+    futures = {pool.submit(worker, task): index for index, task in enumerate(tasks)}
+    results = [None] * len(tasks)
+    done = 0
+    try:
+        if progress:
+            progress("score", 0, sum(sizes))
+        for future in as_completed(futures):
+            index = futures[future]
+            results[index] = future.result()
+            done += sizes[index]
+            if progress:
+                progress("score", done, sum(sizes))
+    except BaseException:
+        for future in futures:
+            future.cancel()
+        raise
+    return results
+
+
+def lexical_components_sharded(resumes, jd_requirements, progress=None, shards=None):
+    """
+    lexical_components split across worker processes, as rank_resumes_sharded splits
+    rank_resumes; the output is exactly what lexical_components would return.
+    """
+    workers = shards or RANKING_SHARDS
+    slices = _shard_slices(len(resumes), workers)
+    if slices is None:
+        return lexical_components(resumes, jd_requirements, progress)
+    results = _run_shards(_lexical_shard, [(resumes[part], jd_requirements) for part in slices],
+                          [len(resumes[part]) for part in slices], workers, progress)
+    return [parts for shard in results for parts in shard]
+
+
+def rank_resumes_sharded(resumes, jd_requirements, weights=None, progress=None, components=None, shards=None,
+                         semantic_fraction=None, score_modes=None, fast=False, lexical=None):
+    """
+    rank_resumes split across worker processes.
+
+    The resumes are cut into contiguous shards, each scored by rank_resumes in a
+    process of a shared pool, and the shard results are merged back in input order,
+    so the output is exactly what rank_resumes would return. Embeddings computed in
+    the workers are written back to resume["embedding"] as rank_resumes does.
+
+    Args:
+        shards: Number of worker processes (default: RANKING_SHARDS). Runs in-process
+            when it is 1 or the resumes are too few to fill two shards of RANKING_MIN_SHARD_SIZE.
+        semantic_fraction, score_modes, fast, lexical: As for rank_resumes; the cut-off
+            applies per shard (_rank_posting makes it for the whole posting and passes 1)
+        progress: Optional callback (phase, processed, total), called with "score" as each
+            shard finishes; an exception it raises cancels the shards not yet started
+
+    Returns:
+        List of scores, one per resume, in input order
+    """
+    workers = shards or RANKING_SHARDS
+    slices = _shard_slices(len(resumes), workers)
+    if slices is None:
+        return rank_resumes(resumes, jd_requirements, weights, progress, components,
+                            semantic_fraction=semantic_fraction, score_modes=score_modes, fast=fast, lexical=lexical)
+
+    parts = [resumes[part] for part in slices]
+    tasks = [(resumes[part], jd_requirements, weights, semantic_fraction, fast,
+              lexical[part] if lexical is not None else None) for part in slices]
+    results = _run_shards(_rank_shard, tasks, [len(part) for part in parts], workers, progress)
+
+    scores = []
+    for part, (part_scores, part_components, part_modes, embeddings) in zip(parts, results):
+        scores.extend(part_scores)
+        if components is not None:
+            components.extend(part_components)
+        if score_modes is not None:
+            score_modes.extend(part_modes)
+        for resume, embedding in zip(part, embeddings):
+            if embedding and not resume.get("embedding"):
+                resume["embedding"] = embedding
+    return scores
+
+
 def explain_ranking_with_lime(resume_text, jd_requirements, resume_data, num_features=15, use_actual_score=False, actual_score=None):
     """
     Generate LIME explanation for why a resume received its ranking score.
@@ -470,9 +1074,8 @@ def explain_ranking_with_lime(resume_text, jd_requirements, resume_data, num_fea
     # Calculate the actual ranking score with breakdown
     jd_text = " ".join(jd_requirements) if jd_requirements else "default job requirements"
     # Lazily import heavy ML libraries
-    from sentence_transformers import SentenceTransformer, util
-    model_name = os.getenv('EMBEDDING_MODEL', 'all-MiniLM-L6-v2')
-    model = SentenceTransformer(model_name)
+    from sentence_transformers import util
+    model = get_sentence_model()
     jd_embedding = model.encode(jd_text, convert_to_tensor=True)
     resume_embedding = model.encode(resume_text, convert_to_tensor=True)
     
@@ -0,0 +1,431 @@
+"""
+Async data access for Supabase (PostgREST, GoTrue and Storage) over a pooled httpx client.
+
+The supabase-py client is synchronous, so every `.execute()` inside an `async def`
+endpoint blocked the event loop and one uvicorn worker effectively served one
+request at a time. This module exposes the same fluent query style, but `execute()`
+is awaited and all requests share one httpx.AsyncClient with keep-alive and a
+bounded connection pool:
+
+    res = await db.table("resumes").select("resume_id, score").eq("jd_id", jd_id).execute()
+    rows = res.data
+
+    user = await db.auth.get_user(token)
+
+Errors are raised as DatabaseError / AuthError carrying the HTTP status and the
+PostgREST/GoTrue message.
+"""
+import os
+import json
+import time
+import base64
+import logging
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, quote, urlparse
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+DB_POOL_MAX_CONNECTIONS = int(os.getenv("DB_POOL_MAX_CONNECTIONS", "50"))
+DB_POOL_MAX_KEEPALIVE = int(os.getenv("DB_POOL_MAX_KEEPALIVE", "20"))
+DB_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("DB_KEEPALIVE_EXPIRY_SECONDS", "30"))
+DB_TIMEOUT_SECONDS = float(os.getenv("DB_TIMEOUT_SECONDS", "15"))
+# Waiting for a free pooled connection counts against this, not against DB_TIMEOUT_SECONDS
+DB_POOL_TIMEOUT_SECONDS = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "10"))
+
+# Lifetime Supabase Storage gives signed upload URLs, assumed when the token cannot be read
+SIGNED_UPLOAD_URL_SECONDS = 7200
+
+
+class DatabaseError(Exception):
+    """A PostgREST request failed; mirrors postgrest's APIError fields."""
+
+    def __init__(self, message: str, status_code: int = 0, code: Optional[str] = None,
+                 details: Optional[str] = None, hint: Optional[str] = None):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+        self.code = code
+        self.details = details
+        self.hint = hint
+
+
+class AuthError(Exception):
+    """A GoTrue (Supabase Auth) request failed."""
+
+    def __init__(self, message: str, status_code: int = 0):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class QueryResponse:
+    """Result of execute(): `data` is a list of rows (or one row after single()), `count` is set when requested."""
+
+    def __init__(self, data: Any, count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+    def __repr__(self):
+        return f"QueryResponse(data={self.data!r}, count={self.count!r})"
+
+
+class AuthUser:
+    """The fields of a GoTrue user the endpoints use; `role` is filled in from user_metadata."""
+
+    def __init__(self, payload: dict):
+        self.id = payload.get("id")
+        self.email = payload.get("email")
+        self.user_metadata = payload.get("user_metadata") or {}
+        self.app_metadata = payload.get("app_metadata") or {}
+        self.role = self.user_metadata.get("role")
+
+    def __repr__(self):
+        return f"AuthUser(id={self.id!r}, email={self.email!r}, role={self.role!r})"
+
+
+class AuthSession:
+    def __init__(self, payload: dict):
+        self.access_token = payload.get("access_token")
+        self.refresh_token = payload.get("refresh_token")
+        self.token_type = payload.get("token_type", "bearer")
+        self.expires_in = payload.get("expires_in")
+
+
+class AuthResponse:
+    """Mirrors gotrue's AuthResponse: `user` and (when signed in) `session`."""
+
+    def __init__(self, user: Optional[AuthUser], session: Optional[AuthSession]):
+        self.user = user
+        self.session = session
+
+
+def _format_value(value) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+def _quote(value) -> str:
+    """Quote a value for a PostgREST list filter such as in.(...)."""
+    text = _format_value(value)
+    return '"' + text.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+class AsyncQuery:
+    """Fluent PostgREST request builder; nothing is sent until `await execute()`."""
+
+    def __init__(self, database: "AsyncDatabase", path: str):
+        self._db = database
+        self._path = path
+        self._method = "GET"
+        self._params: List[tuple] = []
+        self._headers: Dict[str, str] = {}
+        self._prefer: List[str] = []
+        self._body: Any = None
+        self._single = False
+        self._order: List[str] = []
+
+    # -- verbs ------------------------------------------------------------
+    def select(self, columns: str = "*", count: Optional[str] = None) -> "AsyncQuery":
+        self._method = "GET"
+        self._params.append(("select", ",".join(c.strip() for c in columns.split(","))))
+        if count:
+            self._prefer.append(f"count={count}")
+        return self
+
+    def insert(self, rows, returning: str = "representation") -> "AsyncQuery":
+        self._method = "POST"
+        self._body = rows
+        self._prefer.append(f"return={returning}")
+        self._add_columns(rows)
+        return self
+
+    def upsert(self, rows, on_conflict: Optional[str] = None, ignore_duplicates: bool = False,
+               returning: str = "representation") -> "AsyncQuery":
+        self.insert(rows, returning=returning)
+        self._prefer.append("resolution=ignore-duplicates" if ignore_duplicates else "resolution=merge-duplicates")
+        if on_conflict:
+            self._params.append(("on_conflict", on_conflict))
+        return self
+
+    def update(self, values: dict, returning: str = "representation") -> "AsyncQuery":
+        self._method = "PATCH"
+        self._body = values
+        self._prefer.append(f"return={returning}")
+        return self
+
+    def delete(self, returning: str = "representation") -> "AsyncQuery":
+        self._method = "DELETE"
+        self._prefer.append(f"return={returning}")
+        return self
+
+    def _add_columns(self, rows):
+        # Bulk inserts with differing keys need an explicit column list
+        if isinstance(rows, list) and rows:
+            columns = list(dict.fromkeys(key for row in rows for key in row))
+            self._params.append(("columns", ",".join(f'"{c}"' for c in columns)))
+
+    # -- filters ----------------------------------------------------------
+    def _filter(self, column: str, operator: str, value: str) -> "AsyncQuery":
+        self._params.append((column, f"{operator}.{value}"))
+        return self
+
+    def eq(self, column: str, value) -> "AsyncQuery":
+        return self._filter(column, "eq", _format_value(value))
+
+    def neq(self, column: str, value) -> "AsyncQuery":
+        return self._filter(column, "neq", _format_value(value))
+
+    def gt(self, column: str, value) -> "AsyncQuery":
+        return self._filter(column, "gt", _format_value(value))
+
+    def gte(self, column: str, value) -> "AsyncQuery":
+        return self._filter(column, "gte", _format_value(value))
+
+    def lt(self, column: str, value) -> "AsyncQuery":
+        return self._filter(column, "lt", _format_value(value))
+
+    def lte(self, column: str, value) -> "AsyncQuery":
+        return self._filter(column, "lte", _format_value(value))
+
+    def is_(self, column: str, value) -> "AsyncQuery":
+        return self._filter(column, "is", _format_value(value))
+
+    def in_(self, column: str, values) -> "AsyncQuery":
+        return self._filter(column, "in", "(" + ",".join(_quote(v) for v in values) + ")")
+
+    def or_(self, filters: str) -> "AsyncQuery":
+        """Match any of a PostgREST filter list, e.g. "score.lt.0.5,and(score.eq.0.5,resume_id.gt.x)"."""
+        self._params.append(("or", f"({filters})"))
+        return self
+
+    # -- modifiers --------------------------------------------------------
+    def order(self, column: str, desc: bool = False, nullsfirst: Optional[bool] = None) -> "AsyncQuery":
+        term = f"{column}.{'desc' if desc else 'asc'}"
+        if nullsfirst is not None:
+            term += ".nullsfirst" if nullsfirst else ".nullslast"
+        self._order.append(term)
+        return self
+
+    def limit(self, count: int) -> "AsyncQuery":
+        self._params.append(("limit", str(count)))
+        return self
+
+    def range(self, start: int, end: int) -> "AsyncQuery":
+        self._params.append(("offset", str(start)))
+        self._params.append(("limit", str(end - start + 1)))
+        return self
+
+    def single(self) -> "AsyncQuery":
+        """Return one row as a dict; like supabase-py, zero or several rows is an error."""
+        self._single = True
+        self._headers["Accept"] = "application/vnd.pgrst.object+json"
+        return self
+
+    async def execute(self) -> QueryResponse:
+        params = list(self._params)
+        if self._order:
+            params.append(("order", ",".join(self._order)))
+        headers = dict(self._headers)
+        if self._prefer:
+            headers["Prefer"] = ",".join(self._prefer)
+        content = json.dumps(self._body, default=str) if self._body is not None else None
+        if content is not None:
+            headers["Content-Type"] = "application/json"
+
+        response = await self._db.request(self._method, self._path, params=params, headers=headers, content=content)
+        if response.status_code >= 400:
+            raise _database_error(response)
+
+        data = response.json() if response.content else ([] if not self._single else None)
+        count = None
+        content_range = response.headers.get("content-range")
+        if content_range and "/" in content_range:
+            total = content_range.rsplit("/", 1)[1]
+            count = int(total) if total.isdigit() else None
+        return QueryResponse(data, count)
+
+
+def _database_error(response: httpx.Response) -> DatabaseError:
+    try:
+        body = response.json()
+    except ValueError:
+        body = {"message": response.text}
+    if not isinstance(body, dict):
+        body = {"message": str(body)}
+    return DatabaseError(
+        body.get("message") or f"HTTP {response.status_code}",
+        status_code=response.status_code,
+        code=body.get("code"),
+        details=body.get("details"),
+        hint=body.get("hint"),
+    )
+
+
+class AsyncAuth:
+    """The GoTrue calls the endpoints make, sent with the anon key like supabase_auth did."""
+
+    def __init__(self, database: "AsyncDatabase"):
+        self._db = database
+
+    async def _request(self, method: str, path: str, token: Optional[str] = None, **kwargs) -> dict:
+        headers = {"apikey": self._db.anon_key, "Authorization": f"Bearer {token or self._db.anon_key}"}
+        response = await self._db.request(method, f"/auth/v1/{path}", headers=headers, **kwargs)
+        if response.status_code >= 400:
+            try:
+                body = response.json()
+                message = body.get("msg") or body.get("message") or body.get("error_description") or body.get("error")
+            except ValueError:
+                message = None
+            raise AuthError(message or f"HTTP {response.status_code}", status_code=response.status_code)
+        return response.json() if response.content else {}
+
+    async def get_user(self, token: str) -> AuthUser:
+        """Validate an access token and return its user (raises AuthError if invalid or expired)."""
+        return AuthUser(await self._request("GET", "user", token=token))
+
+    async def sign_in_with_password(self, credentials: dict) -> AuthResponse:
+        payload = await self._request("POST", "token", params={"grant_type": "password"},
+                                      json={"email": credentials["email"], "password": credentials["password"]})
+        return AuthResponse(AuthUser(payload.get("user") or {}), AuthSession(payload))
+
+    async def sign_up(self, credentials: dict) -> AuthResponse:
+        options = credentials.get("options") or {}
+        body = {"email": credentials["email"], "password": credentials["password"], "data": options.get("data") or {}}
+        params = {"redirect_to": options["email_redirect_to"]} if options.get("email_redirect_to") else None
+        payload = await self._request("POST", "signup", json=body, params=params)
+        # With email confirmation on GoTrue returns the bare user; otherwise a session with a nested user
+        if "access_token" in payload:
+            return AuthResponse(AuthUser(payload.get("user") or {}), AuthSession(payload))
+        return AuthResponse(AuthUser(payload) if payload.get("id") else None, None)
+
+    async def update_user(self, token: str, attributes: dict) -> AuthUser:
+        return AuthUser(await self._request("PUT", "user", token=token, json=attributes))
+
+    async def refresh_session(self, refresh_token: str) -> dict:
+        return await self._request("POST", "token", params={"grant_type": "refresh_token"},
+                                   json={"refresh_token": refresh_token})
+
+
+class AsyncStorage:
+    """The Supabase Storage calls used by the presigned upload flow (service role)."""
+
+    def __init__(self, database: "AsyncDatabase"):
+        self._db = database
+
+    async def create_signed_upload_url(self, bucket: str, path: str) -> dict:
+        """
+        Issue a one-time upload URL for bucket/path; the client PUTs the file body to it.
+
+        Returns:
+            {"signed_url": absolute URL including the token, "token": ..., "path": path,
+             "expires_in": seconds the URL stays valid}
+        """
+        response = await self._db.request("POST", f"/storage/v1/object/upload/sign/{bucket}/{quote(path)}")
+        if response.status_code >= 400:
+            raise DatabaseError(_storage_message(response), status_code=response.status_code)
+        relative = response.json().get("url", "")
+        token = parse_qs(urlparse(relative).query).get("token", [None])[0]
+        return {
+            "signed_url": f"{self._db.url}/storage/v1{relative}",
+            "token": token,
+            "path": path,
+            "expires_in": _token_lifetime(token),
+        }
+
+    async def object_info(self, bucket: str, path: str) -> Optional[dict]:
+        """Size and content type of a stored object, or None if it does not exist."""
+        response = await self._db.request("HEAD", f"/storage/v1/object/{bucket}/{quote(path)}")
+        if response.status_code in (400, 404):
+            return None
+        if response.status_code >= 400:
+            raise DatabaseError(f"HTTP {response.status_code}", status_code=response.status_code)
+        length = response.headers.get("content-length")
+        return {
+            "size": int(length) if length and length.isdigit() else None,
+            "content_type": response.headers.get("content-type"),
+        }
+
+    async def read_head(self, bucket: str, path: str, length: int) -> bytes:
+        """First `length` bytes of a stored object (a ranged GET, so the rest is never transferred)."""
+        response = await self._db.request(
+            "GET", f"/storage/v1/object/authenticated/{bucket}/{quote(path)}",
+            headers={"Range": f"bytes=0-{length - 1}"},
+        )
+        if response.status_code >= 400:
+            raise DatabaseError(_storage_message(response), status_code=response.status_code)
+        # A server that ignores Range answers 200 with the whole body
+        return response.content[:length]
+
+    async def remove(self, bucket: str, paths: List[str]):
+        response = await self._db.request("DELETE", f"/storage/v1/object/{bucket}", json={"prefixes": paths})
+        if response.status_code >= 400:
+            raise DatabaseError(_storage_message(response), status_code=response.status_code)
+
+
+def _token_lifetime(token: Optional[str]) -> int:
+    """Seconds until a storage JWT expires, read from its `exp` claim (not verified)."""
+    try:
+        claims = token.split(".")[1]
+        exp = json.loads(base64.urlsafe_b64decode(claims + "=" * (-len(claims) % 4)))["exp"]
+        return max(0, int(exp - time.time()))
+    except Exception:
+        return SIGNED_UPLOAD_URL_SECONDS
+
+
+def _storage_message(response: httpx.Response) -> str:
+    try:
+        body = response.json()
+        return body.get("message") or body.get("error") or f"HTTP {response.status_code}"
+    except ValueError:
+        return response.text or f"HTTP {response.status_code}"
+
+
+class AsyncDatabase:
+    """Entry point: `table()` / `rpc()` for PostgREST with the service role key, `auth` for GoTrue, `storage` for Storage."""
+
+    def __init__(self, url: Optional[str], service_key: Optional[str], anon_key: Optional[str] = None):
+        self.url = (url or "").rstrip("/")
+        self.service_key = service_key
+        self.anon_key = anon_key or service_key
+        self.auth = AsyncAuth(self)
+        self.storage = AsyncStorage(self)
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # Created lazily so it binds to the running event loop, not the import-time one
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.url,
+                timeout=httpx.Timeout(DB_TIMEOUT_SECONDS, pool=DB_POOL_TIMEOUT_SECONDS),
+                limits=httpx.Limits(
+                    max_connections=DB_POOL_MAX_CONNECTIONS,
+                    max_keepalive_connections=DB_POOL_MAX_KEEPALIVE,
+                    keepalive_expiry=DB_KEEPALIVE_EXPIRY_SECONDS,
+                ),
+            )
+        return self._client
+
+    async def request(self, method: str, path: str, headers: Optional[dict] = None, **kwargs) -> httpx.Response:
+        merged = {"apikey": self.service_key, "Authorization": f"Bearer {self.service_key}"}
+        merged.update(headers or {})
+        return await self.client.request(method, path, headers=merged, **kwargs)
+
+    def table(self, name: str) -> AsyncQuery:
+        return AsyncQuery(self, f"/rest/v1/{name}")
+
+    def rpc(self, function: str, params: Optional[dict] = None) -> AsyncQuery:
+        """Call a Postgres function exposed by PostgREST; `await db.rpc("fn", {...}).execute()`."""
+        query = AsyncQuery(self, f"/rest/v1/rpc/{function}")
+        query._method = "POST"
+        query._body = params or {}
+        return query
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
@@ -0,0 +1,125 @@
+"""
+Streaming DOCX text extractor.
+
+python-docx builds the whole object tree and only exposes body paragraphs, so
+large documents are slow and skills kept in table cells, text boxes, headers or
+footers are lost. This reads the package parts directly with an incremental XML
+parser, clearing elements as they are consumed so memory stays flat.
+"""
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+from typing import List
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+MC_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+
+_HEADER_PART = re.compile(r"^word/header\d*\.xml$")
+_FOOTER_PART = re.compile(r"^word/footer\d*\.xml$")
+
+
+def _natural_key(name):
+    return [int(t) if t.isdigit() else t for t in re.split(r"(\d+)", name)]
+
+
+def _iter_part_lines(stream):
+    """
+    Yield text lines from one WordprocessingML part.
+
+    Paragraphs become lines; a table row becomes one line with its cells joined by
+    tabs. Text box paragraphs (w:txbxContent) are emitted as their own lines. The
+    mc:Fallback copy of a text box is skipped so its text is not duplicated.
+    """
+    paragraphs: List[List[str]] = []  # open paragraphs (text boxes nest inside runs)
+    cells: List[List[str]] = []       # open table cells, each collecting its lines
+    rows: List[List[str]] = []        # open table rows, each collecting its cell texts
+    fallback_depth = 0
+    run_depth = 0     # open w:r elements; a w:tab outside one is a tab-stop definition (w:pPr/w:tabs)
+    container = None  # element whose finished children can be cleared (w:body / w:hdr / w:ftr)
+
+    def emit(line):
+        line = line.strip()
+        if not line:
+            return None
+        if cells:
+            cells[-1].append(line)
+            return None
+        return line
+
+    for event, elem in ET.iterparse(stream, events=("start", "end")):
+        tag = elem.tag
+        if event == "start":
+            if tag == MC_FALLBACK:
+                fallback_depth += 1
+            elif fallback_depth:
+                continue
+            elif tag == W + "r":
+                run_depth += 1
+            elif tag == W + "p":
+                paragraphs.append([])
+            elif tag == W + "tr":
+                rows.append([])
+            elif tag == W + "tc":
+                cells.append([])
+            elif tag in (W + "body", W + "hdr", W + "ftr"):
+                container = elem
+            continue
+
+        # end events
+        if tag == MC_FALLBACK:
+            fallback_depth -= 1
+        elif fallback_depth:
+            pass
+        elif tag == W + "t":
+            if paragraphs and elem.text:
+                paragraphs[-1].append(elem.text)
+        elif tag == W + "r":
+            run_depth -= 1
+        elif tag == W + "tab":
+            if paragraphs and run_depth:
+                paragraphs[-1].append("\t")
+        elif tag in (W + "br", W + "cr"):
+            if paragraphs:
+                paragraphs[-1].append("\n")
+        elif tag == W + "p":
+            if paragraphs:
+                line = emit("".join(paragraphs.pop()))
+                if line:
+                    yield line
+        elif tag == W + "tc":
+            if cells:
+                cell_text = " ".join(cells.pop())
+                if rows:
+                    rows[-1].append(cell_text)
+        elif tag == W + "tr":
+            if rows:
+                line = emit("\t".join(c for c in rows.pop() if c))
+                if line:
+                    yield line
+
+        # Drop consumed top-level blocks so the tree never grows with the document
+        if container is not None and tag in (W + "p", W + "tbl", W + "sdt") and not paragraphs and not cells:
+            container.clear()
+
+
+def extract_docx_text(file_path) -> str:
+    """
+    Extract text from a .docx file: headers, body (paragraphs, tables, text boxes), footers.
+
+    Args:
+        file_path: Path to the .docx file
+
+    Returns:
+        Text with one line per paragraph or table row
+    """
+    lines = []
+    with zipfile.ZipFile(file_path) as package:
+        names = package.namelist()
+        headers = sorted((n for n in names if _HEADER_PART.match(n)), key=_natural_key)
+        footers = sorted((n for n in names if _FOOTER_PART.match(n)), key=_natural_key)
+        for part in headers + ["word/document.xml"] + footers:
+            if part not in names:
+                continue
+            with package.open(part) as stream:
+                lines.extend(_iter_part_lines(stream))
+    return "\n".join(lines)
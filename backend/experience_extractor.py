@@ -0,0 +1,127 @@
+"""
+Linear-time extraction of "Title at Company (dates)" experience entries.
+
+The previous regex combined `[\\w\\s]+` with lazy `[\\w\\s\\-&\\.]+?` groups and optional
+date groups over the whole document, which backtracks badly on long, oddly
+formatted text. Here each line is tokenised once and fed through a small state
+machine, so the work is proportional to the length of the text.
+
+Recognised shapes (one per line, several per line are fine):
+    Senior Software Engineer at Google (2019 - Present)
+    Data Scientist, Acme Corp 2015-2018
+    Backend Developer | Initech [2012 to 2014]
+    ML Engineer @ Globex
+"""
+import re
+from collections import deque
+from typing import List, Tuple
+
+TITLE_KEYWORDS = {
+    "engineer", "developer", "manager", "analyst", "scientist", "consultant", "designer",
+    "architect", "specialist", "lead", "director", "coordinator", "intern", "associate",
+    "administrator",
+}
+SEPARATORS = {"at", "@", ",", "-", "|"}
+COMPANY_PUNCTUATION = {"-", "&", "."}
+OPEN_BRACKETS = {"(", "["}
+CLOSE_BRACKETS = {")", "]"}
+DATE_DASHES = {"-", "–", "—", "to"}
+OPEN_ENDED = {"present", "current"}
+# Words that end a company name ("Acme Corp from 2015")
+COMPANY_STOPWORDS = {"from", "since", "until", "during", "in"}
+
+# Longest role kept, in words (older text is dropped as the role window slides)
+MAX_ROLE_WORDS = 8
+
+# Word runs or single non-space characters; no nested quantifiers, so matching is linear
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+
+
+def _is_year(token: str) -> bool:
+    return len(token) == 4 and token.isdigit()
+
+
+def _parse_dates(tokens, i):
+    """
+    Parse an optional "(2019 - 2022)" / "2015-present" group starting at tokens[i].
+
+    Returns:
+        (start_year, end_year, next_index); years are "" when no complete range is found
+    """
+    j = i
+    if j < len(tokens) and tokens[j][0] in OPEN_BRACKETS:
+        j += 1
+    if j < len(tokens) and _is_year(tokens[j][0]):
+        start = tokens[j][0]
+        k = j + 1
+        dashes = 0
+        while k < len(tokens) and tokens[k][0].lower() in DATE_DASHES and dashes < 3:
+            k += 1
+            dashes += 1
+        if dashes and k < len(tokens) and (_is_year(tokens[k][0]) or tokens[k][0].lower() in OPEN_ENDED):
+            end = tokens[k][0]
+            k += 1
+            if k < len(tokens) and tokens[k][0] in CLOSE_BRACKETS:
+                k += 1
+            return start, end, k
+    return "", "", i
+
+
+def _extract_from_line(line: str, entries: list):
+    tokens = [(m.group(0), m.start(), m.end()) for m in _TOKEN.finditer(line)]
+    role_words = deque(maxlen=MAX_ROLE_WORDS)  # (start, end, is_title_keyword) of the current word run
+    i = 0
+    n = len(tokens)
+    while i < n:
+        token, start, end = tokens[i]
+        lowered = token.lower()
+
+        # A title keyword followed by a separator switches from role to company
+        if role_words and role_words[-1][2] and lowered in SEPARATORS:
+            role = line[role_words[0][0]:role_words[-1][1]]
+            i += 1
+            company_start = company_end = None
+            while i < n:
+                tok, s, e = tokens[i]
+                low = tok.lower()
+                if _is_year(tok) or tok in OPEN_BRACKETS or low in COMPANY_STOPWORDS:
+                    break
+                if tok[0].isalnum() or tok == "_" or (tok in COMPANY_PUNCTUATION and company_start is not None):
+                    if company_start is None:
+                        company_start = s
+                    company_end = e
+                    i += 1
+                    continue
+                if low in COMPANY_PUNCTUATION:
+                    i += 1
+                    continue
+                break
+            start_year, end_year, i = _parse_dates(tokens, i)
+            if company_start is not None:
+                company = line[company_start:company_end].strip(" -&.")
+                if company:
+                    entries.append((role.strip(), company, start_year, end_year))
+            role_words.clear()
+            continue
+
+        if token[0].isalnum() or token == "_":
+            # Word tokens extend the role; remember whether this one is a title keyword
+            role_words.append((start, end, lowered in TITLE_KEYWORDS))
+        else:
+            # Any other punctuation ends the current role
+            role_words.clear()
+        i += 1
+
+
+def extract_experience_entries(text: str) -> List[Tuple[str, str, str, str]]:
+    """
+    Find experience entries in resume text in time linear in its length.
+
+    Returns:
+        List of (role, company, start_year, end_year) tuples; the years are "" when absent.
+        This is the same shape the old regex's findall() returned.
+    """
+    entries: List[Tuple[str, str, str, str]] = []
+    for line in text.splitlines():
+        _extract_from_line(line, entries)
+    return entries
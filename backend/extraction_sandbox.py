@@ -0,0 +1,242 @@
+"""
+Sandboxed text extraction in isolated worker processes.
+
+A malicious or pathological PDF/image can pin a CPU or balloon memory inside
+extract_text. Jobs are therefore run in a small pool of subprocess workers with a
+per-job wall-clock timeout and an RSS limit (counted over the worker and the OCR
+processes it starts); a worker that breaches either is killed and replaced, and
+workers are recycled after a fixed number of jobs.
+Failures come back as a structured {"status": "extraction_failed", ...} result
+instead of an exception or a hung request.
+"""
+import os
+import time
+import signal
+import atexit
+import logging
+import threading
+import multiprocessing
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+EXTRACTION_SANDBOX = os.getenv("EXTRACTION_SANDBOX", "true").lower() == "true"
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", "2"))
+EXTRACTION_TIMEOUT_SECONDS = float(os.getenv("EXTRACTION_TIMEOUT_SECONDS", "60"))
+EXTRACTION_MAX_RSS_MB = int(os.getenv("EXTRACTION_MAX_RSS_MB", "1024"))
+EXTRACTION_MAX_JOBS_PER_WORKER = int(os.getenv("EXTRACTION_MAX_JOBS_PER_WORKER", "50"))
+EXTRACTION_START_METHOD = os.getenv("EXTRACTION_START_METHOD", "spawn")
+
+# How often the parent checks a running job's deadline and memory
+_POLL_INTERVAL = 0.1
+
+
+def _worker_main(conn):
+    """Worker loop: receive (file_path, file_type), reply with a result dict."""
+    # Own process group, so killing the worker also kills any OCR children it started
+    if hasattr(os, "setpgrp"):
+        os.setpgrp()
+    from ai_processor import extract_text
+
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            break
+        if job is None:
+            break
+        file_path, file_type = job
+        stats = {}
+        try:
+            text = extract_text(file_path, file_type, stats=stats)
+            conn.send({"status": "ok", "text": text, "stats": stats})
+        except Exception as e:
+            conn.send({"status": "extraction_failed", "reason": "error", "detail": str(e), "stats": stats})
+
+
+def _rss_mb(pid) -> Optional[float]:
+    """Current resident memory of a process in MB (Linux /proc), or None if unknown."""
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        return None
+    return None
+
+
+def _group_rss_mb(pgid) -> Optional[float]:
+    """
+    Resident memory in MB summed over a process group (Linux /proc), or None if unknown.
+
+    Workers lead their own group and OCR children inherit it, so this covers the
+    whole extraction, not just the worker process.
+    """
+    try:
+        pids = [name for name in os.listdir("/proc") if name.isdigit()]
+    except OSError:
+        return None
+    total = None
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/stat") as stat:
+                # Fields after the parenthesised command name: state, ppid, pgrp, ...
+                fields = stat.read().rsplit(")", 1)[1].split()
+        except (OSError, IndexError):
+            continue
+        if int(fields[2]) != pgid:
+            continue
+        rss = _rss_mb(pid)
+        if rss is not None:
+            total = (total or 0.0) + rss
+    return total
+
+
+class _Worker:
+    def __init__(self, ctx):
+        self.conn, child_conn = ctx.Pipe()
+        # Not a daemon: extract_text may start its own OCR process pool
+        self.process = ctx.Process(target=_worker_main, args=(child_conn,), daemon=False)
+        self.process.start()
+        child_conn.close()
+        self.jobs = 0
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except Exception:
+            pass
+        self.process.join(timeout=2)
+        if self.process.is_alive():
+            self.kill()
+
+    def kill(self):
+        try:
+            try:
+                os.killpg(self.process.pid, signal.SIGKILL)
+            except (AttributeError, OSError):
+                self.process.kill()
+            self.process.join(timeout=2)
+        finally:
+            self.conn.close()
+
+
+class ExtractionPool:
+    """Pool of isolated extraction workers with timeout, RSS limit and recycling."""
+
+    def __init__(self, size=EXTRACTION_WORKERS, timeout=EXTRACTION_TIMEOUT_SECONDS,
+                 max_rss_mb=EXTRACTION_MAX_RSS_MB, max_jobs_per_worker=EXTRACTION_MAX_JOBS_PER_WORKER):
+        self.timeout = timeout
+        self.max_rss_mb = max_rss_mb
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self._ctx = multiprocessing.get_context(EXTRACTION_START_METHOD)
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle: List[_Worker] = []
+        self._lock = threading.Lock()
+
+    def _acquire(self) -> _Worker:
+        self._slots.acquire()
+        with self._lock:
+            while self._idle:
+                worker = self._idle.pop()
+                if worker.process.is_alive():
+                    return worker
+        try:
+            return _Worker(self._ctx)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _release(self, worker: Optional[_Worker]):
+        if worker is not None:
+            if worker.jobs >= self.max_jobs_per_worker:
+                logger.info(f"[SANDBOX] Recycling extraction worker pid={worker.process.pid} after {worker.jobs} jobs")
+                worker.stop()
+            else:
+                with self._lock:
+                    self._idle.append(worker)
+        self._slots.release()
+
+    def extract(self, file_path, file_type, timeout: Optional[float] = None) -> dict:
+        """
+        Run extract_text in a worker.
+
+        Returns:
+            {"status": "ok", "text": ..., "stats": ...} on success, otherwise
+            {"status": "extraction_failed", "reason": "timeout" | "memory_limit" | "crashed" | "error", "detail": ...}
+        """
+        timeout = timeout or self.timeout
+        worker = self._acquire()
+        started = time.monotonic()
+        failure = None
+        try:
+            worker.conn.send((file_path, file_type))
+            while not worker.conn.poll(_POLL_INTERVAL):
+                elapsed = time.monotonic() - started
+                if elapsed > timeout:
+                    failure = {"reason": "timeout", "detail": f"Extraction exceeded {timeout:.0f}s"}
+                    break
+                rss = _group_rss_mb(worker.process.pid) if hasattr(os, "setpgrp") else _rss_mb(worker.process.pid)
+                if rss is not None and rss > self.max_rss_mb:
+                    failure = {"reason": "memory_limit", "detail": f"Worker and OCR processes RSS {rss:.0f}MB exceeded {self.max_rss_mb}MB"}
+                    break
+                if not worker.process.is_alive():
+                    failure = {"reason": "crashed", "detail": f"Worker exited with code {worker.process.exitcode}"}
+                    break
+            if failure is None:
+                result = worker.conn.recv()
+                worker.jobs += 1
+                return result
+        except (EOFError, OSError) as e:
+            failure = {"reason": "crashed", "detail": str(e)}
+        except BaseException:
+            # Never hand a worker with an in-flight job back to the pool
+            worker.kill()
+            worker = None
+            raise
+        finally:
+            if failure is not None and worker is not None:
+                logger.warning(f"[SANDBOX] Extraction of {file_path} failed ({failure['reason']}): {failure['detail']}; killing worker pid={worker.process.pid}")
+                worker.kill()
+                worker = None
+            self._release(worker)
+
+        return {"status": "extraction_failed", **failure, "stats": {"elapsed_ms": round((time.monotonic() - started) * 1000, 2)}}
+
+    def shutdown(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.stop()
+
+
+_pool: Optional[ExtractionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_extraction_pool() -> ExtractionPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ExtractionPool()
+            atexit.register(_pool.shutdown)
+    return _pool
+
+
+def extract_text_sandboxed(file_path, file_type) -> dict:
+    """
+    Extract text in an isolated worker (or in-process when EXTRACTION_SANDBOX is false).
+
+    Returns:
+        Result dict with "status" of "ok" (plus "text" and "stats") or "extraction_failed"
+    """
+    if not EXTRACTION_SANDBOX:
+        from ai_processor import extract_text
+
+        stats = {}
+        try:
+            return {"status": "ok", "text": extract_text(file_path, file_type, stats=stats), "stats": stats}
+        except Exception as e:
+            return {"status": "extraction_failed", "reason": "error", "detail": str(e), "stats": stats}
+    return get_extraction_pool().extract(file_path, file_type)
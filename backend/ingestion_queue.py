@@ -0,0 +1,366 @@
+"""
+Durable background queue for resume ingestion, backed by a local SQLite file.
+
+The upload request only spools the file to disk and enqueues a job; worker
+threads then run the slow part (storage upload, sandboxed extraction, parsing and
+the database writes). Jobs survive restarts: a job is leased while it runs, and a
+job whose lease expires (because the process died mid-job) is picked up again.
+Transient failures are retried with a growing delay; an IngestionFailed raised by
+the handler ends the job immediately with a structured reason. A job for a file
+the client is still uploading to storage waits as "awaiting_upload" until released,
+or until it expires.
+"""
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from typing import Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+INGESTION_QUEUE_PATH = os.path.abspath(os.getenv("INGESTION_QUEUE_PATH", "ingestion_queue.sqlite3"))
+INGESTION_SPOOL_DIR = os.path.abspath(os.getenv("INGESTION_SPOOL_DIR", "ingestion_spool"))
+INGESTION_WORKERS = int(os.getenv("INGESTION_WORKERS", "2"))
+INGESTION_MAX_ATTEMPTS = int(os.getenv("INGESTION_MAX_ATTEMPTS", "3"))
+INGESTION_RETRY_DELAY_SECONDS = float(os.getenv("INGESTION_RETRY_DELAY_SECONDS", "10"))
+# A job still "processing" after this long is assumed orphaned and is retried
+INGESTION_LEASE_SECONDS = float(os.getenv("INGESTION_LEASE_SECONDS", "600"))
+INGESTION_RETENTION_DAYS = float(os.getenv("INGESTION_RETENTION_DAYS", "7"))
+
+# Idle workers check for new jobs this often (enqueue also wakes them directly)
+_POLL_INTERVAL = 1.0
+# How often workers look for "awaiting_upload" jobs that were never completed
+_EXPIRY_SWEEP_INTERVAL = 60.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ingestion_jobs (
+    job_id        TEXT PRIMARY KEY,
+    payload       TEXT NOT NULL,
+    status        TEXT NOT NULL DEFAULT 'queued',
+    attempts      INTEGER NOT NULL DEFAULT 0,
+    result        TEXT,
+    error         TEXT,
+    available_at  REAL NOT NULL,
+    leased_until  REAL,
+    created_at    REAL NOT NULL,
+    updated_at    REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ingestion_jobs_ready ON ingestion_jobs (status, available_at);
+"""
+
+
+class IngestionFailed(Exception):
+    """Raised by a job handler for failures that retrying cannot fix (e.g. an unreadable file)."""
+
+    def __init__(self, reason: str, detail: str = ""):
+        super().__init__(f"{reason}: {detail}" if detail else reason)
+        self.reason = reason
+        self.detail = detail
+
+
+class IngestionQueue:
+    """SQLite job table with leasing, retries and per-job status/result."""
+
+    def __init__(self, path: str = INGESTION_QUEUE_PATH, max_attempts: int = INGESTION_MAX_ATTEMPTS,
+                 retry_delay: float = INGESTION_RETRY_DELAY_SECONDS, lease_seconds: float = INGESTION_LEASE_SECONDS):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.lease_seconds = lease_seconds
+        self._local = threading.local()
+        self._wakeup = threading.Event()
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            # Autocommit mode; multi-statement updates use explicit BEGIN IMMEDIATE
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=FULL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _row_to_job(row) -> Optional[dict]:
+        if row is None:
+            return None
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        job["error"] = json.loads(job["error"]) if job["error"] else None
+        return job
+
+    def enqueue(self, job_id: str, payload: dict, status: str = "queued"):
+        """
+        Add a job. Use status="awaiting_upload" for a job whose file is still being
+        uploaded elsewhere; it is not claimed until release() is called.
+        """
+        now = time.time()
+        self._connect().execute(
+            "INSERT INTO ingestion_jobs (job_id, payload, status, available_at, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (job_id, json.dumps(payload), status, now, now, now),
+        )
+        if status == "queued":
+            self._wakeup.set()
+
+    def release(self, job_id: str, payload_updates: Optional[dict] = None) -> bool:
+        """
+        Queue an "awaiting_upload" job for processing, merging payload_updates into its payload.
+
+        Returns:
+            False if the job does not exist or was already released
+        """
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT payload FROM ingestion_jobs WHERE job_id = ? AND status = 'awaiting_upload'", (job_id,)
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return False
+            payload = {**json.loads(row["payload"]), **(payload_updates or {})}
+            now = time.time()
+            conn.execute(
+                "UPDATE ingestion_jobs SET status = 'queued', payload = ?, available_at = ?, updated_at = ? WHERE job_id = ?",
+                (json.dumps(payload), now, now, job_id),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        self._wakeup.set()
+        return True
+
+    def claim(self) -> Optional[dict]:
+        """
+        Lease the oldest ready job (queued, or processing with an expired lease), or return None.
+
+        A job whose lease has expired max_attempts times is marked failed and returned
+        with status "failed" and its error instead, so the caller can run its failure
+        handling; it is not leased.
+        """
+        conn = self._connect()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT * FROM ingestion_jobs "
+                "WHERE (status = 'queued' AND available_at <= ?) OR (status = 'processing' AND leased_until < ?) "
+                "ORDER BY available_at LIMIT 1",
+                (now, now),
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            if row["status"] == "processing" and row["attempts"] >= self.max_attempts:
+                # The worker died on every attempt (e.g. the process was killed mid-job) - stop retrying
+                logger.warning(f"[INGEST] Job {row['job_id']} was interrupted {row['attempts']} times; marking it failed")
+                error = {"reason": "interrupted", "detail": "Worker stopped before the job finished"}
+                conn.execute(
+                    "UPDATE ingestion_jobs SET status = 'failed', error = ?, leased_until = NULL, updated_at = ? WHERE job_id = ?",
+                    (json.dumps(error), now, row["job_id"]),
+                )
+                conn.execute("COMMIT")
+                job = self._row_to_job(row)
+                job["status"] = "failed"
+                job["error"] = error
+                return job
+            if row["status"] == "processing":
+                logger.warning(f"[INGEST] Lease expired for job {row['job_id']}; retrying it")
+            conn.execute(
+                "UPDATE ingestion_jobs SET status = 'processing', attempts = attempts + 1, leased_until = ?, updated_at = ? "
+                "WHERE job_id = ?",
+                (now + self.lease_seconds, now, row["job_id"]),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        job = self._row_to_job(row)
+        job["status"] = "processing"
+        job["attempts"] += 1
+        return job
+
+    def complete(self, job_id: str, result: dict):
+        self._connect().execute(
+            "UPDATE ingestion_jobs SET status = 'done', result = ?, error = NULL, leased_until = NULL, updated_at = ? WHERE job_id = ?",
+            (json.dumps(result), time.time(), job_id),
+        )
+
+    def fail(self, job_id: str, attempts: int, reason: str, detail: str, retry: bool = True) -> bool:
+        """
+        Record a failed attempt.
+
+        Returns:
+            True if the job was re-queued for another attempt, False if it is now permanently failed
+        """
+        now = time.time()
+        error = json.dumps({"reason": reason, "detail": detail})
+        if retry and attempts < self.max_attempts:
+            self._connect().execute(
+                "UPDATE ingestion_jobs SET status = 'queued', error = ?, available_at = ?, leased_until = NULL, updated_at = ? "
+                "WHERE job_id = ?",
+                (error, now + self.retry_delay * attempts, now, job_id),
+            )
+            return True
+        self._connect().execute(
+            "UPDATE ingestion_jobs SET status = 'failed', error = ?, leased_until = NULL, updated_at = ? WHERE job_id = ?",
+            (error, now, job_id),
+        )
+        return False
+
+    def get(self, job_id: str) -> Optional[dict]:
+        row = self._connect().execute("SELECT * FROM ingestion_jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row)
+
+    def expire_uploads(self, max_age_seconds: float) -> List[dict]:
+        """
+        Mark "awaiting_upload" jobs older than max_age_seconds failed with reason
+        "upload_expired", and return them so their stored files can be removed.
+        """
+        conn = self._connect()
+        now = time.time()
+        error = {"reason": "upload_expired", "detail": "The upload was not completed in time"}
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = conn.execute(
+                "SELECT * FROM ingestion_jobs WHERE status = 'awaiting_upload' AND created_at < ?", (now - max_age_seconds,)
+            ).fetchall()
+            conn.executemany(
+                "UPDATE ingestion_jobs SET status = 'failed', error = ?, updated_at = ? WHERE job_id = ?",
+                [(json.dumps(error), now, row["job_id"]) for row in rows],
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        jobs = []
+        for row in rows:
+            job = self._row_to_job(row)
+            job["status"] = "failed"
+            job["error"] = error
+            jobs.append(job)
+        return jobs
+
+    def purge_finished(self, older_than_days: float = INGESTION_RETENTION_DAYS) -> int:
+        """Delete finished jobs older than the cutoff (uncompleted uploads expire into failed ones first)."""
+        cutoff = time.time() - older_than_days * 86400
+        cursor = self._connect().execute(
+            "DELETE FROM ingestion_jobs WHERE status IN ('done', 'failed') AND updated_at < ?", (cutoff,)
+        )
+        return cursor.rowcount
+
+    def wait_for_work(self, timeout: float):
+        self._wakeup.wait(timeout)
+        self._wakeup.clear()
+
+
+class IngestionWorkers:
+    """
+    Background threads that claim jobs from an IngestionQueue and run a handler on each.
+
+    Args:
+        handler: Called with the claimed job; returns the result dict stored on success
+        on_failure: Optional callback (job, error) run once a job has failed for good,
+            including "awaiting_upload" jobs that expire
+        upload_ttl: Seconds an "awaiting_upload" job may wait before it expires (None: never)
+    """
+
+    def __init__(self, queue: IngestionQueue, handler: Callable[[dict], dict],
+                 on_failure: Optional[Callable[[dict, dict], None]] = None, size: int = INGESTION_WORKERS,
+                 upload_ttl: Optional[float] = None):
+        self.queue = queue
+        self.handler = handler
+        self.on_failure = on_failure
+        self.size = size
+        self.upload_ttl = upload_ttl
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._sweep_lock = threading.Lock()
+        self._next_sweep = 0.0
+
+    def start(self):
+        # Before the purge, so old uncompleted uploads still reach on_failure
+        self._expire_uploads()
+        purged = self.queue.purge_finished()
+        if purged:
+            logger.info(f"[INGEST] Purged {purged} finished jobs older than {INGESTION_RETENTION_DAYS} days")
+        for i in range(self.size):
+            thread = threading.Thread(target=self._run, name=f"ingestion-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"[INGEST] Started {self.size} ingestion workers (queue: {self.queue.path})")
+
+    def stop(self, timeout: float = 5.0):
+        # An in-flight job is not lost: its lease expires and it is picked up on the next start
+        self._stop.set()
+        self.queue._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self._threads = []
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                job = self.queue.claim()
+            except Exception as e:
+                logger.warning(f"[INGEST] Could not claim a job: {e}")
+                job = None
+            if job is None:
+                self._expire_uploads()
+                self.queue.wait_for_work(_POLL_INTERVAL)
+                continue
+            if job["status"] == "failed":
+                # Interrupted too many times; notify and clean up as for any other permanent failure
+                self._failed(job, job["error"])
+                continue
+            self._process(job)
+
+    def _process(self, job: dict):
+        job_id = job["job_id"]
+        started = time.perf_counter()
+        try:
+            result = self.handler(job)
+            self.queue.complete(job_id, result or {})
+            logger.info(f"[INGEST] Job {job_id} done in {time.perf_counter() - started:.2f}s (attempt {job['attempts']})")
+        except IngestionFailed as e:
+            self.queue.fail(job_id, job["attempts"], e.reason, e.detail, retry=False)
+            logger.warning(f"[INGEST] Job {job_id} failed permanently: {e}")
+            self._failed(job, {"reason": e.reason, "detail": e.detail})
+        except Exception as e:
+            requeued = self.queue.fail(job_id, job["attempts"], "error", str(e))
+            logger.exception(f"[INGEST] Job {job_id} attempt {job['attempts']} failed; "
+                             f"{'will retry' if requeued else 'giving up'}")
+            if not requeued:
+                self._failed(job, {"reason": "error", "detail": str(e)})
+
+    def _expire_uploads(self):
+        """Expire uncompleted uploads, at most once per sweep interval across all workers."""
+        if self.upload_ttl is None or not self._sweep_lock.acquire(blocking=False):
+            return
+        try:
+            if time.monotonic() < self._next_sweep:
+                return
+            self._next_sweep = time.monotonic() + _EXPIRY_SWEEP_INTERVAL
+            for job in self.queue.expire_uploads(self.upload_ttl):
+                logger.info(f"[INGEST] Upload {job['job_id']} was not completed within {self.upload_ttl:.0f}s; expired")
+                self._failed(job, job["error"])
+        except Exception as e:
+            logger.warning(f"[INGEST] Could not expire uncompleted uploads: {e}")
+        finally:
+            self._sweep_lock.release()
+
+    def _failed(self, job: dict, error: dict):
+        if self.on_failure is None:
+            return
+        try:
+            self.on_failure(job, error)
+        except Exception as e:
+            logger.warning(f"[INGEST] Failure callback for job {job['job_id']} raised: {e}")
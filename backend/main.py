@@ -1,22 +1,44 @@
-from fastapi import FastAPI, Depends, HTTPException, UploadFile, File
+from fastapi import FastAPI, Depends, HTTPException, UploadFile, File, Query
 from fastapi.security import OAuth2PasswordBearer
 from supabase import create_client, Client
 import os
 from dotenv import load_dotenv
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi import Request
 from pydantic import BaseModel
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Literal
+import gc
+import heapq
+import threading
 import uuid
+import numpy as np
+import asyncio
 import logging
-from ai_processor import extract_text, extract_structured_data, rank_resumes, extract_skills_from_text
+from ai_processor import (
+    extract_text, extract_structured_data, rank_resumes_sharded, extract_skills_from_text, scoring_fingerprint,
+    SCORE_COMPONENTS, combine_component_scores, weight_vector, shutdown_ranking_pool, RANKING_SHARDS,
+    RANKING_SEMANTIC_FRACTION, SEMANTIC_BACKEND, semantic_model_name, lexical_components_sharded,
+    lexical_scores, fit_semantic_calibration,
+)
 import requests
 import httpx
 import time
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
 from requests.exceptions import RequestException, ConnectionError
 from urllib.parse import urlparse
 from email_service import send_decision_email
+from extraction_sandbox import extract_text_sandboxed
+from parse_cache import content_hash, get_cached_parse, store_parse, get_cached_embeddings, store_embeddings
+from db import AsyncDatabase, AuthError, DatabaseError
+from ingestion_queue import IngestionQueue, IngestionWorkers, IngestionFailed, INGESTION_SPOOL_DIR
+from ranking_jobs import RankingJobRegistry, RankingJob, RankingCancelled, RankingJobConflict
+from pagination import (
+    PAGE_DEFAULT_LIMIT, PAGE_MAX_LIMIT, InvalidCursor, Page, SortKey, decode_cursor, fetch_page,
+)
+from upload_validation import UploadRejected, read_upload, check_size, check_content, RESUME_MAX_UPLOAD_BYTES, SNIFF_BYTES
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -30,22 +52,49 @@ app = FastAPI()
 # Debug storage for last proxy request/response (temporary)
 rasa_proxy_last = {"payload": None, "response": None}
 
-# Create two separate clients:
-# - supabase_auth: used ONLY for auth operations (sign up/in, token validation)
-# - supabase_service: used for storage and database operations with the service role key (bypasses RLS)
+# Data access:
+# - db: async PostgREST/GoTrue client with a pooled connection; awaited by every endpoint
+# - supabase_service: sync client with the service role key (bypasses RLS), used for storage
+#   and by code running in worker threads (ingestion jobs, parse cache helpers)
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 # Prefer explicit variables if present; fall back to SUPABASE_KEY for service role
 SUPABASE_SERVICE_ROLE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY") or os.getenv("SUPABASE_KEY")
 SUPABASE_ANON_KEY = os.getenv("SUPABASE_ANON_KEY") or SUPABASE_SERVICE_ROLE_KEY
 
+# Reuse the stored file when the same candidate re-uploads identical bytes
+RESUME_DEDUP_REUSE_STORAGE = os.getenv("RESUME_DEDUP_REUSE_STORAGE", "true").lower() == "true"
+# Scores written per save_ranking_scores call, and parallel updates when the RPC is not deployed
+RANKING_WRITE_BATCH_SIZE = int(os.getenv("RANKING_WRITE_BATCH_SIZE", "500"))
+RANKING_WRITE_CONCURRENCY = int(os.getenv("RANKING_WRITE_CONCURRENCY", "10"))
+# Resumes fetched per keyset page when ranking; bounds memory regardless of applicant count
+RANKING_PAGE_SIZE = int(os.getenv("RANKING_PAGE_SIZE", "200"))
+# Full-quality (model) ranking runs at once per process; further runs use keyword-only
+# scoring and are upgraded in the background once the model is free. 0 disables the limit
+RANKING_MAX_FULL_RUNS = int(os.getenv("RANKING_MAX_FULL_RUNS", "2"))
+# How often a pending upgrade of keyword-only scores checks whether the model is free
+RANKING_UPGRADE_POLL_SECONDS = float(os.getenv("RANKING_UPGRADE_POLL_SECONDS", "30"))
+# Threads for the I/O stages (storage put, JD lookup) that run alongside parsing in ingestion jobs
+INGESTION_IO_THREADS = int(os.getenv("INGESTION_IO_THREADS", "4"))
+# How long a presigned direct-to-storage upload may take before /complete rejects it
+PRESIGNED_UPLOAD_TTL_SECONDS = int(os.getenv("PRESIGNED_UPLOAD_TTL_SECONDS", "900"))
+
 # Create supabase clients but don't crash import if keys are missing/invalid
-supabase_auth: Client = None
 supabase_service: Client = None
 try:
-    supabase_auth = create_client(SUPABASE_URL, SUPABASE_ANON_KEY)
     supabase_service = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
 except Exception as e:
     logging.warning(f"Could not create Supabase clients during import: {e}")
+db = AsyncDatabase(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY, anon_key=SUPABASE_ANON_KEY)
+
+
+@app.on_event("shutdown")
+async def close_db_pool():
+    await db.aclose()
+
+
+@app.on_event("shutdown")
+def stop_ranking_workers():
+    shutdown_ranking_pool()
 
 # Enable CORS
 # Configure allowed origins from environment variable `CORS_ORIGINS` (comma-separated).
@@ -68,12 +117,30 @@ else:
 
 logging.info(f"CORS allowed origins: {allowed_origins}")
 
+# Room for the multipart boundaries and part headers around the file itself
+_MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+# Registered before CORS so CORS stays the outer layer and the 413 carries its headers
+@app.middleware("http")
+async def reject_oversized_uploads(request: Request, call_next):
+    """Refuse a resume upload whose Content-Length is over the limit before the body is parsed."""
+    if request.method == "POST" and request.url.path.startswith("/upload-resume/"):
+        length = request.headers.get("content-length")
+        if length and length.isdigit() and int(length) > RESUME_MAX_UPLOAD_BYTES + _MULTIPART_OVERHEAD_BYTES:
+            return JSONResponse(status_code=413, content={
+                "detail": f"File exceeds the {RESUME_MAX_UPLOAD_BYTES} byte limit", "reason": "too_large"
+            })
+    return await call_next(request)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=allowed_origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Pagination metadata is sent in headers so list bodies keep their shape
+    expose_headers=["X-Next-Cursor", "X-Total-Count"],
 )
 
 
@@ -249,8 +316,7 @@ class UserPreferences(BaseModel):
 async def get_preferences(token: str = Depends(oauth2_scheme)):
     try:
         # Resolve user from token
-        res = supabase_auth.auth.get_user(token)
-        user = res.user
+        user = await db.auth.get_user(token)
         user_id = user.id
         prefs = {
             "email_notifications": True,
@@ -260,8 +326,8 @@ async def get_preferences(token: str = Depends(oauth2_scheme)):
 
         # Try user_profiles first
         try:
-            resp = supabase_service.table("user_profiles").select("email_notifications,status_updates,job_alerts").eq("user_id", user_id).limit(1).execute()
-            rows = getattr(resp, "data", []) or resp.get("data", [])
+            resp = await db.table("user_profiles").select("email_notifications,status_updates,job_alerts").eq("user_id", user_id).limit(1).execute()
+            rows = resp.data or []
             if rows:
                 row = rows[0]
                 prefs["email_notifications"] = bool(row.get("email_notifications", prefs["email_notifications"]))
@@ -272,8 +338,8 @@ async def get_preferences(token: str = Depends(oauth2_scheme)):
 
         # Fallback to users table
         try:
-            resp2 = supabase_service.table("users").select("email_notifications,status_updates,job_alerts").eq("user_id", user_id).limit(1).execute()
-            rows2 = getattr(resp2, "data", []) or resp2.get("data", [])
+            resp2 = await db.table("users").select("email_notifications,status_updates,job_alerts").eq("user_id", user_id).limit(1).execute()
+            rows2 = resp2.data or []
             if rows2:
                 row2 = rows2[0]
                 prefs["email_notifications"] = bool(row2.get("email_notifications", prefs["email_notifications"]))
@@ -291,8 +357,7 @@ async def get_preferences(token: str = Depends(oauth2_scheme)):
 async def set_preferences(prefs: UserPreferences, token: str = Depends(oauth2_scheme)):
     try:
         # Resolve user from token
-        res = supabase_auth.auth.get_user(token)
-        user = res.user
+        user = await db.auth.get_user(token)
         user_id = user.id
         payload = {
             "email_notifications": prefs.email_notifications,
@@ -302,13 +367,13 @@ async def set_preferences(prefs: UserPreferences, token: str = Depends(oauth2_sc
 
         updated = False
         try:
-            resp = supabase_service.table("user_profiles").update(payload).eq("user_id", user_id).execute()
+            resp = await db.table("user_profiles").update(payload).eq("user_id", user_id).execute()
             updated = True
         except Exception as e:
             logging.warning(f"[PREFERENCES] user_profiles update failed: {e}")
 
         try:
-            supabase_service.table("users").update(payload).eq("user_id", user_id).execute()
+            await db.table("users").update(payload).eq("user_id", user_id).execute()
             updated = True
         except Exception as e:
             logging.warning(f"[PREFERENCES] users update failed: {e}")
@@ -316,7 +381,7 @@ async def set_preferences(prefs: UserPreferences, token: str = Depends(oauth2_sc
         if not updated:
             # Try insert into user_profiles if missing
             try:
-                supabase_service.table("user_profiles").insert({"user_id": user_id, **payload}).execute()
+                await db.table("user_profiles").insert({"user_id": user_id, **payload}).execute()
                 updated = True
             except Exception:
                 pass
@@ -370,7 +435,7 @@ async def signup(user: User):
         logging.info(f"Signup attempt: email={user.email}, role={user.role}, name={user.name}")
         # Create user in Supabase Auth with role and name in user_metadata
         # Using options.data for user_metadata as per Supabase v2 Python client
-        response = supabase_auth.auth.sign_up({
+        response = await db.auth.sign_up({
             "email": user.email,
             "password": user.password,
             "options": {
@@ -386,7 +451,7 @@ async def signup(user: User):
             # Create user in both user_profiles and users tables
             try:
                 # Create in user_profiles table
-                supabase_service.table("user_profiles").insert({
+                await db.table("user_profiles").insert({
                     "user_id": response.user.id,
                     "email": user.email,
                     "role": user.role,
@@ -396,7 +461,7 @@ async def signup(user: User):
                 
                 # Also create in users table (for foreign key constraints)
                 try:
-                    supabase_service.table("users").insert({
+                    await db.table("users").insert({
                         "user_id": response.user.id,
                         "email": user.email,
                         "role": user.role,
@@ -422,12 +487,9 @@ async def signup(user: User):
 # Authentication
 async def get_current_user(token: str = Depends(oauth2_scheme)):
     try:
-        res = supabase_auth.auth.get_user(token)
-        user = res.user
-        # Extract role from user_metadata
-        role = user.user_metadata.get("role") if user.user_metadata else None
-        logging.info(f"Authenticated user: id={user.id}, email={user.email}, role={role}")
-        user.role = role  # Attach role for checks
+        # Awaited GoTrue call on the shared connection pool; role comes from user_metadata
+        user = await db.auth.get_user(token)
+        logging.info(f"Authenticated user: id={user.id}, email={user.email}, role={user.role}")
         return user
     except Exception as e:
         logging.exception("get_current_user error")
@@ -437,7 +499,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
 async def login(user: User):
     try:
         logging.info(f"Login attempt: email={user.email}")
-        response = supabase_auth.auth.sign_in_with_password({
+        response = await db.auth.sign_in_with_password({
             "email": user.email,
             "password": user.password
         })
@@ -465,8 +527,7 @@ async def login(user: User):
 async def update_name(request: UpdateNameRequest, token: str = Depends(oauth2_scheme)):
     try:
         # Get current user using their token
-        res = supabase_auth.auth.get_user(token)
-        user = res.user
+        user = await db.auth.get_user(token)
         user_id = user.id
         
         new_name = request.name.strip()
@@ -480,25 +541,14 @@ async def update_name(request: UpdateNameRequest, token: str = Depends(oauth2_sc
         current_role = user.user_metadata.get("role") if user.user_metadata else None
         
         # Update user_metadata in Supabase Auth using the user's own token
-        # We need to use the update_user method which works with the user's token
-        auth_headers = {
-            "apikey": SUPABASE_ANON_KEY,
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json"
-        }
-        auth_url = f"{SUPABASE_URL}/auth/v1/user"
-        auth_response = requests.put(
-            auth_url,
-            headers=auth_headers,
-            json={"data": {"name": new_name, "role": current_role}}
-        )
-        
-        if auth_response.status_code not in [200, 201]:
-            logging.error(f"Failed to update auth metadata: {auth_response.text}")
+        try:
+            await db.auth.update_user(token, {"data": {"name": new_name, "role": current_role}})
+        except AuthError as auth_error:
+            logging.error(f"Failed to update auth metadata: {auth_error}")
         
         # Update in user_profiles table
         try:
-            supabase_service.table("user_profiles").update({
+            await db.table("user_profiles").update({
                 "name": new_name
             }).eq("user_id", user_id).execute()
         except Exception as profile_error:
@@ -506,7 +556,7 @@ async def update_name(request: UpdateNameRequest, token: str = Depends(oauth2_sc
         
         # Update in users table
         try:
-            supabase_service.table("users").update({
+            await db.table("users").update({
                 "name": new_name
             }).eq("user_id", user_id).execute()
         except Exception as users_error:
@@ -524,8 +574,7 @@ async def update_name(request: UpdateNameRequest, token: str = Depends(oauth2_sc
 async def change_password(request: ChangePasswordRequest, token: str = Depends(oauth2_scheme)):
     try:
         # Get current user
-        res = supabase_auth.auth.get_user(token)
-        user = res.user
+        user = await db.auth.get_user(token)
         user_id = user.id
         user_email = user.email
         
@@ -533,7 +582,7 @@ async def change_password(request: ChangePasswordRequest, token: str = Depends(o
         
         # Verify current password by attempting to sign in
         try:
-            sign_in_response = supabase_auth.auth.sign_in_with_password({
+            sign_in_response = await db.auth.sign_in_with_password({
                 "email": user_email,
                 "password": request.current_password
             })
@@ -548,20 +597,10 @@ async def change_password(request: ChangePasswordRequest, token: str = Depends(o
             raise HTTPException(status_code=400, detail="New password must be at least 6 characters")
         
         # Update password using Supabase Auth API
-        auth_headers = {
-            "apikey": SUPABASE_ANON_KEY,
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json"
-        }
-        auth_url = f"{SUPABASE_URL}/auth/v1/user"
-        auth_response = requests.put(
-            auth_url,
-            headers=auth_headers,
-            json={"password": request.new_password}
-        )
-        
-        if auth_response.status_code not in [200, 201]:
-            logging.error(f"Failed to update password: {auth_response.text}")
+        try:
+            await db.auth.update_user(token, {"password": request.new_password})
+        except AuthError as auth_error:
+            logging.error(f"Failed to update password: {auth_error}")
             raise HTTPException(status_code=500, detail="Failed to update password")
         
         logging.info(f"Password updated successfully for user {user_id}")
@@ -576,17 +615,11 @@ async def change_password(request: ChangePasswordRequest, token: str = Depends(o
 async def refresh_token_endpoint(body: RefreshRequest):
     try:
         # Use Supabase Auth REST API for reliable refresh
-        url = f"{SUPABASE_URL}/auth/v1/token?grant_type=refresh_token"
-        headers = {
-            "apikey": SUPABASE_ANON_KEY,
-            "Authorization": f"Bearer {SUPABASE_ANON_KEY}",
-            "Content-Type": "application/json",
-        }
-        resp = requests.post(url, headers=headers, json={"refresh_token": body.refresh_token}, timeout=10)
-        if resp.status_code != 200:
-            logging.error(f"Refresh failed: {resp.status_code} {resp.text}")
+        try:
+            data = await db.auth.refresh_session(body.refresh_token)
+        except AuthError as auth_error:
+            logging.error(f"Refresh failed: {auth_error.status_code} {auth_error}")
             raise HTTPException(status_code=401, detail="Token refresh failed")
-        data = resp.json()
         return {
             "access_token": data.get("access_token"),
             "refresh_token": data.get("refresh_token", body.refresh_token),
@@ -609,10 +642,10 @@ async def create_job(job: JobPosting, user=Depends(get_current_user)):
     try:
         # Ensure user exists in users table (for foreign key constraint)
         try:
-            user_check = supabase_service.table("users").select("user_id").eq("user_id", user.id).execute()
+            user_check = await db.table("users").select("user_id").eq("user_id", user.id).execute()
             if not user_check.data:
                 # Create user in users table if not exists
-                supabase_service.table("users").insert({
+                await db.table("users").insert({
                     "user_id": user.id,
                     "email": user.email,
                     "role": user.role
@@ -629,7 +662,7 @@ async def create_job(job: JobPosting, user=Depends(get_current_user)):
             extracted_skills = extract_skills_from_text(job.requirements[0])
             processed_requirements = extracted_skills if extracted_skills else job.requirements
         
-        data = supabase_service.table("job_descriptions").insert({
+        data = await db.table("job_descriptions").insert({
             "hr_user_id": user.id,
             "title": job.title,
             "description": job.description,
@@ -643,12 +676,53 @@ async def create_job(job: JobPosting, user=Depends(get_current_user)):
         logging.exception("Error creating job")
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
+# Keyset orderings of the paginated lists; each ends with a unique column, and
+# migrations/008 has a matching index for each
+_JOB_KEYS = [SortKey("created_at", desc=True), SortKey("jd_id", desc=True)]
+_RESUME_KEYS = [SortKey("score", desc=True, nullable=True, nulls_first=False), SortKey("resume_id", desc=True)]
+_CANDIDATE_KEYS = [SortKey("match_score", desc=True, nullable=True, nulls_first=False), SortKey("application_id", desc=True)]
+_APPLICATION_KEYS = [SortKey("updated_at", desc=True), SortKey("application_id", desc=True)]
+_NOTIFICATION_KEYS = [SortKey("created_at", desc=True), SortKey("notif_id", desc=True)]
+
+
+def _page_after(cursor: Optional[str], tag: str, keys: List[SortKey]) -> Optional[tuple]:
+    if not cursor:
+        return None
+    try:
+        return decode_cursor(cursor, tag, keys)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _set_page_headers(response: Response, page: Page):
+    """Pagination metadata goes in headers so the list body keeps its shape."""
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+    if page.total is not None:
+        response.headers["X-Total-Count"] = str(page.total)
+
+
 @app.get("/jobs")
-async def get_jobs():
+async def get_jobs(response: Response, limit: Optional[int] = Query(None, ge=1, le=PAGE_MAX_LIMIT),
+                   cursor: Optional[str] = None, total: bool = False):
+    """
+    Open jobs. With limit (or a cursor from X-Next-Cursor) the list is paginated,
+    newest first; total=true adds X-Total-Count.
+    """
+    after = _page_after(cursor, "jobs", _JOB_KEYS)
     try:
+        if limit or cursor:
+            page = await fetch_page(
+                lambda count: db.table("job_descriptions").select("*", count=count).neq("status", "closed"),
+                _JOB_KEYS, limit or PAGE_DEFAULT_LIMIT, after, "jobs", total,
+            )
+            _set_page_headers(response, page)
+            return page.rows
         # Only return jobs that are not closed
-        response = supabase_service.table("job_descriptions").select("*").neq("status", "closed").execute()
-        return response.data
+        jobs_resp = await db.table("job_descriptions").select("*").neq("status", "closed").execute()
+        if total:
+            response.headers["X-Total-Count"] = str(len(jobs_resp.data or []))
+        return jobs_resp.data
     except Exception as e:
         logging.exception("Error fetching jobs")
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
@@ -656,7 +730,7 @@ async def get_jobs():
 @app.get("/jobs/{jd_id}")
 async def get_job_by_id(jd_id: str):
     try:
-        response = supabase_service.table("job_descriptions").select("*").eq("jd_id", jd_id).execute()
+        response = await db.table("job_descriptions").select("*").eq("jd_id", jd_id).execute()
         if not response.data or len(response.data) == 0:
             raise HTTPException(status_code=404, detail="Job not found")
         return response.data[0]
@@ -673,12 +747,12 @@ async def update_job_status(jd_id: str, status: Dict[str, str], user=Depends(get
         raise HTTPException(status_code=403, detail="Not authorized")
     try:
         # Verify job belongs to this HR user
-        job = supabase_service.table("job_descriptions").select("hr_user_id").eq("jd_id", jd_id).execute()
+        job = await db.table("job_descriptions").select("hr_user_id").eq("jd_id", jd_id).execute()
         if not job.data or job.data[0]["hr_user_id"] != user.id:
             raise HTTPException(status_code=403, detail="Not authorized to update this job")
         
         # Update job status
-        supabase_service.table("job_descriptions").update(status).eq("jd_id", jd_id).execute()
+        await db.table("job_descriptions").update(status).eq("jd_id", jd_id).execute()
         return {"message": "Job status updated successfully"}
     except HTTPException:
         raise
@@ -690,7 +764,323 @@ async def update_job_status(jd_id: str, status: Dict[str, str], user=Depends(get
 # Resume upload with AI parsing
 from fastapi import Header
 
-@app.post("/upload-resume/{jd_id}")
+def _public_url(file_name: str) -> Optional[str]:
+    """Normalize the storage client's public URL response to a plain string."""
+    _file_url_resp = supabase_service.storage.from_("resumes").get_public_url(file_name)
+    try:
+        if isinstance(_file_url_resp, dict):
+            # supabase-py v2 typically returns {"data": {"publicUrl": "..."}}
+            return (
+                _file_url_resp.get("data", {}).get("publicUrl")
+                or _file_url_resp.get("publicUrl")
+                or _file_url_resp.get("public_url")
+            )
+        # Fallback: treat as string
+        return str(_file_url_resp)
+    except Exception:
+        return None
+
+
+def _timed(func, *args, **kwargs):
+    """Run func and return (result, elapsed milliseconds)."""
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, (time.perf_counter() - started) * 1000
+
+
+def _store_resume_file(file_name: str, file_content: bytes, content_type: str) -> Optional[str]:
+    """Upload the resume to storage and return its public URL."""
+    # Use service role for storage and DB operations (bypasses RLS)
+    # Upload with content-disposition: inline to view in browser instead of download
+    supabase_service.storage.from_("resumes").upload(
+        file_name,
+        file_content,
+        {
+            "upsert": "true",
+            "contentType": content_type,
+            "cacheControl": "3600"
+        }
+    )
+    return _public_url(file_name)
+
+
+def _fetch_jd_for_upload(jd_id: str) -> Optional[dict]:
+    """Fetch JD for context-aware data storage; None if it cannot be loaded."""
+    try:
+        jd_response = supabase_service.table("job_descriptions").select("title, description, requirements").eq("jd_id", jd_id).execute()
+        if jd_response.data and len(jd_response.data) > 0:
+            return jd_response.data[0]
+    except Exception as jd_error:
+        logging.exception(f"Could not fetch JD data: {jd_error}")
+    return None
+
+
+# Storage puts and JD lookups for ingestion jobs overlap with parsing on these threads
+_ingest_io_pool = ThreadPoolExecutor(max_workers=INGESTION_IO_THREADS, thread_name_prefix="ingest-io")
+
+
+def _ingest_resume(job: dict) -> dict:
+    """
+    Ingestion worker: store, parse and record one spooled resume upload.
+
+    Runs in a background thread. Every step is safe to repeat, because a job whose
+    worker died is retried from the start.
+    """
+    payload = job["payload"]
+    resume_id = job["job_id"]
+    user_id = payload["user_id"]
+    jd_id = payload["jd_id"]
+    file_name = payload["file_name"]
+    content_type = payload["content_type"]
+    spool_path = payload["spool_path"]
+    digest = payload.get("content_hash")
+    from_storage = payload.get("source") == "storage"
+
+    job_started = time.perf_counter()
+    timings = {}
+    # The JD lookup depends on nothing else; start it right away
+    jd_future = _ingest_io_pool.submit(_timed, _fetch_jd_for_upload, jd_id)
+
+    if from_storage:
+        # Uploaded straight to storage with a presigned URL - fetch the bytes to parse them
+        file_content, timings["download"] = _timed(supabase_service.storage.from_("resumes").download, file_name)
+        try:
+            # /complete checked the stored size and leading bytes; re-check what was actually fetched
+            check_size(len(file_content))
+            check_content(file_content[:SNIFF_BYTES], content_type)
+        except UploadRejected as e:
+            _remove_uploaded_file(file_name)
+            raise IngestionFailed(e.reason, e.detail)
+        os.makedirs(os.path.dirname(spool_path), exist_ok=True)
+        with open(spool_path, "wb") as f:
+            f.write(file_content)
+        digest = content_hash(file_content)
+    else:
+        with open(spool_path, "rb") as f:
+            file_content = f.read()
+
+    cached_parse, timings["cache"] = _timed(get_cached_parse, supabase_service, digest)
+
+    storage_future = None
+    if from_storage:
+        # The client already put the file in storage
+        file_url = _public_url(file_name)
+    elif (cached_parse and RESUME_DEDUP_REUSE_STORAGE and cached_parse.get("file_url")
+            and cached_parse.get("user_id") == user_id):
+        # Identical bytes already stored for this candidate - skip the duplicate storage upload
+        file_name = cached_parse.get("file_name") or file_name
+        file_url = cached_parse["file_url"]
+        logging.info(f"[RESUME UPLOAD] Reusing stored file {file_name} for content hash {digest}")
+    else:
+        # Storage put runs on the I/O pool while this thread parses
+        storage_future = _ingest_io_pool.submit(_timed, _store_resume_file, file_name, file_content, content_type)
+
+    if cached_parse:
+        # Same bytes were parsed before with this parser version - reuse the result
+        text = cached_parse.get("extracted_text") or ""
+        structured_data = cached_parse.get("structured_data") or {}
+        logging.info(f"[RESUME UPLOAD] Parse cache hit for content hash {digest}")
+    else:
+        parse_started = time.perf_counter()
+        # Runs in an isolated worker with a timeout and memory limit
+        extraction = extract_text_sandboxed(spool_path, content_type)
+        extraction_stats = extraction.get("stats") or {}
+        if extraction["status"] != "ok":
+            logging.warning(f"[RESUME UPLOAD] Extraction failed for {file_name}: {extraction.get('reason')} {extraction.get('detail')}")
+            raise IngestionFailed("extraction_failed", f"{extraction.get('reason')}: {extraction.get('detail')}")
+        text = extraction["text"]
+        structured_data = extract_structured_data(text)
+        timings["parse"] = (time.perf_counter() - parse_started) * 1000
+        logging.info(f"[RESUME UPLOAD] Extraction engine={extraction_stats.get('engine')} elapsed_ms={extraction_stats.get('elapsed_ms')}")
+
+    if storage_future is not None:
+        file_url, timings["storage"] = storage_future.result()
+    jd_data, timings["jd"] = jd_future.result()
+    concurrent_ms = (time.perf_counter() - job_started) * 1000
+
+    if not cached_parse:
+        store_parse(supabase_service, digest, text, structured_data,
+                    user_id=user_id, file_name=file_name, file_url=file_url)
+
+    # Debug logging for resume parsing
+    logging.info(f"[RESUME UPLOAD DEBUG] Extracted text length: {len(text)}")
+    logging.info(f"[RESUME UPLOAD DEBUG] Skills: {structured_data.get('skills')}")
+    logging.info(f"[RESUME UPLOAD DEBUG] Experience: {structured_data.get('experience')}")
+    if jd_data:
+        logging.info(f"[RESUME UPLOAD] Fetched JD: {jd_data.get('title')}")
+
+    # Generate neutral insights for candidate improvement
+    insights = "" if "project" in text.lower() else "Add specific project details for stronger impact."
+
+    # Calculate skill match for quick reference
+    skill_match_count = 0
+    if jd_data and jd_data.get("requirements"):
+        resume_skills_lower = [s.lower() for s in structured_data.get("skills", [])]
+        jd_requirements = jd_data.get("requirements", [])
+        if isinstance(jd_requirements, list):
+            for jd_skill in jd_requirements:
+                if jd_skill and jd_skill.lower() in resume_skills_lower:
+                    skill_match_count += 1
+
+    resume_data = {
+        "resume_id": resume_id,
+        "user_id": user_id,
+        "jd_id": jd_id,
+        "file_url": file_url,
+        "extracted_text": text,
+        "insights": insights,
+        "content_hash": digest
+    }
+
+    # Add optional fields only if they exist
+    if "skills" in structured_data:
+        resume_data["skills"] = structured_data["skills"]
+    if "experience" in structured_data:
+        resume_data["experience"] = structured_data["experience"]
+    if "education" in structured_data:
+        resume_data["education"] = structured_data["education"]
+
+    logging.info(f"[RESUME UPLOAD] Inserting resume data")
+    _write_resume_application(
+        resume_data,
+        {"user_id": user_id, "jd_id": jd_id, "status": "applied"},
+        # Notification for the candidate
+        {"user_id": user_id, "message": f"Resume uploaded successfully for job posting", "type": "system"},
+    )
+
+    _remove_spool_file(spool_path)
+    total_ms = (time.perf_counter() - job_started) * 1000
+    stages = " ".join(f"{name}={ms:.0f}ms" for name, ms in timings.items())
+    # With the stages overlapped, the concurrent section should be close to the slowest single stage
+    logging.info(f"[INGEST TIMING] resume={resume_id} {stages} | concurrent_section={concurrent_ms:.0f}ms "
+                 f"(sum of stages {sum(timings.values()):.0f}ms) writes={total_ms - concurrent_ms:.0f}ms total={total_ms:.0f}ms")
+    return {"resume_id": resume_id, "insights": insights}
+
+
+# Cleared the first time the RPC turns out not to be deployed (migration 002 not applied)
+_submit_rpc_available = True
+
+
+def _is_missing_function_error(error: Exception) -> bool:
+    return getattr(error, "code", None) == "PGRST202" or "Could not find the function" in str(error)
+
+
+def _write_resume_application(resume_data: dict, application_data: dict, notification_data: dict):
+    """
+    Insert the resume, its application and the candidate notification.
+
+    Uses the submit_resume_application Postgres function (migrations/002) so all three
+    rows are written atomically in one round trip; it is a no-op returning the existing
+    ids when the resume_id is already stored, so retried jobs are safe. Falls back to
+    separate inserts while the function is not deployed.
+    """
+    global _submit_rpc_available
+    resume_id = resume_data["resume_id"]
+    if _submit_rpc_available:
+        try:
+            result = supabase_service.rpc("submit_resume_application", {
+                "p_resume": resume_data,
+                "p_application": application_data,
+                "p_notification": notification_data,
+            }).execute().data or {}
+            logging.info(f"[RESUME UPLOAD SUCCESS] Resume {resume_id} stored with application "
+                         f"{result.get('application_id')} (created={result.get('created')})")
+            return
+        except Exception as rpc_error:
+            if not _is_missing_function_error(rpc_error):
+                raise
+            _submit_rpc_available = False
+            logging.warning("[RESUME UPLOAD] submit_resume_application is not deployed "
+                            "(apply migrations/002_submit_resume_application.sql); using separate inserts")
+
+    # Upsert on the pre-assigned id so a retried job does not create a second row
+    supabase_service.table("resumes").upsert(resume_data, on_conflict="resume_id").execute()
+    logging.info(f"[RESUME UPLOAD SUCCESS] Resume stored with ID: {resume_id}")
+
+    try:
+        existing_app = supabase_service.table("applications").select("application_id").eq("resume_id", resume_id).execute()
+        if not existing_app.data:
+            supabase_service.table("applications").insert({**application_data, "resume_id": resume_id}).execute()
+        logging.info(f"[RESUME UPLOAD SUCCESS] Application created for resume {resume_id}")
+    except Exception as app_insert_error:
+        logging.exception(f"[RESUME UPLOAD ERROR] Failed to create application")
+        # Don't fail the whole upload if the application insert fails
+
+    try:
+        supabase_service.table("notifications").insert(notification_data).execute()
+    except Exception as notif_error:
+        logging.warning(f"Could not create notification: {notif_error}")
+
+
+def _remove_spool_file(spool_path: str):
+    try:
+        os.remove(spool_path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logging.warning(f"[INGEST] Could not remove spooled file {spool_path}: {e}")
+
+
+def _remove_uploaded_file(file_name: str):
+    """Delete a presigned upload's object that will never become a resume."""
+    try:
+        supabase_service.storage.from_("resumes").remove([file_name])
+    except Exception as e:
+        logging.warning(f"[INGEST] Could not remove uploaded file {file_name}: {e}")
+
+
+def _ingestion_failed(job: dict, error: dict):
+    """Tell the candidate their upload could not be processed and drop the spooled file."""
+    payload = job["payload"]
+    _remove_spool_file(payload["spool_path"])
+    if error.get("reason") == "upload_expired":
+        # The candidate never completed the upload; just drop whatever reached storage
+        _remove_uploaded_file(payload["file_name"])
+        return
+    try:
+        supabase_service.table("notifications").insert({
+            "user_id": payload["user_id"],
+            "message": f"We could not process your resume {payload.get('original_filename') or ''}".rstrip() + ". Please try uploading it again.",
+            "type": "system"
+        }).execute()
+    except Exception as notif_error:
+        logging.warning(f"Could not create notification: {notif_error}")
+
+
+ingestion_queue = IngestionQueue()
+ingestion_workers = IngestionWorkers(ingestion_queue, _ingest_resume, on_failure=_ingestion_failed,
+                                     upload_ttl=PRESIGNED_UPLOAD_TTL_SECONDS)
+
+
+@app.on_event("startup")
+def start_ingestion_workers():
+    ingestion_workers.start()
+
+
+@app.on_event("shutdown")
+def stop_ingestion_workers():
+    ingestion_workers.stop()
+
+
+def _spool_and_enqueue(resume_id: str, spool_path: str, file_content: bytes, payload: dict):
+    os.makedirs(INGESTION_SPOOL_DIR, exist_ok=True)
+    with open(spool_path, "wb") as f:
+        f.write(file_content)
+        f.flush()
+        os.fsync(f.fileno())
+    ingestion_queue.enqueue(resume_id, payload)
+
+
+RESUME_CONTENT_TYPES = [
+    "application/pdf",
+    "application/msword",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "image/png",
+    "image/jpeg"
+]
+
+
+@app.post("/upload-resume/{jd_id}", status_code=202)
 async def upload_resume(
     jd_id: str,
     file: UploadFile = File(...),
@@ -698,201 +1088,1014 @@ async def upload_resume(
     token: str = Depends(oauth2_scheme),
     refresh_token: str = Header(None)
 ):
+    """
+    Accept a resume and queue it for parsing.
+
+    The file is spooled to local disk and an ingestion job is queued; parsing and the
+    database writes happen in the background. Poll GET /upload-status/{resume_id}
+    (or watch notifications) to learn when the resume has been parsed.
+    """
     if user.role not in ["job_seeker", "demo_candidate", "Candidate"]:
         raise HTTPException(status_code=403, detail="Not authorized")
-    if file.content_type not in [
-        "application/pdf",
-        "application/msword",
-        "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        "image/png",
-        "image/jpeg"
-    ]:
+    if file.content_type not in RESUME_CONTENT_TYPES:
         raise HTTPException(status_code=400, detail="Invalid file type")
     try:
-        file_content = await file.read()
-        file_name = f"{uuid.uuid4()}_{file.filename}"
-        
-        # Use service role for storage and DB operations (bypasses RLS)
-        # User authentication is already verified by get_current_user dependency
-        # Upload with content-disposition: inline to view in browser instead of download
-        supabase_service.storage.from_("resumes").upload(
-            file_name, 
-            file_content, 
-            {
-                "upsert": "true",
-                "contentType": file.content_type,
-                "cacheControl": "3600"
-            }
-        )
-        # Normalize public URL to a plain string
-        _file_url_resp = supabase_service.storage.from_("resumes").get_public_url(file_name)
-        file_url = None
-        try:
-            if isinstance(_file_url_resp, dict):
-                # supabase-py v2 typically returns {"data": {"publicUrl": "..."}}
-                file_url = (
-                    _file_url_resp.get("data", {}).get("publicUrl")
-                    or _file_url_resp.get("publicUrl")
-                    or _file_url_resp.get("public_url")
-                )
-            else:
-                # Fallback: treat as string
-                file_url = str(_file_url_resp)
-        except Exception:
-            file_url = None
-        # Save file temporarily for AI parsing
-        temp_file = f"temp_{file_name}"
-        with open(temp_file, "wb") as f:
-            f.write(file_content)
-        text = extract_text(temp_file, file.content_type)
-        structured_data = extract_structured_data(text)
-        
-        # Debug logging for resume parsing
-        logging.info(f"[RESUME UPLOAD DEBUG] Extracted text length: {len(text)}")
-        logging.info(f"[RESUME UPLOAD DEBUG] Structured data: {structured_data}")
-        logging.info(f"[RESUME UPLOAD DEBUG] Skills: {structured_data.get('skills')}")
-        logging.info(f"[RESUME UPLOAD DEBUG] Experience: {structured_data.get('experience')}")
-        
-        # Fetch JD for context-aware data storage
-        jd_data = None
-        try:
-            jd_response = supabase_service.table("job_descriptions").select("title, description, requirements").eq("jd_id", jd_id).execute()
-            logging.info(f"[RESUME UPLOAD DEBUG] JD response: {jd_response}")
-            if jd_response.data and len(jd_response.data) > 0:
-                jd_data = jd_response.data[0]
-                logging.info(f"[RESUME UPLOAD] Fetched JD: {jd_data.get('title')}")
-        except Exception as jd_error:
-            logging.exception(f"Could not fetch JD data: {jd_error}")
-        
-        # Generate neutral insights for candidate improvement
-        insights = "" if "project" in text.lower() else "Add specific project details for stronger impact."
-        
-        # Calculate skill match for quick reference
-        skill_match_count = 0
-        if jd_data and jd_data.get("requirements"):
-            resume_skills_lower = [s.lower() for s in structured_data.get("skills", [])]
-            jd_requirements = jd_data.get("requirements", [])
-            if isinstance(jd_requirements, list):
-                for jd_skill in jd_requirements:
-                    if jd_skill and jd_skill.lower() in resume_skills_lower:
-                        skill_match_count += 1
-        
-        # Use service role client (bypasses RLS) - user already authenticated via get_current_user
-        resume_data = {
+        # Size cap and magic-byte check happen while reading, before the file is spooled
+        file_content = await read_upload(file, file.content_type)
+    except UploadRejected as e:
+        logging.warning(f"[RESUME UPLOAD] Rejected {file.filename}: {e.reason} ({e.detail})")
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    try:
+        resume_id = str(uuid.uuid4())
+        spool_path = os.path.join(INGESTION_SPOOL_DIR, f"{resume_id}{os.path.splitext(file.filename or '')[1]}")
+        # fsync of the spool file and the queue write happen off the event loop
+        await run_in_threadpool(_spool_and_enqueue, resume_id, spool_path, file_content, {
             "user_id": user.id,
             "jd_id": jd_id,
-            "file_url": file_url,
-            "extracted_text": text,
-            "insights": insights
-        }
-        
-        # Add optional fields only if they exist
-        if "skills" in structured_data:
-            resume_data["skills"] = structured_data["skills"]
-        if "experience" in structured_data:
-            resume_data["experience"] = structured_data["experience"]
-        if "education" in structured_data:
-            resume_data["education"] = structured_data["education"]
-        
-        logging.info(f"[RESUME UPLOAD] Inserting resume data")
-        
-        try:
-            data = supabase_service.table("resumes").insert(resume_data).execute()
-            logging.info(f"[RESUME UPLOAD SUCCESS] Resume inserted with ID: {data.data[0]['resume_id']}")
-        except Exception as resume_insert_error:
-            logging.exception(f"[RESUME UPLOAD ERROR] Failed to insert resume")
-            raise HTTPException(status_code=500, detail=f"Failed to insert resume: {str(resume_insert_error)}")
-        
+            "file_name": f"{uuid.uuid4()}_{file.filename}",
+            "original_filename": file.filename,
+            "content_type": file.content_type,
+            "spool_path": spool_path,
+            "content_hash": content_hash(file_content),
+        })
+        logging.info(f"[RESUME UPLOAD] Queued resume {resume_id} ({len(file_content)} bytes) for job {jd_id}")
+        return JSONResponse(status_code=202, content={
+            "message": "Resume received and queued for processing",
+            "resume_id": resume_id,
+            "status": "processing",
+            "status_url": f"/upload-status/{resume_id}",
+        })
+    except Exception as e:
+        logging.exception("Error queueing resume upload")
+        raise HTTPException(status_code=500, detail=f"Could not queue resume: {str(e)}")
+
+
+class PresignUploadRequest(BaseModel):
+    filename: str
+    content_type: str
+    size: Optional[int] = None
+
+
+class CompleteUploadRequest(BaseModel):
+    resume_id: str
+
+
+@app.post("/upload-resume/{jd_id}/presign")
+async def presign_resume_upload(jd_id: str, body: PresignUploadRequest, user=Depends(get_current_user)):
+    """
+    Start a direct-to-storage upload.
+
+    Returns a signed URL the client PUTs the file to, so the bytes never pass through
+    this server. Call POST /upload-resume/{jd_id}/complete afterwards to queue parsing.
+    """
+    if user.role not in ["job_seeker", "demo_candidate", "Candidate"]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    if body.content_type not in RESUME_CONTENT_TYPES:
+        raise HTTPException(status_code=400, detail="Invalid file type")
+    try:
+        check_size(body.size)
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    filename = os.path.basename(body.filename)
+    resume_id = str(uuid.uuid4())
+    file_name = f"{uuid.uuid4()}_{filename}"
+    try:
+        signed = await db.storage.create_signed_upload_url("resumes", file_name)
+        await run_in_threadpool(ingestion_queue.enqueue, resume_id, {
+            "user_id": user.id,
+            "jd_id": jd_id,
+            "file_name": file_name,
+            "original_filename": filename,
+            "content_type": body.content_type,
+            "spool_path": os.path.join(INGESTION_SPOOL_DIR, f"{resume_id}{os.path.splitext(filename)[1]}"),
+            "content_hash": None,
+            "source": "storage",
+        }, "awaiting_upload")
+    except Exception as e:
+        logging.exception("Error creating presigned upload")
+        raise HTTPException(status_code=500, detail=f"Could not start upload: {str(e)}")
+    logging.info(f"[RESUME UPLOAD] Presigned upload {resume_id} for job {jd_id}")
+    return {
+        "resume_id": resume_id,
+        "upload_url": signed["signed_url"],
+        "token": signed["token"],
+        "path": file_name,
+        # Lifetime of the signed URL itself; /complete must follow within complete_within
+        "expires_in": signed["expires_in"],
+        "complete_within": PRESIGNED_UPLOAD_TTL_SECONDS,
+    }
+
+
+async def _remove_stored_upload(file_name: str):
+    try:
+        await db.storage.remove("resumes", [file_name])
+    except Exception as e:
+        logging.warning(f"[RESUME UPLOAD] Could not remove uploaded file {file_name}: {e}")
+
+
+@app.post("/upload-resume/{jd_id}/complete", status_code=202)
+async def complete_resume_upload(jd_id: str, body: CompleteUploadRequest, user=Depends(get_current_user)):
+    """
+    Queue a presigned upload for parsing once the file is in storage.
+
+    Safe to call twice: a job that is already queued just reports its status.
+    """
+    job = await run_in_threadpool(ingestion_queue.get, body.resume_id)
+    if job is None or job["payload"].get("user_id") != user.id or job["payload"].get("jd_id") != jd_id:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    processing = {
+        "message": "Resume received and queued for processing",
+        "resume_id": body.resume_id,
+        "status": "processing",
+        "status_url": f"/upload-status/{body.resume_id}",
+    }
+    if job["status"] != "awaiting_upload":
+        return JSONResponse(status_code=202, content=processing)
+    if time.time() - job["created_at"] > PRESIGNED_UPLOAD_TTL_SECONDS:
+        await run_in_threadpool(ingestion_queue.fail, body.resume_id, job["attempts"], "upload_expired",
+                                "The upload was not completed in time", False)
+        await _remove_stored_upload(job["payload"]["file_name"])
+        raise HTTPException(status_code=410, detail="Upload expired; please upload the file again")
+
+    file_name = job["payload"]["file_name"]
+    try:
+        info = await db.storage.object_info("resumes", file_name)
+    except Exception as e:
+        logging.exception("Error checking uploaded file")
+        raise HTTPException(status_code=500, detail=f"Could not verify upload: {str(e)}")
+    if info is None:
+        raise HTTPException(status_code=409, detail="File has not been uploaded yet")
+    try:
+        # Validate the stored object before a worker downloads it: size first, then a ranged read for the magic bytes
+        check_size(info["size"])
+        check_content(await db.storage.read_head("resumes", file_name, SNIFF_BYTES), job["payload"]["content_type"])
+    except UploadRejected as e:
+        logging.warning(f"[RESUME UPLOAD] Rejected presigned upload {body.resume_id}: {e.reason} ({e.detail})")
+        await run_in_threadpool(ingestion_queue.fail, body.resume_id, job["attempts"], e.reason, e.detail, False)
+        await _remove_stored_upload(file_name)
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+    if not await run_in_threadpool(ingestion_queue.release, body.resume_id, {"size": info["size"]}):
+        # The job left awaiting_upload meanwhile: a concurrent /complete queued it, or it expired
+        job = await run_in_threadpool(ingestion_queue.get, body.resume_id)
+        if job is None or job["status"] == "failed":
+            if job is not None and (job["error"] or {}).get("reason") != "upload_expired":
+                raise HTTPException(status_code=409, detail=f"Upload failed: {(job['error'] or {}).get('detail')}")
+            raise HTTPException(status_code=410, detail="Upload expired; please upload the file again")
+        return JSONResponse(status_code=202, content=processing)
+    logging.info(f"[RESUME UPLOAD] Queued presigned upload {body.resume_id} ({info['size']} bytes) for job {jd_id}")
+    return JSONResponse(status_code=202, content=processing)
+
+
+@app.get("/upload-status/{resume_id}")
+async def get_upload_status(resume_id: str, user=Depends(get_current_user)):
+    """
+    Report the ingestion status of an uploaded resume.
+
+    Returns:
+        {"resume_id", "status": "awaiting_upload" | "processing" | "parsed" | "failed", ...}; "parsed" includes
+        the insights, "failed" includes a reason such as "extraction_failed"
+    """
+    job = await run_in_threadpool(ingestion_queue.get, resume_id)
+    if job is None:
+        # Finished jobs are purged after a while; fall back to the resumes table
         try:
-            supabase_service.table("applications").insert({
-                "user_id": user.id,
-                "jd_id": jd_id,
-                "resume_id": data.data[0]["resume_id"],
-                "status": "applied"
-            }).execute()
-            logging.info(f"[RESUME UPLOAD SUCCESS] Application created for resume {data.data[0]['resume_id']}")
-        except Exception as app_insert_error:
-            logging.exception(f"[RESUME UPLOAD ERROR] Failed to create application")
-            # Don't fail the whole upload if notification fails
-            pass
-        
-        os.remove(temp_file)
-        
-        # Create notification for candidate
+            res = await db.table("resumes").select("resume_id, user_id, insights").eq("resume_id", resume_id).execute()
+        except Exception as e:
+            logging.exception("[UPLOAD STATUS] Resume lookup failed")
+            raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+        if not res.data or (res.data[0].get("user_id") != user.id and user.role not in ["HR", "demo_hr"]):
+            raise HTTPException(status_code=404, detail="Upload not found")
+        return {"resume_id": resume_id, "status": "parsed", "insights": res.data[0].get("insights") or ""}
+
+    if job["payload"].get("user_id") != user.id and user.role not in ["HR", "demo_hr"]:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    if job["status"] == "done":
+        return {"resume_id": resume_id, "status": "parsed", "insights": (job["result"] or {}).get("insights", "")}
+    if job["status"] == "failed":
+        error = job["error"] or {}
+        return {"resume_id": resume_id, "status": "failed", "reason": error.get("reason"), "detail": error.get("detail")}
+    if job["status"] == "awaiting_upload":
+        return {"resume_id": resume_id, "status": "awaiting_upload"}
+    return {"resume_id": resume_id, "status": "processing", "attempts": job["attempts"]}
+
+# Cleared the first time the RPC turns out not to be deployed (migration 003 not applied)
+_save_scores_rpc_available = True
+
+
+async def _save_ranking_scores(rows: List[dict], progress=None) -> str:
+    """
+    Write score/explanation to resumes and match_score to applications for every row.
+
+    Sends the rows in chunks of RANKING_WRITE_BATCH_SIZE to the save_ranking_scores
+    Postgres function (migrations/003), one round trip per chunk. While the function is
+    not deployed, falls back to per-resume updates, RANKING_WRITE_CONCURRENCY at a time.
+
+    Args:
+        progress: Optional callback ("write", processed, total), called before each batch
+    Returns:
+        A short description of the write path used, for the timing log
+    """
+    global _save_scores_rpc_available
+    if _save_scores_rpc_available:
         try:
-            supabase_service.table("notifications").insert({
-                "user_id": user.id,
-                "message": f"Resume uploaded successfully for job posting",
-                "type": "system"
-            }).execute()
-        except Exception as notif_error:
-            logging.warning(f"Could not create notification: {notif_error}")
-        
-        return {"message": "Resume uploaded successfully", "resume_id": data.data[0]["resume_id"], "insights": insights}
-    except Exception as e:
-        logging.exception("Error inserting resume or application")
-        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+            batches = 0
+            for start in range(0, len(rows), RANKING_WRITE_BATCH_SIZE):
+                if progress:
+                    progress("write", start, len(rows))
+                await db.rpc("save_ranking_scores", {"p_scores": rows[start:start + RANKING_WRITE_BATCH_SIZE]}).execute()
+                batches += 1
+            return f"rpc, {batches} batches"
+        except Exception as rpc_error:
+            if not _is_missing_function_error(rpc_error):
+                raise
+            _save_scores_rpc_available = False
+            logging.warning("[RANK] save_ranking_scores is not deployed "
+                            "(apply migrations/003_save_ranking_scores.sql); using per-resume updates")
+
+    semaphore = asyncio.Semaphore(RANKING_WRITE_CONCURRENCY)
+
+    async def write(row):
+        async with semaphore:
+            await db.table("resumes").update(
+                {key: value for key, value in row.items() if key != "resume_id"}
+            ).eq("resume_id", row["resume_id"]).execute()
+            await db.table("applications").update({"match_score": row["score"]}).eq("resume_id", row["resume_id"]).execute()
+
+    for start in range(0, len(rows), RANKING_WRITE_BATCH_SIZE):
+        if progress:
+            progress("write", start, len(rows))
+        await asyncio.gather(*(write(row) for row in rows[start:start + RANKING_WRITE_BATCH_SIZE]))
+    return f"per-resume updates, concurrency {RANKING_WRITE_CONCURRENCY}"
+
 
 # Resume ranking
-@app.post("/rank-resumes/{jd_id}")
-async def rank_resumes_endpoint(jd_id: str, user=Depends(get_current_user)):
-    if user.role not in ["HR", "demo_hr"]:
-        raise HTTPException(status_code=403, detail="Not authorized")
+# Only the columns scoring and explanations read; extracted_text is the large one
+_RANKING_COLUMNS = "resume_id, extracted_text, skills, experience, education, content_hash, score"
+_OPTIONAL_RANKING_COLUMNS = ("score_fingerprint", "score_components", "score_mode")
+
+
+async def _fetch_ranking_page(jd_id: str, after: Optional[str], columns: str) -> List[dict]:
+    """One keyset page of resumes for a posting, ordered by resume_id."""
+    query = db.table("resumes").select(columns).eq("jd_id", jd_id)
+    if after is not None:
+        query = query.gt("resume_id", after)
+    return (await query.order("resume_id").limit(RANKING_PAGE_SIZE).execute()).data or []
+
+
+async def _fetch_ranking_rows(jd_id: str, resume_ids: List[str], columns: str) -> List[dict]:
+    """The posting's resumes with the given ids, ordered by resume_id."""
+    query = db.table("resumes").select(columns).eq("jd_id", jd_id).in_("resume_id", resume_ids)
+    return (await query.order("resume_id").execute()).data or []
+
+
+def _ranking_explanation(resume: dict, score: float, jd_requirements: List[str], mode: Optional[str] = None) -> str:
+    # Generate explanation based on actual requirements and matched skills
+    explanation = f"Match Score: {score*100:.1f}%. "
+    resume_skills = resume.get("skills", [])
+    matched_skills = [s for s in jd_requirements if s in resume_skills]
+    if matched_skills:
+        explanation += f"Matched required skills: {', '.join(matched_skills)}. "
+    else:
+        explanation += "No required skills matched. "
+    explanation += f"(Job Requirements: {', '.join(jd_requirements)}) "
+    if resume.get('experience'):
+        explanation += f"Relevant experience found. "
+    if mode == "lexical":
+        explanation += "Content relevance estimated from keywords only. "
+    elif mode == "fast":
+        explanation += "Content relevance estimated from keywords only (fast ranking). "
+    return explanation
+
+
+# Background writes of the scores a top-K ranking run returned before storing, by jd_id
+_deferred_score_writes: Dict[str, asyncio.Task] = {}
+
+
+async def _write_deferred_scores(jd_id: str, rows: List[dict]):
+    started = time.perf_counter()
     try:
-        jd = supabase_service.table("job_descriptions").select("requirements, weights").eq("jd_id", jd_id).execute().data[0]
-        resumes = supabase_service.table("resumes").select("*").eq("jd_id", jd_id).execute().data
-        
-        # Get weights from JD or use defaults
-        weights = jd.get("weights") or {}
+        mode = await _save_ranking_scores(rows)
+        logging.info(f"[RANK TOP-K] jd={jd_id} wrote {len(rows)} deferred scores in "
+                     f"{(time.perf_counter() - started) * 1000:.0f}ms ({mode})")
+    except Exception:
+        # Their fingerprints were not written either, so the next ranking run rescores them
+        logging.exception(f"[RANK TOP-K] jd={jd_id} deferred write of {len(rows)} scores failed")
+    finally:
+        if _deferred_score_writes.get(jd_id) is asyncio.current_task():
+            del _deferred_score_writes[jd_id]
+
+
+async def _await_deferred_score_writes(jd_id: str):
+    """Wait for a previous top-K run's background writes, so stored scores are complete."""
+    pending = _deferred_score_writes.get(jd_id)
+    if pending is not None:
+        # Shielded: a caller that gives up must not cancel the writes themselves
+        await asyncio.shield(pending)
+
+
+# Full-quality ranking runs in progress in this process, and pending upgrades of fast scores by jd_id
+_full_ranking_runs = 0
+_score_upgrades: Dict[str, asyncio.Task] = {}
+
+
+def _inference_saturated() -> bool:
+    return bool(RANKING_MAX_FULL_RUNS) and _full_ranking_runs >= RANKING_MAX_FULL_RUNS
 
-        # Add debug logging about the ranking operation
-        logging.info(f"Ranking resumes: jd_id={jd_id}, num_resumes={len(resumes)}, jd_requirements={jd.get('requirements')}, weights={weights}")
 
-        # Rank resumes with weights (wrap in try/except to capture ML errors)
+async def _upgrade_fast_scores(jd_id: str, semantic_fraction: Optional[float]):
+    """Re-run a posting's ranking at full quality once the model is free; only fast scores are stale."""
+    try:
+        while _inference_saturated():
+            await asyncio.sleep(RANKING_UPGRADE_POLL_SECONDS)
+        # Unregister first: if this run is degraded again, it schedules the next attempt itself
+        _score_upgrades.pop(jd_id, None)
+        result = await _run_ranking(jd_id, semantic_fraction=semantic_fraction)
+        logging.info(f"[RANK UPGRADE] jd={jd_id} mode={result['mode']} rescored={result['scored']}")
+    except Exception:
+        logging.exception(f"[RANK UPGRADE] jd={jd_id} upgrade of fast scores failed")
+    finally:
+        if _score_upgrades.get(jd_id) is asyncio.current_task():
+            del _score_upgrades[jd_id]
+
+
+async def _run_ranking(jd_id: str, force: bool = False, progress=None, top_k: Optional[int] = None,
+                       semantic_fraction: Optional[float] = None, mode: str = "full") -> dict:
+    """
+    Rank a posting (see _rank_posting) in full or fast mode.
+
+    mode="fast", or a full run requested while RANKING_MAX_FULL_RUNS full runs are
+    already in progress, scores with keywords only (no model). Such scores are tagged
+    "fast" with a fingerprint of their own, and a background full-quality run upgrades
+    them once the model is free. The response says which mode ran and whether the run
+    was degraded.
+    """
+    global _full_ranking_runs
+    degraded = mode == "full" and _inference_saturated()
+    fast = mode == "fast" or degraded
+    if not fast:
+        _full_ranking_runs += 1
+    try:
+        result = await _rank_posting(jd_id, force, progress, top_k, semantic_fraction, fast)
+    finally:
+        if not fast:
+            _full_ranking_runs -= 1
+    result["mode"] = "fast" if fast else "full"
+    result["degraded"] = degraded
+    result["upgrade_scheduled"] = False
+    if fast and result["fast_scored"]:
+        if jd_id not in _score_upgrades:
+            _score_upgrades[jd_id] = asyncio.ensure_future(_upgrade_fast_scores(jd_id, semantic_fraction))
+        result["upgrade_scheduled"] = True
+    if degraded:
+        logging.warning(f"[RANK] jd={jd_id} ranked in fast mode: {_full_ranking_runs} full-quality runs already in progress")
+    return result
+
+
+def _scoring_fingerprints(jd_requirements, weights, semantic_fraction: Optional[float] = None) -> tuple:
+    """
+    (full, fast) fingerprints for scores written now. Ranking and re-weighting both
+    use this, so a persisted re-weight matches what the next ranking run expects.
+    """
+    if semantic_fraction is None:
+        semantic_fraction = RANKING_SEMANTIC_FRACTION
+    # The configured semantic engine is part of it, so switching engines rescores
+    model_name = semantic_model_name()
+    return (
+        scoring_fingerprint(jd_requirements, weights, model_name, semantic_fraction),
+        scoring_fingerprint(jd_requirements, weights, model_name, semantic_fraction, fast=True),
+    )
+
+
+async def _rank_posting(jd_id: str, force: bool = False, progress=None, top_k: Optional[int] = None,
+                        semantic_fraction: Optional[float] = None, fast: bool = False) -> dict:
+    """
+    Score the job's resumes, store the results and close the posting.
+
+    Only resumes without a score computed from the current inputs (see
+    scoring_fingerprint) are scored; the rest keep their stored score, so the
+    ordering merges old and new results. force=True rescores every resume.
+
+    Resumes are read in keyset pages of RANKING_PAGE_SIZE with only the columns the
+    scorer needs, and the pages flow through a pipeline: up to RANKING_SHARDS pages
+    are scored at once (each split further across the worker pool when it is large
+    enough), the next page is fetched while they are scored, and scored pages are
+    written, in order, while later ones are scored. Keeping several pages in flight
+    is what lets the pool use all its workers whatever the page size. At most about
+    RANKING_SHARDS + 2 pages are in memory at any time.
+
+    With top_k, a bounded heap keeps the best top_k scores (new and reused) while the
+    pages are scored, and nothing is written during the pipeline. At the end the top
+    top_k rows are written - with any row whose stale stored score could still outrank
+    them - and returned as "top"; the remaining rows are written in the background
+    (held in memory until then, a few hundred bytes each).
+
+    semantic_fraction (default RANKING_SEMANTIC_FRACTION) is the lexical prefilter
+    cut-off of the rank_resumes cascade, made over the whole posting: a first pass
+    over the pages computes the lexical components of every resume to score, the
+    best semantic_fraction of them are then fetched again by id and scored
+    semantically through the same pipeline, and the rest get the keyword estimate
+    mapped through one calibration fitted over all those semantic scores. The scores
+    are therefore the ones rank_resumes gives for the whole posting at once. Between
+    the passes only the lexical results are held (a few hundred bytes per resume).
+    Resumes below the cut-off are counted in "semantic_skipped" and their
+    explanation says so.
+
+    fast=True scores with keywords only; resumes already holding a current full-quality
+    score keep it, and fast scores are counted in "fast_scored".
+
+    Args:
+        progress: Optional callback (phase, processed, total) for fetch/score/write;
+            an exception it raises (RankingCancelled) stops the run at that point
+        top_k: Return the best top_k resumes as soon as they are stored and defer the rest
+    """
+    def report(phase, processed, total):
+        if progress:
+            progress(phase, processed, total)
+
+    report("fetch", 0, 0)
+    await _await_deferred_score_writes(jd_id)
+    jd = (await db.table("job_descriptions").select("requirements, weights").eq("jd_id", jd_id).execute()).data[0]
+    jd_requirements = jd.get("requirements", []) or []
+    # Get weights from JD or use defaults
+    weights = jd.get("weights") or {}
+    total = (await db.table("resumes").select("resume_id", count="exact").eq("jd_id", jd_id).limit(1).execute()).count or 0
+
+    embedding_model = semantic_model_name()
+    if semantic_fraction is None:
+        semantic_fraction = RANKING_SEMANTIC_FRACTION
+    fingerprint, fast_fingerprint = _scoring_fingerprints(jd_requirements, weights, semantic_fraction)
+    # A fast run keeps current full-quality scores; a full run treats fast scores as stale
+    current_fingerprints = {fingerprint, fast_fingerprint} if fast else {fingerprint}
+    # score_fingerprint (migrations/004) and score_components (005) are only used once they exist;
+    # without the fingerprint every run is a full rescore
+    optional_columns = list(_OPTIONAL_RANKING_COLUMNS)
+    while True:
+        columns = ", ".join([_RANKING_COLUMNS] + optional_columns)
         try:
-            scores = rank_resumes(resumes, jd.get("requirements", []), weights)
+            first_page = await _fetch_ranking_page(jd_id, None, columns)
+            break
+        except DatabaseError as e:
+            missing = [c for c in optional_columns if c in str(e)]
+            if not missing:
+                raise
+            optional_columns = [c for c in optional_columns if c not in missing]
+    track_fingerprint = "score_fingerprint" in optional_columns
+    store_components = "score_components" in optional_columns
+    store_mode = "score_mode" in optional_columns
+
+    # Add debug logging about the ranking operation
+    logging.info(f"Ranking resumes: jd_id={jd_id}, num_resumes={total}, force={force}, "
+                 f"jd_requirements={jd_requirements}, weights={weights}, page_size={RANKING_PAGE_SIZE}, "
+                 f"shards={RANKING_SHARDS}, semantic_backend={SEMANTIC_BACKEND}")
+
+    seen = scored = reused_embeddings = semantic_skipped = fast_scored = 0
+    scoring_ms = write_ms = 0.0
+    write_modes = set()
+    # top-K mode: min-heap of the best (score, resume_id) so far, and the rows held back with
+    # the score each resume had stored before this run
+    top_heap = []
+    held_rows = []
+    write_task = None
+    # (keyword estimate, semantic score) of every resume scored semantically in the cascade
+    calibration_pairs = []
+
+    def is_stale(resume: dict) -> bool:
+        return force or resume.get("score") is None or resume.get("score_fingerprint") not in current_fingerprints
+
+    def offer(score: float, resume_id: str):
+        if len(top_heap) < top_k:
+            heapq.heappush(top_heap, (score, resume_id))
+        elif (score, resume_id) > top_heap[0]:
+            heapq.heapreplace(top_heap, (score, resume_id))
+
+    def keep_stored_scores(page: List[dict], rescored_ids: set):
+        # top-K mode: resumes with a current stored score compete with it
+        for r in page:
+            if r["resume_id"] not in rescored_ids and r.get("score") is not None:
+                offer(r["score"], r["resume_id"])
+
+    async def write_page(rows: List[dict]):
+        nonlocal write_ms
+        started = time.perf_counter()
+        write_modes.add(await _save_ranking_scores(rows))
+        write_ms += (time.perf_counter() - started) * 1000
+
+    async def emit(rows: List[dict], previous_scores: dict):
+        # Scored rows are written behind the pipeline, or in top-K mode held back until the end
+        nonlocal write_task
+        if top_k:
+            for row in rows:
+                offer(row["score"], row["resume_id"])
+            held_rows.extend((row, previous_scores[row["resume_id"]]) for row in rows)
+            return
+        if write_task is not None:
+            await write_task
+        write_task = asyncio.ensure_future(write_page(rows)) if rows else None
+
+    def score_row(resume: dict, score: float, component_scores: dict, mode: str) -> dict:
+        nonlocal semantic_skipped, fast_scored
+        if mode == "lexical":
+            semantic_skipped += 1
+        elif mode == "fast":
+            fast_scored += 1
+        row = {
+            "resume_id": resume["resume_id"],
+            "score": float(score),
+            "explanation": _ranking_explanation(resume, score, jd_requirements, mode),
+        }
+        if track_fingerprint:
+            row["score_fingerprint"] = fast_fingerprint if mode == "fast" else fingerprint
+        if store_mode:
+            row["score_mode"] = mode
+        if store_components:
+            row["score_components"] = {name: round(float(value), 6) for name, value in component_scores.items()}
+        return row
+
+    async def run_scorer(scorer, *args, **kwargs):
+        nonlocal scoring_ms
+        # CPU-bound; run it off the event loop so other requests keep being served, and
+        # across RANKING_SHARDS worker processes when configured
+        started = time.perf_counter()
+        try:
+            return await run_in_threadpool(scorer, *args, shards=RANKING_SHARDS, **kwargs)
+        except RankingCancelled:
+            raise
         except Exception as rank_err:
             # Log full exception with traceback for diagnostics
             logging.exception(f"rank_resumes failed for jd_id={jd_id}: {rank_err}")
             # Surface a helpful error message to the caller (frontend will show this)
             raise HTTPException(status_code=500, detail=f"Ranking engine error: {str(rank_err)}")
-        
-        # Update resumes with scores and explanations
-        for resume, score in zip(resumes, scores):
-            # Generate explanation based on actual requirements and matched skills
-            explanation = f"Match Score: {score*100:.1f}%. "
-            jd_requirements = jd.get("requirements", [])
-            resume_skills = resume.get("skills", [])
-            matched_skills = [s for s in jd_requirements if s in resume_skills]
-            if matched_skills:
-                explanation += f"Matched required skills: {', '.join(matched_skills)}. "
-            else:
-                explanation += "No required skills matched. "
-            explanation += f"(Job Requirements: {', '.join(jd_requirements)}) "
-            if resume.get('experience'):
-                explanation += f"Relevant experience found. "
-            supabase_service.table("resumes").update({
-                "score": float(score),
-                "explanation": explanation
-            }).eq("resume_id", resume["resume_id"]).execute()
-            supabase_service.table("applications").update({"match_score": float(score)}).eq("resume_id", resume["resume_id"]).execute()
-        
-        # Close the job posting
-        supabase_service.table("job_descriptions").update({"status": "closed"}).eq("jd_id", jd_id).execute()
-        
-        return {"message": "Resumes ranked successfully", "count": len(resumes)}
+        finally:
+            scoring_ms += (time.perf_counter() - started) * 1000
+
+    async def score_resumes(to_score: List[dict], batch_progress, lexical=None, semantic_pairs=None) -> List[dict]:
+        """
+        Rows for to_score. With lexical (their stage 1 components) every one is scored
+        semantically, and (keyword estimate, semantic score) pairs go to semantic_pairs.
+        """
+        nonlocal scored, reused_embeddings
+        # Reuse embeddings stored for identical uploads (keyed by content hash); the tfidf
+        # backend has no embeddings to cache
+        cached_embeddings = {}
+        if SEMANTIC_BACKEND != "tfidf":
+            cached_embeddings = await run_in_threadpool(
+                get_cached_embeddings, supabase_service, [r.get("content_hash") for r in to_score], embedding_model
+            )
+        for r in to_score:
+            if r.get("content_hash") in cached_embeddings:
+                r["embedding"] = cached_embeddings[r["content_hash"]]
+        reused_embeddings += len(cached_embeddings)
+
+        def shard_progress(phase, processed, batch_total):
+            # Encoding happens per batch here, so it is reported as part of it
+            batch_progress(processed if phase == "score" else 0)
+
+        components = []
+        score_modes = []
+        scores = await run_scorer(
+            rank_resumes_sharded, to_score, jd_requirements, weights, shard_progress, components,
+            semantic_fraction=1.0 if lexical is not None else semantic_fraction, score_modes=score_modes,
+            fast=fast, lexical=lexical,
+        )
+        scored += len(to_score)
+        if semantic_pairs is not None:
+            semantic_pairs.extend(
+                (parts["semantic"], component_scores["semantic"])
+                for parts, component_scores, mode in zip(lexical, components, score_modes) if mode == "semantic"
+            )
+
+        # Store embeddings computed in this run for future rankings
+        new_embeddings = {
+            r["content_hash"]: r["embedding"]
+            for r in to_score
+            if r.get("content_hash") and r.get("embedding") and r["content_hash"] not in cached_embeddings
+        }
+        if new_embeddings:
+            await run_in_threadpool(store_embeddings, supabase_service, new_embeddings, embedding_model)
+
+        return [score_row(*scored_resume) for scored_resume in zip(to_score, scores, components, score_modes)]
+
+    async def pipeline(batch: List[dict], next_batch, work, consume, phase: str, phase_total: int):
+        """
+        Run work(batch, batch_progress) on up to RANKING_SHARDS batches at once (each split
+        further across the worker pool when it is large enough), fetching the next batch with
+        next_batch(previous) while they run, and hand each result to consume(batch, result)
+        in batch order. Keeping several batches in flight is what lets the pool use all its
+        workers whatever the page size.
+        """
+        done = 0
+        # Resumes processed so far in each batch still in flight (by id of the batch); the
+        # batch_progress callbacks update it from the scoring threads
+        partial = {}
+        lock = threading.Lock()
+
+        def tracker(key):
+            def batch_progress(processed):
+                with lock:
+                    partial[key] = processed
+                    current = done + sum(partial.values())
+                    report(phase, current, max(phase_total, current))
+            return batch_progress
+
+        in_flight = deque()
+        try:
+            while batch or in_flight:
+                while batch and len(in_flight) < max(1, RANKING_SHARDS):
+                    in_flight.append((batch, asyncio.ensure_future(work(batch, tracker(id(batch))))))
+                    batch = await next_batch(batch)
+                finished, task = in_flight.popleft()
+                result = await task
+                with lock:
+                    done += len(finished)
+                    partial.pop(id(finished), None)
+                    current = done + sum(partial.values())
+                    report(phase, current, max(phase_total, current))
+                await consume(finished, result)
+                # httpx responses are reference cycles; without a young-generation collection the
+                # finished pages' bodies drift into the oldest generation and pile up until a full GC
+                gc.collect(1)
+        except BaseException:
+            # Do not leave batches being scored behind a failed or cancelled run
+            tasks = [task for _, task in in_flight]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+    async def next_page(page: List[dict]) -> List[dict]:
+        if len(page) < RANKING_PAGE_SIZE:
+            return []
+        return await _fetch_ranking_page(jd_id, page[-1]["resume_id"], columns)
+
+    async def score_page(page: List[dict], batch_progress) -> List[dict]:
+        to_score = [r for r in page if is_stale(r)]
+        return await score_resumes(to_score, batch_progress) if to_score else []
+
+    async def store_page(page: List[dict], rows: List[dict]):
+        nonlocal seen
+        seen += len(page)
+        if top_k:
+            keep_stored_scores(page, {row["resume_id"] for row in rows})
+        await emit(rows, {r["resume_id"]: r.get("score") for r in page})
+
+    # Cascade: what the lexical pass keeps of each resume to rescore, by resume_id - the
+    # fields the explanation reads, the stored score and the stage 1 components
+    pending = {}
+
+    async def lexical_page(page: List[dict], batch_progress) -> List[tuple]:
+        to_score = [r for r in page if is_stale(r)]
+        if not to_score:
+            return []
+        lexical = await run_scorer(lexical_components_sharded, to_score, jd_requirements,
+                                   lambda phase, processed, batch_total: batch_progress(processed))
+        return list(zip(to_score, lexical))
+
+    async def keep_lexical(page: List[dict], results: List[tuple]):
+        nonlocal seen
+        seen += len(page)
+        if top_k:
+            keep_stored_scores(page, {r["resume_id"] for r, _ in results})
+        for r, parts in results:
+            pending[r["resume_id"]] = {"resume_id": r["resume_id"], "skills": r.get("skills"),
+                                       "experience": r.get("experience"), "score": r.get("score"), "lexical": parts}
+
+    run_started = time.perf_counter()
+    try:
+        if fast or semantic_fraction >= 1.0:
+            await pipeline(first_page, next_page, score_page, store_page, "score", total)
+        else:
+            # The semantic cut-off is made over the whole posting, not per page: a lexical pass
+            # over every page, then the best semantic_fraction of all the resumes to rescore
+            # are fetched again by id and scored semantically
+            await pipeline(first_page, next_page, lexical_page, keep_lexical, "score", total)
+            candidates = [entry for entry in pending.values() if entry["lexical"] is not None]
+            keep = int(np.ceil(max(0.0, semantic_fraction) * len(candidates)))
+            prefilter_scores = combine_component_scores(
+                [[entry["lexical"][c] for c in SCORE_COMPONENTS] for entry in candidates], weights
+            )
+            selected = sorted(candidates[j]["resume_id"] for j in np.argsort(-prefilter_scores, kind="stable")[:keep])
+            chunks = iter(range(0, len(selected), RANKING_PAGE_SIZE))
+
+            async def next_selected(previous) -> List[dict]:
+                for start in chunks:
+                    rows = await _fetch_ranking_rows(jd_id, selected[start:start + RANKING_PAGE_SIZE], columns)
+                    if rows:
+                        return rows
+                return []
+
+            async def semantic_batch(batch: List[dict], batch_progress) -> tuple:
+                pairs = []
+                rows = await score_resumes(batch, batch_progress, [pending[r["resume_id"]]["lexical"] for r in batch], pairs)
+                return rows, pairs
+
+            async def store_semantic(batch: List[dict], result: tuple):
+                rows, pairs = result
+                # Collected in batch order, so the fit does not depend on which batch finished first
+                calibration_pairs.extend(pairs)
+                await emit(rows, {r["resume_id"]: pending[r["resume_id"]]["score"] for r in batch})
+
+            await pipeline(await next_selected(None), next_selected, semantic_batch, store_semantic,
+                           "encode", len(selected))
+
+            # The rest keep the keyword estimate, mapped onto the semantic scale with one fit over
+            # every semantic score of the posting; keyword-only when the model was unavailable
+            calibration = fit_semantic_calibration([k for k, _ in calibration_pairs], [s for _, s in calibration_pairs])
+            skipped_mode = "fast" if fast_scored else "lexical"
+            selected = set(selected)
+            skipped = [entry for entry in pending.values() if entry["resume_id"] not in selected]
+            for start in range(0, len(skipped), RANKING_PAGE_SIZE):
+                batch = skipped[start:start + RANKING_PAGE_SIZE]
+                components = []
+                scores = lexical_scores([entry["lexical"] for entry in batch], weights, calibration, components)
+                rows = [score_row(entry, score, parts, skipped_mode)
+                        for entry, score, parts in zip(batch, scores, components)]
+                await emit(rows, {entry["resume_id"]: entry["score"] for entry in batch})
+            scored += len(skipped)
+            pending.clear()
+        report("write", seen, max(total, seen))
+        if write_task is not None:
+            await write_task
+        top = sorted(top_heap, reverse=True)
+        deferred_rows = []
+        if top_k and held_rows:
+            top_ids = {resume_id for _, resume_id in top}
+            threshold = top[-1][0] if len(top) == top_k else None
+            now_rows = []
+            for row, previous in held_rows:
+                # A stale stored score at or above the new cut-off would show up in the top K until rewritten
+                if row["resume_id"] in top_ids or (threshold is not None and previous is not None and previous >= threshold):
+                    now_rows.append(row)
+                else:
+                    deferred_rows.append(row)
+            held_rows = []
+            if now_rows:
+                await write_page(now_rows)
+    except BaseException:
+        # Do not leave a write running behind a failed or cancelled run
+        if write_task is not None:
+            write_task.cancel()
+            await asyncio.gather(write_task, return_exceptions=True)
+        raise
+
+    total_ms = (time.perf_counter() - run_started) * 1000
+    logging.info(f"[RANK TIMING] jd={jd_id} resumes={seen} scored={scored} scoring={scoring_ms:.0f}ms "
+                 f"writes={write_ms:.0f}ms ({', '.join(sorted(write_modes)) or 'nothing to write'}) "
+                 f"pipeline={total_ms:.0f}ms reused_embeddings={reused_embeddings} "
+                 f"semantic_skipped={semantic_skipped} (fraction {semantic_fraction}) fast_scored={fast_scored}")
+
+    # Close the job posting
+    await db.table("job_descriptions").update({"status": "closed"}).eq("jd_id", jd_id).execute()
+
+    result = {
+        "message": "Resumes ranked successfully",
+        "count": seen,
+        "scored": scored,
+        "reused": seen - scored,
+        "semantic_skipped": semantic_skipped,
+        "fast_scored": fast_scored,
+        "fingerprint": fingerprint,
+        "timings": {"scoring_ms": round(scoring_ms), "write_ms": round(write_ms), "total_ms": round(total_ms)},
+    }
+    if top_k:
+        if deferred_rows:
+            _deferred_score_writes[jd_id] = asyncio.ensure_future(_write_deferred_scores(jd_id, deferred_rows))
+        result["top"] = [
+            {"rank": rank, "resume_id": resume_id, "score": score}
+            for rank, (score, resume_id) in enumerate(top, start=1)
+        ]
+        result["deferred_writes"] = len(deferred_rows)
+    return result
+
+
+@app.post("/rank-resumes/{jd_id}")
+async def rank_resumes_endpoint(jd_id: str, force: bool = False, top_k: Optional[int] = Query(None, ge=1),
+                                semantic_fraction: Optional[float] = Query(None, ge=0, le=1),
+                                mode: Literal["full", "fast"] = "full", user=Depends(get_current_user)):
+    """
+    Rank synchronously; large postings should use POST /rank-resumes/{jd_id}/jobs instead.
+
+    top_k=N returns the best N resumes ("top") once they are stored and writes the
+    other scores in the background. semantic_fraction overrides RANKING_SEMANTIC_FRACTION,
+    the share of resumes (best lexical score first) that get semantic scoring.
+    mode=fast scores with keywords only and upgrades those scores in the background.
+    """
+    if user.role not in ["HR", "demo_hr"]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    try:
+        return await _run_ranking(jd_id, force, top_k=top_k, semantic_fraction=semantic_fraction, mode=mode)
+    except HTTPException:
+        raise
     except Exception as e:
         logging.exception("Error ranking resumes")
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
+
+ranking_jobs = RankingJobRegistry()
+
+
+def _ranking_job_for(job_id: str, user) -> RankingJob:
+    if user.role not in ["HR", "demo_hr"]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    job = ranking_jobs.get(job_id)
+    if job is None or job.user_id != user.id:
+        raise HTTPException(status_code=404, detail="Ranking job not found")
+    return job
+
+
+@app.post("/rank-resumes/{jd_id}/jobs", status_code=202)
+async def start_ranking_job(jd_id: str, force: bool = False, top_k: Optional[int] = Query(None, ge=1),
+                            semantic_fraction: Optional[float] = Query(None, ge=0, le=1),
+                            mode: Literal["full", "fast"] = "full", user=Depends(get_current_user)):
+    """
+    Rank in the background and return a job id at once.
+
+    Follow the job with GET /rank-resumes/jobs/{job_id}/events (server-sent events) or
+    poll GET /rank-resumes/jobs/{job_id}. A posting ranks one job at a time: repeating
+    the same request returns the running job, anything else gets 409 until it ends.
+    top_k, semantic_fraction and mode are as for POST /rank-resumes/{jd_id}.
+    """
+    if user.role not in ["HR", "demo_hr"]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    params = {"force": force, "top_k": top_k, "semantic_fraction": semantic_fraction, "mode": mode}
+    try:
+        job = ranking_jobs.start(
+            jd_id, user.id, lambda job: _run_ranking(jd_id, force, job.progress, top_k, semantic_fraction, mode), params,
+        )
+    except RankingJobConflict as e:
+        raise HTTPException(status_code=409, detail=f"{e}; try again when it finishes")
+    return JSONResponse(status_code=202, content={
+        **job.snapshot(),
+        "events_url": f"/rank-resumes/jobs/{job.job_id}/events",
+    })
+
+
+@app.get("/rank-resumes/jobs/{job_id}")
+async def get_ranking_job(job_id: str, user=Depends(get_current_user)):
+    return _ranking_job_for(job_id, user).snapshot()
+
+
+@app.get("/rank-resumes/jobs/{job_id}/events")
+async def stream_ranking_job(job_id: str, user=Depends(get_current_user)):
+    """Server-sent `progress` events with the job snapshot until it is done, failed or cancelled."""
+    job = _ranking_job_for(job_id, user)
+    return StreamingResponse(
+        ranking_jobs.events(job),
+        media_type="text/event-stream",
+        # Keep proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.post("/rank-resumes/jobs/{job_id}/cancel", status_code=202)
+async def cancel_ranking_job(job_id: str, user=Depends(get_current_user)):
+    """Ask a running job to stop; it stops at its next progress report. Scores already written stay."""
+    job = _ranking_job_for(job_id, user)
+    job.cancel()
+    return JSONResponse(status_code=202, content=job.snapshot())
+
+class ReweightRequest(BaseModel):
+    weights: Dict[str, float]
+    persist: bool = False
+
+
+@app.post("/rank-resumes/{jd_id}/reweight")
+async def reweight_ranking(jd_id: str, body: ReweightRequest, user=Depends(get_current_user)):
+    """
+    Re-rank with different weights from the stored component scores, without rescoring.
+
+    Returns the proposed ordering next to the current one. persist=true saves the weights
+    on the posting and writes the new scores with a matching fingerprint, so the next
+    /rank-resumes run keeps them. Resumes scored before component scores were stored are
+    listed in missing_components and keep their current score.
+    """
+    if user.role not in ["HR", "demo_hr"]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    unknown = set(body.weights) - set(SCORE_COMPONENTS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown weights: {', '.join(sorted(unknown))}")
+    if any(value < 0 for value in body.weights.values()):
+        raise HTTPException(status_code=400, detail="Weights must not be negative")
+
+    try:
+        jd_rows = (await db.table("job_descriptions").select("requirements, hr_user_id").eq("jd_id", jd_id).execute()).data
+        if not jd_rows or jd_rows[0].get("hr_user_id") != user.id:
+            raise HTTPException(status_code=404, detail="Job not found or not owned by user")
+        await _await_deferred_score_writes(jd_id)
+        # score_mode (migrations/007) keeps persisted fast scores marked for upgrade
+        columns = "resume_id, score, score_components" + (", skills, experience, score_mode" if body.persist else "")
+        resumes, after = [], None
+        while True:
+            try:
+                page = await _fetch_ranking_page(jd_id, after, columns)
+            except DatabaseError as e:
+                if "score_mode" not in str(e) or "score_mode" not in columns:
+                    raise
+                columns = columns.replace(", score_mode", "")
+                continue
+            resumes.extend(page)
+            if len(page) < RANKING_PAGE_SIZE:
+                break
+            after = page[-1]["resume_id"]
+    except HTTPException:
+        raise
+    except DatabaseError as e:
+        if "score_components" in str(e):
+            raise HTTPException(status_code=409, detail="Component scores are not stored yet; apply migrations/005_score_components.sql and rank again")
+        logging.exception("Error loading component scores")
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+    started = time.perf_counter()
+    scored = [r for r in resumes if r.get("score_components")]
+    components = np.array(
+        [[float(r["score_components"].get(name, 0.0)) for name in SCORE_COMPONENTS] for r in scored]
+    ).reshape(-1, len(SCORE_COMPONENTS))
+    new_scores = combine_component_scores(components, body.weights)
+    new_order = np.argsort(-new_scores, kind="stable")
+    previous_scores = np.array([float(r.get("score") or 0.0) for r in scored])
+    previous_rank = np.empty(len(scored), dtype=int)
+    previous_rank[np.argsort(-previous_scores, kind="stable")] = np.arange(1, len(scored) + 1)
+    compute_ms = (time.perf_counter() - started) * 1000
+
+    ranking = [
+        {
+            "resume_id": scored[i]["resume_id"],
+            "score": round(float(new_scores[i]), 6),
+            "previous_score": scored[i].get("score"),
+            "rank": rank,
+            "previous_rank": int(previous_rank[i]),
+        }
+        for rank, i in enumerate(new_order, start=1)
+    ]
+    weights = dict(zip(SCORE_COMPONENTS, (float(w) for w in weight_vector(body.weights))))
+    result = {
+        "weights": weights,
+        "count": len(scored),
+        "missing_components": [r["resume_id"] for r in resumes if not r.get("score_components")],
+        "ranking": ranking,
+        "persisted": False,
+        "timings": {"compute_ms": round(compute_ms, 2)},
+    }
+
+    if body.persist:
+        jd_requirements = jd_rows[0].get("requirements") or []
+        fingerprint, fast_fingerprint = _scoring_fingerprints(jd_requirements, weights)
+        rows = [
+            {
+                "resume_id": r["resume_id"],
+                "score": float(score),
+                "explanation": _ranking_explanation(r, float(score), jd_requirements, r.get("score_mode")),
+                "score_fingerprint": fast_fingerprint if r.get("score_mode") == "fast" else fingerprint,
+            }
+            for r, score in zip(scored, new_scores)
+        ]
+        try:
+            await db.table("job_descriptions").update({"weights": weights}).eq("jd_id", jd_id).execute()
+            await _save_ranking_scores(rows)
+        except Exception as e:
+            logging.exception("Error persisting re-weighted scores")
+            raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+        result["persisted"] = True
+
+    logging.info(f"[RANK REWEIGHT] jd={jd_id} resumes={len(scored)} compute={compute_ms:.2f}ms persist={body.persist}")
+    return result
+
+
 # Get resumes for a specific job (for HR to review)
 @app.get("/resumes/{jd_id}")
-async def get_resumes(jd_id: str, user=Depends(get_current_user)):
+async def get_resumes(jd_id: str, response: Response, top_k: Optional[int] = Query(None, ge=1),
+                      limit: Optional[int] = Query(None, ge=1, le=PAGE_MAX_LIMIT), cursor: Optional[str] = None,
+                      total: bool = False, user=Depends(get_current_user)):
+    """
+    The posting's resumes, best score first and unscored last. top_k=N returns only the
+    first N, read through the (jd_id, score) index without ordering every resume.
+    With limit (or a cursor from X-Next-Cursor) the list is paginated and ranks
+    continue across pages; total=true adds X-Total-Count.
+    """
     if user.role not in ["HR", "demo_hr"]:
         raise HTTPException(status_code=403, detail="Not authorized")
+    if top_k and (limit or cursor):
+        raise HTTPException(status_code=400, detail="Use either top_k or limit/cursor")
+    after = _page_after(cursor, f"resumes:{jd_id}", _RESUME_KEYS)
     try:
-        resumes_resp = supabase_service.table("resumes").select("*").eq("jd_id", jd_id).order("score", desc=True).execute()
-        resumes = resumes_resp.data or []
+        rank_offset = 0
+        if limit or cursor:
+            page = await fetch_page(
+                lambda count: db.table("resumes").select("*", count=count).eq("jd_id", jd_id),
+                _RESUME_KEYS, limit or PAGE_DEFAULT_LIMIT, after, f"resumes:{jd_id}", total,
+            )
+            _set_page_headers(response, page)
+            resumes = page.rows
+            rank_offset = page.offset
+        else:
+            # Unscored resumes (e.g. a top-K run's deferred writes still pending) go last
+            query = db.table("resumes").select("*").eq("jd_id", jd_id).order("score", desc=True, nullsfirst=False)
+            if top_k:
+                query = query.limit(top_k)
+            resumes_resp = await query.execute()
+            resumes = resumes_resp.data or []
+            if total:
+                response.headers["X-Total-Count"] = str(len(resumes))
         # Always normalize file_url to a string public URL
         for r in resumes:
             r["file_url"] = _signed_url_for(r.get("file_url"))
@@ -903,7 +2106,7 @@ async def get_resumes(jd_id: str, user=Depends(get_current_user)):
         names_map = {}
         if user_ids:
             try:
-                profiles = supabase_service.table("user_profiles").select("user_id, email, name").in_("user_id", user_ids).execute()
+                profiles = await db.table("user_profiles").select("user_id, email, name").in_("user_id", user_ids).execute()
                 logging.info(f"[RESUMES] Profiles query returned: {profiles.data}")
                 for p in (profiles.data or []):
                     email = p.get("email")
@@ -916,7 +2119,7 @@ async def get_resumes(jd_id: str, user=Depends(get_current_user)):
         
         # Add rank and friendly identity fields
         for idx, resume in enumerate(resumes):
-            resume['rank'] = idx + 1
+            resume['rank'] = rank_offset + idx + 1
             user_id = resume.get('user_id')
             name = names_map.get(user_id)
             email = emails_map.get(user_id)
@@ -941,13 +2144,22 @@ async def get_resumes(jd_id: str, user=Depends(get_current_user)):
 
 # HR-specific: get all jobs posted by the authenticated HR (history: open and closed)
 @app.get("/hr/jobs")
-async def get_hr_jobs(user=Depends(get_current_user)):
+async def get_hr_jobs(response: Response, limit: Optional[int] = Query(None, ge=1, le=PAGE_MAX_LIMIT),
+                      cursor: Optional[str] = None, total: bool = False, user=Depends(get_current_user)):
     if user.role not in ["HR", "demo_hr"]:
         raise HTTPException(status_code=403, detail="Not authorized")
+    after = _page_after(cursor, f"hr-jobs:{user.id}", _JOB_KEYS)
     try:
         logging.info(f"Fetching jobs for HR user_id: {user.id}, role: {user.role}")
-        jobs_resp = (
-            supabase_service
+        if limit or cursor:
+            page = await fetch_page(
+                lambda count: db.table("job_descriptions").select("*", count=count).eq("hr_user_id", user.id),
+                _JOB_KEYS, limit or PAGE_DEFAULT_LIMIT, after, f"hr-jobs:{user.id}", total,
+            )
+            _set_page_headers(response, page)
+            return page.rows
+        jobs_resp = await (
+            db
             .table("job_descriptions")
             .select("*")
             .eq("hr_user_id", user.id)
@@ -956,6 +2168,8 @@ async def get_hr_jobs(user=Depends(get_current_user)):
         )
         jobs_data = jobs_resp.data or []
         logging.info(f"Found {len(jobs_data)} jobs for HR user {user.id}")
+        if total:
+            response.headers["X-Total-Count"] = str(len(jobs_data))
         return jobs_data
     except Exception as e:
         logging.exception("Error fetching HR jobs")
@@ -963,13 +2177,20 @@ async def get_hr_jobs(user=Depends(get_current_user)):
 
 # HR-specific: get candidates for a specific job with enriched details
 @app.get("/hr/jobs/{jd_id}/candidates")
-async def get_hr_job_candidates(jd_id: str, user=Depends(get_current_user)):
+async def get_hr_job_candidates(jd_id: str, response: Response,
+                                limit: Optional[int] = Query(None, ge=1, le=PAGE_MAX_LIMIT),
+                                cursor: Optional[str] = None, total: bool = False, user=Depends(get_current_user)):
+    """
+    The job's candidates, best match first. With limit (or a cursor from X-Next-Cursor)
+    the list is paginated in the database; total=true adds X-Total-Count.
+    """
     if user.role not in ["HR", "demo_hr"]:
         raise HTTPException(status_code=403, detail="Not authorized")
+    after = _page_after(cursor, f"candidates:{jd_id}", _CANDIDATE_KEYS)
     try:
         # Ensure the job belongs to the requesting HR
-        jd_check = (
-            supabase_service
+        jd_check = await (
+            db
             .table("job_descriptions")
             .select("jd_id, hr_user_id")
             .eq("jd_id", jd_id)
@@ -980,15 +2201,26 @@ async def get_hr_job_candidates(jd_id: str, user=Depends(get_current_user)):
             raise HTTPException(status_code=404, detail="Job not found or not owned by user")
 
         # Fetch applications for the job
-        apps_resp = (
-            supabase_service
-            .table("applications")
-            .select("*")
-            .eq("jd_id", jd_id)
-            .order("updated_at", desc=True)
-            .execute()
-        )
-        apps = apps_resp.data or []
+        paginated = bool(limit or cursor)
+        if paginated:
+            page = await fetch_page(
+                lambda count: db.table("applications").select("*", count=count).eq("jd_id", jd_id),
+                _CANDIDATE_KEYS, limit or PAGE_DEFAULT_LIMIT, after, f"candidates:{jd_id}", total,
+            )
+            _set_page_headers(response, page)
+            apps = page.rows
+        else:
+            apps_resp = await (
+                db
+                .table("applications")
+                .select("*")
+                .eq("jd_id", jd_id)
+                .order("updated_at", desc=True)
+                .execute()
+            )
+            apps = apps_resp.data or []
+            if total:
+                response.headers["X-Total-Count"] = str(len(apps))
         logging.info(f"/hr/jobs/{jd_id}/candidates: Found {len(apps)} applications for job {jd_id}")
         if len(apps) > 0:
             logging.info(f"Sample application: {apps[0]}")
@@ -1002,8 +2234,8 @@ async def get_hr_job_candidates(jd_id: str, user=Depends(get_current_user)):
         # Batch fetch resumes
         resumes_map: Dict[str, dict] = {}
         if resume_ids:
-            res_resp = (
-                supabase_service
+            res_resp = await (
+                db
                 .table("resumes")
                 .select("resume_id, file_url, score, explanation, decision")
                 .in_("resume_id", resume_ids)
@@ -1019,8 +2251,8 @@ async def get_hr_job_candidates(jd_id: str, user=Depends(get_current_user)):
         # Batch fetch user emails
         emails_map: Dict[str, str] = {}
         if user_ids:
-            profiles = (
-                supabase_service
+            profiles = await (
+                db
                 .table("user_profiles")
                 .select("user_id, email")
                 .in_("user_id", user_ids)
@@ -1041,12 +2273,15 @@ async def get_hr_job_candidates(jd_id: str, user=Depends(get_current_user)):
                 "file_url": r.get("file_url"),
                 "status": a.get("status", "applied"),
                 "decision": r.get("decision") or a.get("decision"),
-                "match_score": a.get("match_score", r.get("score")),
+                # A page is in applications.match_score order, so it must show that column as is
+                "match_score": a.get("match_score") if paginated else a.get("match_score", r.get("score")),
                 "applied_at": a.get("updated_at"),
                 "explanation": r.get("explanation"),
             }
             enriched.append(candidate)
 
+        if paginated:
+            return enriched
         # Sort by match_score desc if available
         enriched.sort(key=lambda x: (x.get("match_score") is None, -(x.get("match_score") or 0)), reverse=False)
         return enriched
@@ -1058,7 +2293,13 @@ async def get_hr_job_candidates(jd_id: str, user=Depends(get_current_user)):
 
 # Get applications for a candidate
 @app.get("/applications/{user_id}")
-async def get_applications(user_id: str, user=Depends(get_current_user)):
+async def get_applications(user_id: str, response: Response,
+                           limit: Optional[int] = Query(None, ge=1, le=PAGE_MAX_LIMIT),
+                           cursor: Optional[str] = None, total: bool = False, user=Depends(get_current_user)):
+    """
+    A candidate's applications. With limit (or a cursor from X-Next-Cursor) the list is
+    paginated, most recently updated first; total=true adds X-Total-Count.
+    """
     logging.info(f"get_applications: auth_user_id={getattr(user, 'id', None)}, requested_user_id={user_id}, role={getattr(user, 'role', None)}")
     # For non-HR users, always scope to their own applications
     if user.role not in ["HR", "demo_hr"]:
@@ -1066,10 +2307,21 @@ async def get_applications(user_id: str, user=Depends(get_current_user)):
     elif user.id != user_id and user.role in ["HR", "demo_hr"]:
         # HR can access requested user's applications
         pass
+    after = _page_after(cursor, f"applications:{user_id}", _APPLICATION_KEYS)
     try:
         # Fetch applications first (avoid FK join dependency)
-        apps_resp = supabase_service.table("applications").select("*").eq("user_id", user_id).execute()
-        apps = apps_resp.data or []
+        if limit or cursor:
+            page = await fetch_page(
+                lambda count: db.table("applications").select("*", count=count).eq("user_id", user_id),
+                _APPLICATION_KEYS, limit or PAGE_DEFAULT_LIMIT, after, f"applications:{user_id}", total,
+            )
+            _set_page_headers(response, page)
+            apps = page.rows
+        else:
+            apps_resp = await db.table("applications").select("*").eq("user_id", user_id).execute()
+            apps = apps_resp.data or []
+            if total:
+                response.headers["X-Total-Count"] = str(len(apps))
         logging.info(f"get_applications: apps_count={len(apps)} for user_id={user_id}")
 
         if not apps:
@@ -1083,13 +2335,13 @@ async def get_applications(user_id: str, user=Depends(get_current_user)):
         jobs_map = {}
 
         if resume_ids:
-            res_resp = supabase_service.table("resumes").select("resume_id, decision, file_url, score, explanation").in_("resume_id", resume_ids).execute()
+            res_resp = await db.table("resumes").select("resume_id, decision, file_url, score, explanation").in_("resume_id", resume_ids).execute()
             for r in (res_resp.data or []):
                 r["file_url"] = _signed_url_for(r.get("file_url"))
                 resumes_map[r["resume_id"]] = r
 
         if jd_ids:
-            jobs_resp = supabase_service.table("job_descriptions").select("jd_id, title, description").in_("jd_id", jd_ids).execute()
+            jobs_resp = await db.table("job_descriptions").select("jd_id, title, description").in_("jd_id", jd_ids).execute()
             for j in (jobs_resp.data or []):
                 jobs_map[j["jd_id"]] = j
 
@@ -1112,7 +2364,7 @@ async def create_notification(notification: Notification, user=Depends(get_curre
     if user.role not in ["HR", "demo_hr"]:
         raise HTTPException(status_code=403, detail="Not authorized")
     try:
-        data = supabase_service.table("notifications").insert({
+        data = await db.table("notifications").insert({
             "user_id": notification.user_id,
             "message": notification.message,
             "type": notification.type
@@ -1123,11 +2375,23 @@ async def create_notification(notification: Notification, user=Depends(get_curre
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
 @app.get("/notifications/{user_id}")
-async def get_notifications(user_id: str, user=Depends(get_current_user)):
+async def get_notifications(user_id: str, response: Response,
+                            limit: Optional[int] = Query(None, ge=1, le=PAGE_MAX_LIMIT),
+                            cursor: Optional[str] = None, total: bool = False, user=Depends(get_current_user)):
     if user.id != user_id and user.role not in ["HR", "demo_hr"]:
         raise HTTPException(status_code=403, detail="Not authorized")
+    after = _page_after(cursor, f"notifications:{user_id}", _NOTIFICATION_KEYS)
     try:
-        notifications = supabase_service.table("notifications").select("*").eq("user_id", user_id).order("created_at", desc=True).execute()
+        if limit or cursor:
+            page = await fetch_page(
+                lambda count: db.table("notifications").select("*", count=count).eq("user_id", user_id),
+                _NOTIFICATION_KEYS, limit or PAGE_DEFAULT_LIMIT, after, f"notifications:{user_id}", total,
+            )
+            _set_page_headers(response, page)
+            return page.rows
+        notifications = await db.table("notifications").select("*").eq("user_id", user_id).order("created_at", desc=True).execute()
+        if total:
+            response.headers["X-Total-Count"] = str(len(notifications.data or []))
         return notifications.data
     except Exception as e:
         logging.exception("Error fetching notifications")
@@ -1136,7 +2400,7 @@ async def get_notifications(user_id: str, user=Depends(get_current_user)):
 @app.patch("/notifications/{notif_id}/read")
 async def mark_notification_read(notif_id: str, user=Depends(get_current_user)):
     try:
-        supabase_service.table("notifications").update({"read": True}).eq("notif_id", notif_id).execute()
+        await db.table("notifications").update({"read": True}).eq("notif_id", notif_id).execute()
         return {"message": "Notification marked as read"}
     except Exception as e:
         logging.exception("Error marking notification as read")
@@ -1174,7 +2438,7 @@ async def make_decision(resume_id: str, decision: Decision, user=Depends(get_cur
         from datetime import datetime
         
         # Update resume with decision (NO email or notification sent yet)
-        resume = supabase_service.table("resumes").update({
+        resume = await db.table("resumes").update({
             "decision": decision.decision,
             "decided_at": datetime.now().isoformat(),
             "decided_by": user.id
@@ -1192,7 +2456,7 @@ async def submit_decisions(jd_id: str, user=Depends(get_current_user)):
         raise HTTPException(status_code=403, detail="Not authorized")
     try:
         # Get all resumes for this job with non-pending decisions
-        resumes = supabase_service.table("resumes").select(
+        resumes = await db.table("resumes").select(
             "resume_id, user_id, decision"
         ).eq("jd_id", jd_id).neq("decision", "pending").execute()
         
@@ -1200,7 +2464,7 @@ async def submit_decisions(jd_id: str, user=Depends(get_current_user)):
             return {"message": "No decisions to submit", "emails_sent": 0}
         
         # Get job title
-        job_data = supabase_service.table("job_descriptions").select("title").eq("jd_id", jd_id).execute()
+        job_data = await db.table("job_descriptions").select("title").eq("jd_id", jd_id).execute()
         job_title = job_data.data[0]["title"] if job_data.data else "the position"
         
         emails_sent = 0
@@ -1211,7 +2475,7 @@ async def submit_decisions(jd_id: str, user=Depends(get_current_user)):
             decision = resume["decision"]
             
             # Get candidate email from user_profiles
-            candidate_profile = supabase_service.table("user_profiles").select(
+            candidate_profile = await db.table("user_profiles").select(
                 "email"
             ).eq("user_id", candidate_user_id).execute()
             
@@ -1220,7 +2484,8 @@ async def submit_decisions(jd_id: str, user=Depends(get_current_user)):
             
             # Send email notification (preferences feature removed as columns don't exist)
             if candidate_email:
-                email_sent = send_decision_email(
+                email_sent = await run_in_threadpool(
+                    send_decision_email,
                     candidate_email=candidate_email,
                     candidate_name=candidate_name,
                     job_title=job_title,
@@ -1233,7 +2498,7 @@ async def submit_decisions(jd_id: str, user=Depends(get_current_user)):
             
             # Create in-app notification
             message = f"Your application for {job_title} has been {decision}"
-            supabase_service.table("notifications").insert({
+            await db.table("notifications").insert({
                 "user_id": candidate_user_id,
                 "message": message,
                 "type": "decision"
@@ -1269,7 +2534,7 @@ async def debug_rasa_proxy():
 async def test_resume(user_id: str, jd_id: str):
     """Test endpoint to check if resume exists"""
     try:
-        result = supabase_service.table("resumes").select("*").eq("user_id", user_id).eq("jd_id", jd_id).execute()
+        result = await db.table("resumes").select("*").eq("user_id", user_id).eq("jd_id", jd_id).execute()
         return {
             "user_id": user_id,
             "jd_id": jd_id,
@@ -1290,8 +2555,8 @@ async def get_candidate_context_for_chatbot(user_id: str, jd_id: str):
         logging.info(f"[CHATBOT] Fetching context for user_id={user_id}, jd_id={jd_id}")
         
         # Fetch the most recent resume for this user and job
-        resume_resp = (
-            supabase_service
+        resume_resp = await (
+            db
             .table("resumes")
             .select("resume_id, extracted_text, skills, experience, education, score, upload_date")
             .eq("user_id", user_id)
@@ -1304,8 +2569,8 @@ async def get_candidate_context_for_chatbot(user_id: str, jd_id: str):
         logging.info(f"[CHATBOT] Resume query result: {len(resume_resp.data) if resume_resp.data else 0} records")
         
         # Fetch the job description with extracted data
-        jd_resp = (
-            supabase_service
+        jd_resp = await (
+            db
             .table("job_descriptions")
             .select("jd_id, title, description, requirements")
             .eq("jd_id", jd_id)
@@ -1402,8 +2667,8 @@ async def explain_resume_ranking(resume_id: str, token: str = Depends(oauth2_sch
         logging.info(f"[EXPLAIN] Generating explanation for resume_id={resume_id} by user {user.id}")
         
         # Fetch the resume - get match_score from applications table
-        resume_resp = (
-            supabase_service
+        resume_resp = await (
+            db
             .table("resumes")
             .select("resume_id, user_id, jd_id, extracted_text, skills, experience, education, score")
             .eq("resume_id", resume_id)
@@ -1416,8 +2681,8 @@ async def explain_resume_ranking(resume_id: str, token: str = Depends(oauth2_sch
         resume = resume_resp.data[0]
         
         # Get the actual match_score used for ranking from applications table
-        app_resp = (
-            supabase_service
+        app_resp = await (
+            db
             .table("applications")
             .select("match_score")
             .eq("resume_id", resume_id)
@@ -1432,8 +2697,8 @@ async def explain_resume_ranking(resume_id: str, token: str = Depends(oauth2_sch
             actual_match_score = resume.get("score", 0.0)
         
         # Fetch the associated job description
-        jd_resp = (
-            supabase_service
+        jd_resp = await (
+            db
             .table("job_descriptions")
             .select("jd_id, title, description, requirements")
             .eq("jd_id", resume["jd_id"])
@@ -1453,7 +2718,8 @@ async def explain_resume_ranking(resume_id: str, token: str = Depends(oauth2_sch
         # Generate LIME explanation (without recalculating score)
         from ai_processor import explain_ranking_with_lime
         
-        explanation = explain_ranking_with_lime(
+        explanation = await run_in_threadpool(
+            explain_ranking_with_lime,
             resume_text=resume.get("extracted_text", ""),
             jd_requirements=jd_requirements,
             resume_data={
@@ -1544,7 +2810,7 @@ async def get_resume_url(resume_path: str, user=Depends(get_current_user)):
         
         try:
             # Generate a signed URL that expires in 1 hour (3600 seconds)
-            result = supabase_service.storage.from_('resumes').create_signed_url(clean_path, 3600)
+            result = await run_in_threadpool(supabase_service.storage.from_('resumes').create_signed_url, clean_path, 3600)
             
             logging.info(f"[RESUME URL] Supabase result: {result}")
             
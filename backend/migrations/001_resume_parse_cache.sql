@@ -0,0 +1,19 @@
+-- Parse-result store for content-hash deduplication of uploaded resumes.
+-- Apply in the Supabase SQL editor (or `psql -f`) before deploying the backend.
+
+create table if not exists resume_parse_cache (
+    content_hash    text not null,
+    parser_version  text not null,
+    extracted_text  text,
+    structured_data jsonb,
+    embedding       jsonb,
+    embedding_model text,
+    user_id         uuid,
+    file_name       text,
+    file_url        text,
+    created_at      timestamptz not null default now(),
+    primary key (content_hash, parser_version)
+);
+
+alter table resumes add column if not exists content_hash text;
+create index if not exists resumes_content_hash_idx on resumes (content_hash);
@@ -0,0 +1,100 @@
+-- Atomic resume + application + notification write for the upload pipeline.
+-- Apply in the Supabase SQL editor (or `psql -f`) before deploying the backend;
+-- until then the backend falls back to three separate inserts.
+--
+-- Called through PostgREST as POST /rest/v1/rpc/submit_resume_application with
+-- {"p_resume": {...}, "p_application": {...}, "p_notification": {...}}.
+-- Each argument is a JSON object of column values; column types come from the
+-- tables themselves, so the function does not need to change when a column is added.
+-- Returns {"resume_id", "application_id", "notification_id", "created"}.
+-- Calling it again with the same resume_id is a no-op that returns the existing ids
+-- (created = false), so a retried ingestion job never duplicates rows.
+
+-- Insert one row from a JSON object, only setting the keys present (so column
+-- defaults still apply), and return the given column of the new row as text.
+create or replace function insert_jsonb_row(p_table regclass, p_row jsonb, p_returning text)
+returns text
+language plpgsql
+as $$
+declare
+    v_columns text;
+    v_result  text;
+begin
+    select string_agg(quote_ident(key), ', ') into v_columns from jsonb_object_keys(p_row) as key;
+    execute format(
+        'insert into %s (%s) select %s from jsonb_populate_record(null::%s, $1) returning %I::text',
+        p_table, v_columns, v_columns, p_table, p_returning
+    ) into v_result using p_row;
+    return v_result;
+end;
+$$;
+
+create or replace function submit_resume_application(
+    p_resume       jsonb,
+    p_application  jsonb,
+    p_notification jsonb default null
+)
+returns jsonb
+language plpgsql
+as $$
+declare
+    v_resume_id       text := p_resume ->> 'resume_id';
+    v_application_id  text;
+    v_notification_id text;
+begin
+    if v_resume_id is not null then
+        -- Serialise concurrent retries of the same job on the pre-assigned id
+        perform pg_advisory_xact_lock(hashtext(v_resume_id));
+        -- Cast the parameter, not the column, so both lookups use the resume_id indexes
+        if exists (select 1 from resumes where resume_id = v_resume_id::uuid) then
+            select application_id::text into v_application_id
+            from applications where resume_id = v_resume_id::uuid
+            limit 1;
+            return jsonb_build_object(
+                'resume_id', v_resume_id,
+                'application_id', v_application_id,
+                'notification_id', null,
+                'created', false
+            );
+        end if;
+    end if;
+
+    -- All three inserts run in this function's transaction: any failure rolls back all of them
+    v_resume_id := insert_jsonb_row('resumes', p_resume, 'resume_id');
+    v_application_id := insert_jsonb_row(
+        'applications', p_application || jsonb_build_object('resume_id', v_resume_id), 'application_id'
+    );
+    if p_notification is not null then
+        v_notification_id := insert_jsonb_row('notifications', p_notification, 'notif_id');
+    end if;
+
+    return jsonb_build_object(
+        'resume_id', v_resume_id,
+        'application_id', v_application_id,
+        'notification_id', v_notification_id,
+        'created', true
+    );
+end;
+$$;
+
+-- Only the backend (service role) may call these. Supabase grants EXECUTE on new
+-- functions to anon and authenticated directly, so revoking from public is not
+-- enough to keep them out of /rest/v1/rpc.
+revoke execute on function insert_jsonb_row(regclass, jsonb, text) from public;
+revoke execute on function submit_resume_application(jsonb, jsonb, jsonb) from public;
+do $$
+begin
+    if exists (select 1 from pg_roles where rolname = 'anon') then
+        revoke execute on function insert_jsonb_row(regclass, jsonb, text) from anon;
+        revoke execute on function submit_resume_application(jsonb, jsonb, jsonb) from anon;
+    end if;
+    if exists (select 1 from pg_roles where rolname = 'authenticated') then
+        revoke execute on function insert_jsonb_row(regclass, jsonb, text) from authenticated;
+        revoke execute on function submit_resume_application(jsonb, jsonb, jsonb) from authenticated;
+    end if;
+    if exists (select 1 from pg_roles where rolname = 'service_role') then
+        grant execute on function submit_resume_application(jsonb, jsonb, jsonb) to service_role;
+        grant execute on function insert_jsonb_row(regclass, jsonb, text) to service_role;
+    end if;
+end;
+$$;
@@ -0,0 +1,54 @@
+-- Bulk write of ranking results for /rank-resumes.
+-- Apply in the Supabase SQL editor (or `psql -f`) before deploying the backend;
+-- until then the backend falls back to one update per resume and table.
+--
+-- Called through PostgREST as POST /rest/v1/rpc/save_ranking_scores with
+-- {"p_scores": [{"resume_id": ..., "score": ..., "explanation": ...}, ...]}.
+-- Updates resumes.score / resumes.explanation and applications.match_score for
+-- every listed resume in one statement per table, and returns the number of
+-- resumes updated. The backend sends the list in chunks (RANKING_WRITE_BATCH_SIZE).
+--
+-- resume_id is read from the JSON as uuid, so both joins use the resume_id indexes
+-- (the primary key, and the one below) instead of scanning the tables.
+
+create index if not exists applications_resume_idx on applications (resume_id);
+
+create or replace function save_ranking_scores(p_scores jsonb)
+returns integer
+language plpgsql
+as $$
+declare
+    v_updated integer;
+begin
+    update resumes r
+    set score = s.score,
+        explanation = s.explanation
+    from jsonb_to_recordset(p_scores) as s (resume_id uuid, score double precision, explanation text)
+    where r.resume_id = s.resume_id;
+    get diagnostics v_updated = row_count;
+
+    update applications a
+    set match_score = s.score
+    from jsonb_to_recordset(p_scores) as s (resume_id uuid, score double precision)
+    where a.resume_id = s.resume_id;
+
+    return v_updated;
+end;
+$$;
+
+-- Only the backend (service role) may call it; Supabase also grants EXECUTE to anon
+-- and authenticated directly
+revoke execute on function save_ranking_scores(jsonb) from public;
+do $$
+begin
+    if exists (select 1 from pg_roles where rolname = 'anon') then
+        revoke execute on function save_ranking_scores(jsonb) from anon;
+    end if;
+    if exists (select 1 from pg_roles where rolname = 'authenticated') then
+        revoke execute on function save_ranking_scores(jsonb) from authenticated;
+    end if;
+    if exists (select 1 from pg_roles where rolname = 'service_role') then
+        grant execute on function save_ranking_scores(jsonb) to service_role;
+    end if;
+end;
+$$;
@@ -0,0 +1,33 @@
+-- Scoring fingerprint for incremental ranking.
+-- Apply in the Supabase SQL editor (or `psql -f`) after 003_save_ranking_scores.sql.
+--
+-- resumes.score_fingerprint records the JD requirements, weights, embedding model,
+-- parser and scoring version a score was computed with (see scoring_fingerprint in
+-- ai_processor.py). /rank-resumes only rescores resumes whose fingerprint is missing
+-- or different; until this is applied every run rescores every resume.
+
+alter table resumes add column if not exists score_fingerprint text;
+
+create or replace function save_ranking_scores(p_scores jsonb)
+returns integer
+language plpgsql
+as $$
+declare
+    v_updated integer;
+begin
+    update resumes r
+    set score = s.score,
+        explanation = s.explanation,
+        score_fingerprint = s.score_fingerprint
+    from jsonb_to_recordset(p_scores) as s (resume_id uuid, score double precision, explanation text, score_fingerprint text)
+    where r.resume_id = s.resume_id;
+    get diagnostics v_updated = row_count;
+
+    update applications a
+    set match_score = s.score
+    from jsonb_to_recordset(p_scores) as s (resume_id uuid, score double precision)
+    where a.resume_id = s.resume_id;
+
+    return v_updated;
+end;
+$$;
@@ -0,0 +1,37 @@
+-- Stored component scores for instant re-weighting.
+-- Apply in the Supabase SQL editor (or `psql -f`) after 004_score_fingerprint.sql.
+--
+-- resumes.score_components holds the four scores rank_resumes combines
+-- ({"skills", "semantic", "experience", "education"}, each 0-1), so
+-- POST /rank-resumes/{jd_id}/reweight can recompute final scores for new weights
+-- without re-running the model. save_ranking_scores now only overwrites the
+-- columns present in each entry, so a re-weight can update scores and keep the
+-- stored components.
+
+alter table resumes add column if not exists score_components jsonb;
+
+create or replace function save_ranking_scores(p_scores jsonb)
+returns integer
+language plpgsql
+as $$
+declare
+    v_updated integer;
+begin
+    update resumes r
+    set score = s.score,
+        explanation = coalesce(s.explanation, r.explanation),
+        score_fingerprint = coalesce(s.score_fingerprint, r.score_fingerprint),
+        score_components = coalesce(s.score_components, r.score_components)
+    from jsonb_to_recordset(p_scores)
+        as s (resume_id uuid, score double precision, explanation text, score_fingerprint text, score_components jsonb)
+    where r.resume_id = s.resume_id;
+    get diagnostics v_updated = row_count;
+
+    update applications a
+    set match_score = s.score
+    from jsonb_to_recordset(p_scores) as s (resume_id uuid, score double precision)
+    where a.resume_id = s.resume_id;
+
+    return v_updated;
+end;
+$$;
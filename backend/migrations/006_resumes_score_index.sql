@@ -0,0 +1,11 @@
+-- Index for reading a posting's best-scored resumes.
+-- Apply in the Supabase SQL editor (or `psql -f`); independent of the other migrations.
+--
+-- GET /resumes/{jd_id}?top_k=N asks for `order=score.desc.nullslast&limit=N` on one
+-- posting. With this index Postgres reads the first N index entries for the posting
+-- instead of sorting all of its resumes. Unscored resumes sort last (a top-K run leaves
+-- most scores NULL until its deferred writes land), and the index uses the same NULLS
+-- placement so it serves the ordering as is. resume_id breaks ties, so the same index
+-- serves the paginated list (migrations/008).
+
+create index if not exists resumes_jd_score_idx on resumes (jd_id, score desc nulls last, resume_id desc);
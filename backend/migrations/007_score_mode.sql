@@ -0,0 +1,38 @@
+-- How each ranking score was produced.
+-- Apply in the Supabase SQL editor (or `psql -f`) after 005_score_components.sql.
+--
+-- resumes.score_mode is "semantic" (embedding similarity), "lexical" (skipped by the
+-- lexical prefilter) or "fast" (keyword-only scoring, because the caller asked for
+-- fast ranking or the model was busy or unavailable). Fast scores carry their own
+-- score_fingerprint, so a later full-quality run rescores exactly those.
+-- save_ranking_scores now also writes score_mode when an entry has one.
+
+alter table resumes add column if not exists score_mode text;
+
+create or replace function save_ranking_scores(p_scores jsonb)
+returns integer
+language plpgsql
+as $$
+declare
+    v_updated integer;
+begin
+    update resumes r
+    set score = s.score,
+        explanation = coalesce(s.explanation, r.explanation),
+        score_fingerprint = coalesce(s.score_fingerprint, r.score_fingerprint),
+        score_components = coalesce(s.score_components, r.score_components),
+        score_mode = coalesce(s.score_mode, r.score_mode)
+    from jsonb_to_recordset(p_scores)
+        as s (resume_id uuid, score double precision, explanation text, score_fingerprint text,
+              score_components jsonb, score_mode text)
+    where r.resume_id = s.resume_id;
+    get diagnostics v_updated = row_count;
+
+    update applications a
+    set match_score = s.score
+    from jsonb_to_recordset(p_scores) as s (resume_id uuid, score double precision)
+    where a.resume_id = s.resume_id;
+
+    return v_updated;
+end;
+$$;
@@ -0,0 +1,29 @@
+-- Indexes for cursor pagination of the list endpoints.
+-- Apply in the Supabase SQL editor (or `psql -f`); the resumes list also needs 006.
+--
+-- A paginated list reads `limit` rows in its ordering, starting after the previous
+-- page's last key (see pagination.py). Each index below matches one list's filter
+-- column and ordering, including its unique tie-breaker and NULLS placement, so a
+-- page is a single index range scan however deep the client has paged.
+
+-- GET /jobs (created_at desc, jd_id desc); the closed-status filter is applied on the scan
+create index if not exists job_descriptions_created_idx
+    on job_descriptions (created_at desc, jd_id desc);
+
+-- GET /hr/jobs
+create index if not exists job_descriptions_hr_created_idx
+    on job_descriptions (hr_user_id, created_at desc, jd_id desc);
+
+-- GET /resumes/{jd_id} is served by resumes_jd_score_idx from 006
+
+-- GET /hr/jobs/{jd_id}/candidates: best match first, unscored applications last
+create index if not exists applications_jd_match_idx
+    on applications (jd_id, match_score desc nulls last, application_id desc);
+
+-- GET /applications/{user_id}
+create index if not exists applications_user_updated_idx
+    on applications (user_id, updated_at desc, application_id desc);
+
+-- GET /notifications/{user_id}
+create index if not exists notifications_user_created_idx
+    on notifications (user_id, created_at desc, notif_id desc);
@@ -0,0 +1,127 @@
+"""
+Opaque cursor (keyset) pagination for the list endpoints.
+
+A page is read in the list's ordering plus a unique tie-breaker column, starting
+strictly after the key of the previous page's last row. Every page is therefore one
+index range scan of `limit` rows however deep the client has paged (unlike OFFSET),
+and rows inserted meanwhile do not shift later pages. The cursor given to clients
+encodes that last key, the number of rows already served and which list it belongs
+to; clients pass it back unchanged.
+"""
+import os
+import json
+import base64
+from typing import Any, Callable, List, Optional
+
+# Page size when a client passes a cursor without a limit, and the largest it may ask for
+PAGE_DEFAULT_LIMIT = int(os.getenv("PAGE_DEFAULT_LIMIT", "50"))
+PAGE_MAX_LIMIT = int(os.getenv("PAGE_MAX_LIMIT", "500"))
+
+
+class InvalidCursor(ValueError):
+    """A cursor that is malformed or was issued for a different list."""
+
+
+class SortKey:
+    """
+    One column of a keyset ordering. NULLs sort as Postgres sorts them by default
+    (first when descending, last when ascending) unless nulls_first says otherwise;
+    the index serving the list should use the same NULLS placement.
+    """
+
+    def __init__(self, column: str, desc: bool = False, nullable: bool = False, nulls_first: Optional[bool] = None):
+        self.column = column
+        self.desc = desc
+        self.nullable = nullable
+        self.nulls_first = desc if nulls_first is None else nulls_first
+
+
+class Page:
+    def __init__(self, rows: List[dict], next_cursor: Optional[str], offset: int, total: Optional[int]):
+        self.rows = rows
+        self.next_cursor = next_cursor
+        # Rows served before this page, e.g. to continue a rank numbering
+        self.offset = offset
+        self.total = total
+
+
+def encode_cursor(tag: str, values: List[Any], served: int) -> str:
+    payload = json.dumps({"t": tag, "k": values, "n": served}, separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, tag: str, keys: List[SortKey]) -> tuple:
+    """
+    Returns:
+        (key values of the last row served, number of rows served)
+
+    Raises:
+        InvalidCursor: not a cursor from this list
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        values, served = payload["k"], int(payload["n"])
+    except Exception:
+        raise InvalidCursor("Malformed cursor")
+    if payload.get("t") != tag or not isinstance(values, list) or len(values) != len(keys):
+        raise InvalidCursor("Cursor belongs to a different list")
+    return values, served
+
+
+def _literal(value) -> str:
+    # Double-quoted so commas, dots and parentheses in values do not break the filter list
+    text = "null" if value is None else str(value)
+    return '"' + text.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def _after(keys: List[SortKey], values: List[Any]) -> str:
+    """PostgREST condition for rows that sort strictly after `values` in the keys' order."""
+    key, value = keys[0], values[0]
+    column = key.column
+    terms = []
+    if value is None:
+        # Within the NULL block only the later columns decide; non-NULLs follow it when NULLs sort first
+        if len(keys) > 1:
+            terms.append(f"and({column}.is.null,{_after(keys[1:], values[1:])})")
+        if key.nulls_first:
+            terms.append(f"{column}.not.is.null")
+    else:
+        terms.append(f"{column}.{'lt' if key.desc else 'gt'}.{_literal(value)}")
+        if len(keys) > 1:
+            terms.append(f"and({column}.eq.{_literal(value)},{_after(keys[1:], values[1:])})")
+        if key.nullable and not key.nulls_first:
+            terms.append(f"{column}.is.null")
+    return terms[0] if len(terms) == 1 else f"or({','.join(terms)})"
+
+
+async def fetch_page(base: Callable[[Optional[str]], Any], keys: List[SortKey], limit: int,
+                     after: Optional[tuple] = None, tag: str = "", with_total: bool = False) -> Page:
+    """
+    Read one page of a list.
+
+    Args:
+        base: Returns the list's query (select and filters, no ordering) for a count
+            mode (None or "exact"); called again for the total on pages after the first
+        keys: Ordering, ending with a unique non-null column
+        after: Decoded cursor of the previous page (see decode_cursor), or None for the first page
+        tag: Name of the list, stored in the cursor
+        with_total: Also count the whole list (an extra query on pages after the first)
+    """
+    values, served = after if after else (None, 0)
+    query = base("exact" if with_total and after is None else None)
+    if values is not None:
+        condition = _after(keys, values)
+        query = query.or_(condition[3:-1] if condition.startswith("or(") else condition)
+    for key in keys:
+        query = query.order(key.column, desc=key.desc, nullsfirst=key.nulls_first)
+    response = await query.limit(limit + 1).execute()
+    rows = response.data or []
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(tag, [rows[-1].get(key.column) for key in keys], served + len(rows))
+
+    total = None
+    if with_total:
+        total = response.count if after is None else (await base("exact").limit(1).execute()).count
+    return Page(rows, next_cursor, served, total)
@@ -0,0 +1,93 @@
+"""
+Parse-result store for uploaded resumes, keyed by content hash and parser version.
+
+Candidates often upload the same file to several postings (or retry after a token
+refresh), so the extracted text, structured data and embedding are stored once per
+(sha256 of the bytes, PARSER_VERSION) in the `resume_parse_cache` table and reused.
+See migrations/001_resume_parse_cache.sql.
+"""
+import hashlib
+import logging
+from typing import Dict, Iterable, Optional
+
+from ai_processor import PARSER_VERSION
+
+logger = logging.getLogger(__name__)
+
+PARSE_CACHE_TABLE = "resume_parse_cache"
+
+
+def content_hash(data: bytes) -> str:
+    """Return the sha256 hex digest of uploaded file bytes."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def get_cached_parse(client, digest: str) -> Optional[dict]:
+    """Return the stored parse for this content hash and parser version, or None."""
+    try:
+        resp = (
+            client.table(PARSE_CACHE_TABLE)
+            .select("content_hash, extracted_text, structured_data, user_id, file_name, file_url")
+            .eq("content_hash", digest)
+            .eq("parser_version", PARSER_VERSION)
+            .limit(1)
+            .execute()
+        )
+        rows = resp.data or []
+        return rows[0] if rows else None
+    except Exception as e:
+        # A missing table or transient error just means we parse again
+        logger.warning(f"[PARSE CACHE] lookup failed for {digest}: {e}")
+        return None
+
+
+def store_parse(client, digest: str, extracted_text: str, structured_data: dict,
+                user_id: str = None, file_name: str = None, file_url: str = None):
+    """Store a parse result. Failures are logged and never fail the upload."""
+    try:
+        client.table(PARSE_CACHE_TABLE).upsert({
+            "content_hash": digest,
+            "parser_version": PARSER_VERSION,
+            "extracted_text": extracted_text,
+            "structured_data": structured_data,
+            "user_id": user_id,
+            "file_name": file_name,
+            "file_url": file_url,
+        }, on_conflict="content_hash,parser_version").execute()
+    except Exception as e:
+        logger.warning(f"[PARSE CACHE] store failed for {digest}: {e}")
+
+
+def get_cached_embeddings(client, digests: Iterable[str], model_name: str) -> Dict[str, list]:
+    """Return {content_hash: embedding} for hashes that have an embedding from `model_name`."""
+    digests = list({d for d in digests if d})
+    if not digests:
+        return {}
+    try:
+        resp = (
+            client.table(PARSE_CACHE_TABLE)
+            .select("content_hash, embedding")
+            .in_("content_hash", digests)
+            .eq("parser_version", PARSER_VERSION)
+            .eq("embedding_model", model_name)
+            .execute()
+        )
+        return {r["content_hash"]: r["embedding"] for r in (resp.data or []) if r.get("embedding")}
+    except Exception as e:
+        logger.warning(f"[PARSE CACHE] embedding lookup failed: {e}")
+        return {}
+
+
+def store_embeddings(client, embeddings: Dict[str, list], model_name: str):
+    """Attach embeddings to existing cache rows so later rankings can skip encoding."""
+    for digest, embedding in embeddings.items():
+        try:
+            (
+                client.table(PARSE_CACHE_TABLE)
+                .update({"embedding": embedding, "embedding_model": model_name})
+                .eq("content_hash", digest)
+                .eq("parser_version", PARSER_VERSION)
+                .execute()
+            )
+        except Exception as e:
+            logger.warning(f"[PARSE CACHE] embedding store failed for {digest}: {e}")
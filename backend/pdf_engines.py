@@ -0,0 +1,183 @@
+"""
+Pluggable PDF text engines used by ai_processor.extract_text.
+
+A fast engine (pypdfium2, then pdfminer's plain text mode) is tried first and
+pdfplumber's layout analysis is only used when the fast output fails the
+quality heuristics below (too little text or too many garbled characters).
+"""
+import os
+import re
+import time
+import logging
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Engines are tried in this order; pdfplumber is always appended as the final fallback.
+PDF_TEXT_ENGINES = [e.strip() for e in os.getenv("PDF_TEXT_ENGINES", "pypdfium2,pdfminer").split(",") if e.strip()]
+FALLBACK_ENGINE = "pdfplumber"
+
+# Quality thresholds for accepting a fast engine's output
+PDF_MIN_CHARS_PER_PAGE = int(os.getenv("PDF_MIN_CHARS_PER_PAGE", "40"))
+PDF_MAX_GARBLED_RATIO = float(os.getenv("PDF_MAX_GARBLED_RATIO", "0.05"))
+# Pages with fewer non-whitespace characters than this have no usable text layer (scanned)
+PDF_SCANNED_PAGE_MAX_CHARS = int(os.getenv("PDF_SCANNED_PAGE_MAX_CHARS", "10"))
+
+# "(cid:123)" is what pdfminer emits for glyphs it cannot map to unicode
+_CID_PATTERN = re.compile(r"\(cid:\d+\)")
+_GARBLED_CHARS = re.compile(r"[\ufffd\ue000-\uf8ff\x00-\x08\x0e-\x1f]")
+
+
+def _extract_pypdfium2(file_path) -> List[str]:
+    import pypdfium2 as pdfium
+
+    pages = []
+    pdf = pdfium.PdfDocument(file_path)
+    try:
+        for i in range(len(pdf)):
+            page = pdf[i]
+            textpage = page.get_textpage()
+            try:
+                pages.append(textpage.get_text_range() or "")
+            finally:
+                textpage.close()
+                page.close()
+    finally:
+        pdf.close()
+    return pages
+
+
+def _extract_pdfminer(file_path) -> List[str]:
+    from pdfminer.high_level import extract_text as pdfminer_extract_text
+
+    text = pdfminer_extract_text(file_path)
+    # pdfminer separates pages with a form feed; drop the empty tail after the last one
+    pages = text.split("\x0c")
+    if len(pages) > 1 and not pages[-1].strip():
+        pages = pages[:-1]
+    return pages
+
+
+def _extract_pdfplumber(file_path) -> List[str]:
+    import pdfplumber
+
+    with pdfplumber.open(file_path) as pdf:
+        # extract_text() returns None for pages without a text layer
+        return [page.extract_text() or "" for page in pdf.pages]
+
+
+_ENGINES: Dict[str, Callable[[str], List[str]]] = {
+    "pypdfium2": _extract_pypdfium2,
+    "pdfminer": _extract_pdfminer,
+    "pdfplumber": _extract_pdfplumber,
+}
+
+
+def register_pdf_engine(name: str, func: Callable[[str], List[str]]):
+    """Register a PDF engine. `func(file_path)` must return one text string per page."""
+    _ENGINES[name] = func
+
+
+def is_scanned_page(page_text: Optional[str]) -> bool:
+    """Return True if a page has no usable text layer and needs OCR."""
+    return len(re.sub(r"\s+", "", page_text or "")) <= PDF_SCANNED_PAGE_MAX_CHARS
+
+
+def text_quality_ok(pages: List[str]) -> bool:
+    """
+    Return True if extracted page texts look like usable resume text.
+
+    Only pages that have a text layer are judged; scanned pages are left to OCR
+    because no text engine can recover them. A fully scanned document is accepted
+    as-is so that pdfplumber is not run for nothing.
+    """
+    if not pages:
+        return False
+    text_pages = [p for p in pages if not is_scanned_page(p)]
+    if not text_pages:
+        return True
+    stripped = re.sub(r"\s+", "", "".join(text_pages))
+    if len(stripped) < PDF_MIN_CHARS_PER_PAGE * len(text_pages):
+        return False
+    garbled = len(_GARBLED_CHARS.findall(stripped)) + 5 * len(_CID_PATTERN.findall(stripped))
+    return garbled / max(1, len(stripped)) <= PDF_MAX_GARBLED_RATIO
+
+
+def extract_pdf_pages(file_path, stats: Optional[dict] = None) -> List[str]:
+    """
+    Extract per-page text from a PDF using the configured engine chain.
+
+    Args:
+        file_path: Path to the PDF file
+        stats: Optional dict that receives the engine used, elapsed time and every attempt
+
+    Returns:
+        List of page texts from the first engine whose output passed the quality check,
+        or the pdfplumber output if none did (the first readable output if pdfplumber fails).
+    """
+    attempts = []
+    chain = [e for e in PDF_TEXT_ENGINES if e != FALLBACK_ENGINE] + [FALLBACK_ENGINE]
+    pages: List[str] = []
+    engine_used = None
+    best_effort = None  # first readable output, kept in case the fallback engine fails too
+    started = time.perf_counter()
+
+    for name in chain:
+        func = _ENGINES.get(name)
+        if func is None:
+            logger.warning(f"[EXTRACT] Unknown PDF engine '{name}', skipping")
+            continue
+        t0 = time.perf_counter()
+        try:
+            candidate = func(file_path)
+        except ImportError as e:
+            attempts.append({"engine": name, "elapsed_ms": 0.0, "accepted": False, "error": f"not installed: {e}"})
+            continue
+        except Exception as e:
+            logger.warning(f"[EXTRACT] PDF engine {name} failed on {file_path}: {e}")
+            attempts.append({"engine": name, "elapsed_ms": round((time.perf_counter() - t0) * 1000, 2), "accepted": False, "error": str(e)})
+            continue
+        elapsed_ms = round((time.perf_counter() - t0) * 1000, 2)
+        accepted = name == FALLBACK_ENGINE or text_quality_ok(candidate)
+        attempts.append({"engine": name, "elapsed_ms": elapsed_ms, "accepted": accepted})
+        if accepted:
+            pages, engine_used = candidate, name
+            break
+        if best_effort is None:
+            best_effort = (candidate, name)
+
+    if engine_used is None and best_effort is not None:
+        pages, engine_used = best_effort
+
+    total_ms = round((time.perf_counter() - started) * 1000, 2)
+    logger.info(f"[EXTRACT] pdf engine={engine_used} pages={len(pages)} chars={sum(len(p) for p in pages)} elapsed_ms={total_ms} attempts={attempts}")
+    if stats is not None:
+        stats.update({"engine": engine_used, "elapsed_ms": total_ms, "pages": len(pages), "attempts": attempts})
+    if engine_used is None:
+        raise ValueError("No PDF text engine could read the file")
+    return pages
+
+
+def render_pdf_page(file_path, page_index: int, dpi: int):
+    """Rasterise a single PDF page to a grayscale PIL image at the given DPI."""
+    try:
+        import pypdfium2 as pdfium
+    except ImportError:
+        pdfium = None
+
+    if pdfium is not None:
+        pdf = pdfium.PdfDocument(file_path)
+        try:
+            page = pdf[page_index]
+            try:
+                bitmap = page.render(scale=dpi / 72.0, grayscale=True)
+                return bitmap.to_pil().convert("L")
+            finally:
+                page.close()
+        finally:
+            pdf.close()
+
+    import pdfplumber
+
+    with pdfplumber.open(file_path) as pdf:
+        return pdf.pages[page_index].to_image(resolution=dpi).original.convert("L")
@@ -0,0 +1,185 @@
+"""
+In-process registry of background ranking jobs.
+
+A ranking run for a large posting outlives a proxy timeout, so it runs as an
+asyncio task and reports its phase (fetch / encode / score / write), how many
+resumes it has processed and an ETA. Clients follow a job over server-sent events
+and can cancel it; cancellation takes effect at the next progress report.
+
+Jobs live in memory, so they are per worker process and do not survive a restart;
+the scores a finished job wrote are in the database either way.
+"""
+import os
+import json
+import time
+import uuid
+import asyncio
+import logging
+import threading
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Finished jobs stay queryable this long
+RANKING_JOB_RETENTION_SECONDS = float(os.getenv("RANKING_JOB_RETENTION_SECONDS", "3600"))
+
+# SSE: how often a stream checks for changes, and sends a keep-alive comment when nothing changed
+_EVENT_POLL_INTERVAL = 0.5
+_KEEPALIVE_SECONDS = 15.0
+
+TERMINAL_STATUSES = ("done", "failed", "cancelled")
+
+
+class RankingCancelled(Exception):
+    """Raised from a progress report once the job has been asked to stop."""
+
+
+class RankingJobConflict(Exception):
+    """Raised by start() when the posting already has a running job that cannot be reused."""
+
+    def __init__(self, job: "RankingJob"):
+        super().__init__(f"Ranking job {job.job_id} is already running for this posting")
+        self.job = job
+
+
+class RankingJob:
+    """State of one ranking run. progress() may be called from worker threads."""
+
+    def __init__(self, jd_id: str, user_id: str, params: Optional[dict] = None):
+        self.job_id = str(uuid.uuid4())
+        self.jd_id = jd_id
+        self.user_id = user_id
+        self.params = params or {}
+        self.status = "running"
+        self.phase = "queued"
+        self.processed = 0
+        self.total = 0
+        self.result: Optional[dict] = None
+        self.error: Optional[str] = None
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+        self._phase_started = time.monotonic()
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+
+    def progress(self, phase: str, processed: int, total: int):
+        """
+        Record progress within a phase.
+
+        Raises:
+            RankingCancelled: if cancel() was called, so the run stops at this point
+        """
+        if self._cancel.is_set():
+            raise RankingCancelled()
+        with self._lock:
+            if phase != self.phase:
+                self.phase = phase
+                self._phase_started = time.monotonic()
+            self.processed = processed
+            self.total = total
+
+    def cancel(self):
+        self._cancel.set()
+
+    def finish(self, status: str, result: Optional[dict] = None, error: Optional[str] = None):
+        with self._lock:
+            self.status = status
+            if status == "done":
+                self.processed = self.total
+            self.result = result
+            self.error = error
+            self.finished_at = time.time()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            eta = None
+            if self.status == "running" and 0 < self.processed < self.total:
+                # Remaining work in the current phase at the rate seen so far in it
+                rate = self.processed / max(1e-6, time.monotonic() - self._phase_started)
+                eta = round((self.total - self.processed) / rate, 1)
+            return {
+                "job_id": self.job_id,
+                "jd_id": self.jd_id,
+                "status": self.status,
+                "phase": self.phase,
+                "processed": self.processed,
+                "total": self.total,
+                "eta_seconds": eta,
+                "elapsed_seconds": round((self.finished_at or time.time()) - self.started_at, 1),
+                "cancel_requested": self._cancel.is_set() and self.status == "running",
+                "result": self.result,
+                "error": self.error,
+            }
+
+
+class RankingJobRegistry:
+    """Starts ranking jobs as asyncio tasks (one running job per posting) and tracks them."""
+
+    def __init__(self, retention_seconds: float = RANKING_JOB_RETENTION_SECONDS):
+        self.retention_seconds = retention_seconds
+        self._jobs: Dict[str, RankingJob] = {}
+
+    def start(self, jd_id: str, user_id: str, run: Callable[[RankingJob], Awaitable[dict]],
+              params: Optional[dict] = None) -> RankingJob:
+        """
+        Start `run(job)` in the background. A posting runs one job at a time: the same
+        user asking again with the same params gets the running job back.
+
+        Must be called from the event loop.
+
+        Raises:
+            RankingJobConflict: the posting has a running job for another user or other params
+        """
+        self._purge()
+        params = params or {}
+        for job in self._jobs.values():
+            if job.jd_id == jd_id and job.status == "running":
+                if job.user_id == user_id and job.params == params:
+                    return job
+                raise RankingJobConflict(job)
+        job = RankingJob(jd_id, user_id, params)
+        self._jobs[job.job_id] = job
+        job.task = asyncio.get_running_loop().create_task(self._run(job, run))
+        return job
+
+    def get(self, job_id: str) -> Optional[RankingJob]:
+        self._purge()
+        return self._jobs.get(job_id)
+
+    async def _run(self, job: RankingJob, run: Callable[[RankingJob], Awaitable[dict]]):
+        try:
+            result = await run(job)
+            job.finish("done", result=result)
+            logger.info(f"[RANK JOB] {job.job_id} for jd {job.jd_id} done in {time.time() - job.started_at:.1f}s")
+        except RankingCancelled:
+            job.finish("cancelled")
+            logger.info(f"[RANK JOB] {job.job_id} for jd {job.jd_id} cancelled during {job.phase}")
+        except Exception as e:
+            job.finish("failed", error=getattr(e, "detail", None) or str(e))
+            logger.exception(f"[RANK JOB] {job.job_id} for jd {job.jd_id} failed")
+
+    def _purge(self):
+        cutoff = time.time() - self.retention_seconds
+        for job_id in [j.job_id for j in self._jobs.values() if j.finished_at and j.finished_at < cutoff]:
+            del self._jobs[job_id]
+
+    @staticmethod
+    async def events(job: RankingJob) -> AsyncIterator[str]:
+        """Server-sent event stream: one `data:` event per change, ending after a terminal status."""
+        last = None
+        last_sent = time.monotonic()
+        while True:
+            snapshot = job.snapshot()
+            # The timing fields change on every poll; only send when the progress itself did
+            comparable = {k: v for k, v in snapshot.items() if k not in ("elapsed_seconds", "eta_seconds")}
+            if comparable != last:
+                last = comparable
+                last_sent = time.monotonic()
+                yield f"event: progress\ndata: {json.dumps(snapshot)}\n\n"
+                if snapshot["status"] in TERMINAL_STATUSES:
+                    return
+            elif time.monotonic() - last_sent >= _KEEPALIVE_SECONDS:
+                last_sent = time.monotonic()
+                yield ": keep-alive\n\n"
+            await asyncio.sleep(_EVENT_POLL_INTERVAL)
@@ -0,0 +1,112 @@
+"""
+Benchmark the streaming DOCX extractor against python-docx on large files.
+
+Generates synthetic resumes with python-docx (paragraphs plus a skills table),
+then times both extractors (best of --repeat runs) and measures the peak RSS
+growth of each in a fresh process, since python-docx allocates inside lxml
+where tracemalloc cannot see it.
+
+Run:
+    cd backend
+    python scripts/benchmark_docx_extraction.py --paragraphs 2000 5000 20000
+"""
+
+import sys
+import time
+import argparse
+import resource
+import tempfile
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from docx import Document
+from docx_stream import extract_docx_text
+
+
+def build_docx(path, paragraphs):
+    doc = Document()
+    doc.add_heading("Jane Candidate", level=1)
+    for i in range(paragraphs):
+        doc.add_paragraph(
+            f"Software Engineer at Company {i} (2018 - 2022). Built data pipelines in Python, "
+            f"deployed services on AWS with Docker and Kubernetes, mentored {i % 7} engineers."
+        )
+        if i % 200 == 0:
+            table = doc.add_table(rows=3, cols=2)
+            for row, (label, value) in enumerate([("Skills", "Python, SQL, React"),
+                                                   ("Cloud", "AWS, Azure"),
+                                                   ("Tools", "Git, Jenkins")]):
+                table.cell(row, 0).text = label
+                table.cell(row, 1).text = value
+    doc.save(path)
+
+
+def python_docx_text(path):
+    doc = Document(path)
+    return "".join(paragraph.text for paragraph in doc.paragraphs)
+
+
+EXTRACTORS = {"python-docx": python_docx_text, "stream": extract_docx_text}
+
+
+def best_time(func, path, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        text = func(path)
+        best = min(best, time.perf_counter() - start)
+    return best, text
+
+
+def _peak_rss_kb():
+    # VmHWM is reset on exec; ru_maxrss is inherited from the (large) parent process
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _rss_growth_mb(name, path):
+    """Run one extractor in this (fresh) process and return its peak RSS growth in MB."""
+    before = _peak_rss_kb()
+    EXTRACTORS[name](path)
+    return (_peak_rss_kb() - before) / 1024.0
+
+
+def rss_growth_mb(name, path):
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return pool.submit(_rss_growth_mb, name, path).result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--paragraphs", type=int, nargs="+", default=[1000, 5000, 20000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'paragraphs':>10} | {'python-docx s':>13} | {'stream s':>9} | {'speedup':>7} | "
+          f"{'python-docx MB':>14} | {'stream MB':>9} | {'table text':>10}")
+    print("-" * 90)
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in args.paragraphs:
+            path = str(Path(tmp) / f"resume_{count}.docx")
+            build_docx(path, count)
+            base_time, base_text = best_time(python_docx_text, path, args.repeat)
+            stream_time, stream_text = best_time(extract_docx_text, path, args.repeat)
+            base_peak = rss_growth_mb("python-docx", path)
+            stream_peak = rss_growth_mb("stream", path)
+            has_table_text = "Python, SQL, React" in stream_text and "Python, SQL, React" not in base_text
+            print(f"{count:>10} | {base_time:>13.3f} | {stream_time:>9.3f} | {base_time / stream_time:>6.1f}x | "
+                  f"{base_peak:>14.1f} | {stream_peak:>9.1f} | {'recovered' if has_table_text else '-':>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmark: peak memory of a ranking run as the number of applicants grows.
+
+Runs the /rank-resumes pipeline (keyset pages, projected columns, overlapped
+fetch/score/write) against an in-process stand-in for PostgREST that serves N
+synthetic resumes, with a trivial scorer so only the data handling is measured.
+Peak traced Python memory should stay roughly flat as N grows, since at most about
+three pages of RANKING_PAGE_SIZE resumes are held at once.
+
+Run:
+    cd backend
+    python scripts/benchmark_ranking_memory.py --applicants 1000 5000 20000
+"""
+
+import os
+import sys
+import json
+import asyncio
+import argparse
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+RESUME_TEXT = "Senior Python developer with Django, PostgreSQL and AWS experience. " * 60
+
+
+def stand_in_postgrest(n: int):
+    """httpx transport answering the ranking queries for n resumes (ids r000000...)."""
+    ids = [f"r{i:06d}" for i in range(n)]
+
+    def row(resume_id, columns):
+        full = {"resume_id": resume_id, "extracted_text": RESUME_TEXT, "skills": ["Python", "Django"],
+                "experience": [{"role": "Developer", "years": 4}], "education": [{"degree": "B.Tech"}],
+                "content_hash": None, "score": None, "score_fingerprint": None}
+        return {c: full.get(c) for c in columns}
+
+    def handler(request: httpx.Request):
+        params = dict(request.url.params)
+        path = request.url.path
+        if path.endswith("/job_descriptions") and request.method == "GET":
+            return httpx.Response(200, json=[{"requirements": ["Python", "Django"], "weights": None}])
+        if path.endswith("/resumes") and request.method == "GET":
+            columns = [c.strip() for c in params["select"].split(",")]
+            start = 0
+            if "resume_id" in params:
+                after = params["resume_id"][len("gt."):]
+                start = int(after[1:]) + 1
+            page = ids[start:start + int(params.get("limit", n))]
+            return httpx.Response(200, json=[row(r, columns) for r in page], headers={"content-range": f"0-0/{n}"})
+        return httpx.Response(200, json=1 if "/rpc/" in path else [])
+
+    return httpx.MockTransport(handler)
+
+
+async def measure(main, n: int) -> dict:
+    main.db._client = httpx.AsyncClient(base_url="http://stand-in", transport=stand_in_postgrest(n))
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    result = await main._run_ranking("benchmark-jd", force=True)
+    peak = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    await main.db.aclose()
+    return {"applicants": n, "peak_mb": peak / 1e6, "scored": result["scored"], "total_ms": result["timings"]["total_ms"]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--applicants", type=int, nargs="+", default=[1000, 5000, 20000])
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="rank_bench_")
+    os.environ.update({
+        "SUPABASE_URL": "http://stand-in",
+        "SUPABASE_SERVICE_ROLE_KEY": "benchmark-key",
+        "INGESTION_QUEUE_PATH": os.path.join(workdir, "queue.sqlite3"),
+        "INGESTION_SPOOL_DIR": os.path.join(workdir, "spool"),
+    })
+    import main as backend
+
+    # Only the data flow is measured: no model, no embedding cache
+    def trivial_scorer(resumes, requirements, weights, progress=None, components=None, **options):
+        if components is not None:
+            components.extend(dict.fromkeys(backend.SCORE_COMPONENTS, 0.5) for _ in resumes)
+        if options.get("score_modes") is not None:
+            options["score_modes"].extend("semantic" for _ in resumes)
+        return [0.5] * len(resumes)
+
+    backend.rank_resumes_sharded = trivial_scorer
+    backend.get_cached_embeddings = lambda *args: {}
+
+    print(f"\nRanking pipeline, page size {backend.RANKING_PAGE_SIZE}")
+    print(f"{'applicants':>10} | {'peak MB':>8} | {'scored':>7} | {'total ms':>8}")
+    print("-" * 44)
+    for n in args.applicants:
+        r = asyncio.run(measure(backend, n))
+        print(f"{r['applicants']:>10} | {r['peak_mb']:>8.1f} | {r['scored']:>7} | {r['total_ms']:>8}")
+
+
+if __name__ == "__main__":
+    main()
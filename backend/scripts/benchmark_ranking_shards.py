@@ -0,0 +1,140 @@
+"""
+Benchmark: ranking throughput as the work is sharded across worker processes.
+
+Ranks the same synthetic applicant pool through the /rank-resumes pipeline
+(_rank_posting: keyset pages of RANKING_PAGE_SIZE, up to RANKING_SHARDS of them
+scored at once) at 1..N shards, against an in-process stand-in for PostgREST, and
+reports wall time, resumes per second and speedup over the single-process run. It
+also checks that every sharded run stores exactly the single-process scores. Speedup
+is bounded by the physical cores available; on a single-core machine the sharded
+runs only show the process hand-off overhead.
+
+The scorer is whatever rank_resumes uses in this environment: the SentenceTransformer
+(EMBEDDING_MODEL) when it is installed, otherwise the keyword fallback. The embedding
+cache is bypassed, so every run encodes.
+
+Run:
+    cd backend
+    python scripts/benchmark_ranking_shards.py --applicants 2000 --max-shards 8
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+SKILLS = ["Python", "Django", "Flask", "PostgreSQL", "AWS", "Docker", "Kubernetes", "React",
+          "TypeScript", "Java", "Spring Boot", "Kafka", "Redis", "Terraform", "Go", "GraphQL"]
+REQUIREMENTS = ["5+ years of experience with Python and Django", "PostgreSQL", "AWS", "Docker", "Kubernetes"]
+
+
+def synthetic_resumes(n: int, seed: int = 7):
+    rng = random.Random(seed)
+    resumes = []
+    for i in range(n):
+        skills = rng.sample(SKILLS, rng.randint(3, 8))
+        years = rng.randint(0, 12)
+        text = (f"Software engineer with {years} years of experience. " +
+                " ".join(f"Built production systems using {s}." for s in skills) * 8)
+        resumes.append({
+            "resume_id": f"r{i:06d}",
+            "extracted_text": text,
+            "skills": skills,
+            "experience": [{"role": "Engineer", "years": years}],
+            "education": [{"degree": rng.choice(["B.Tech", "M.Sc Computer Science", "PhD"])}],
+        })
+    return resumes
+
+
+def stand_in_postgrest(resumes, stored: dict):
+    """httpx transport answering the ranking queries for resumes; stored scores land in stored."""
+    by_id = sorted(resumes, key=lambda r: r["resume_id"])
+
+    def handler(request: httpx.Request):
+        params = dict(request.url.params)
+        path = request.url.path
+        if path.endswith("/job_descriptions") and request.method == "GET":
+            return httpx.Response(200, json=[{"requirements": REQUIREMENTS, "weights": None}])
+        if path.endswith("/resumes") and request.method == "GET":
+            columns = [c.strip() for c in params["select"].split(",")]
+            rows = by_id
+            resume_filter = params.get("resume_id", "")
+            if resume_filter.startswith("gt."):
+                rows = [r for r in rows if r["resume_id"] > resume_filter[len("gt."):]]
+            elif resume_filter.startswith("in."):
+                wanted = {v.strip('"') for v in resume_filter[len("in.("):-1].split(",")}
+                rows = [r for r in rows if r["resume_id"] in wanted]
+            rows = rows[:int(params.get("limit", len(rows)))]
+            return httpx.Response(200, json=[{c: r.get(c) for c in columns} for r in rows],
+                                  headers={"content-range": f"0-0/{len(resumes)}"})
+        if path.endswith("/rpc/save_ranking_scores"):
+            stored.update((row["resume_id"], row["score"]) for row in json.loads(request.content)["p_scores"])
+            return httpx.Response(200, json=1)
+        return httpx.Response(200, json=[])
+
+    return httpx.MockTransport(handler)
+
+
+async def rank(backend, resumes) -> dict:
+    stored = {}
+    backend.db._client = httpx.AsyncClient(base_url="http://stand-in", transport=stand_in_postgrest(resumes, stored))
+    try:
+        await backend._rank_posting("benchmark-jd", force=True)
+    finally:
+        await backend.db.aclose()
+    return stored
+
+
+def run(backend, resumes, shards: int):
+    backend.RANKING_SHARDS = shards
+    # Untimed run first, so worker start-up and model loading are not timed
+    asyncio.run(rank(backend, resumes))
+    started = time.perf_counter()
+    scores = asyncio.run(rank(backend, resumes))
+    return scores, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--applicants", type=int, default=2000)
+    parser.add_argument("--max-shards", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="rank_bench_")
+    os.environ.update({
+        "SUPABASE_URL": "http://stand-in",
+        "SUPABASE_SERVICE_ROLE_KEY": "benchmark-key",
+        "INGESTION_QUEUE_PATH": os.path.join(workdir, "queue.sqlite3"),
+        "INGESTION_SPOOL_DIR": os.path.join(workdir, "spool"),
+    })
+    import main as backend
+    import ai_processor
+
+    backend.get_cached_embeddings = lambda *args: {}
+    backend.store_embeddings = lambda *args: None
+
+    resumes = synthetic_resumes(args.applicants)
+    baseline, baseline_s = run(backend, resumes, 1)
+    print(f"\nRanking {args.applicants} applicants on {os.cpu_count()} CPUs, "
+          f"page size {backend.RANKING_PAGE_SIZE}, min shard size {ai_processor.RANKING_MIN_SHARD_SIZE}")
+    print(f"{'shards':>6} | {'seconds':>8} | {'resumes/s':>9} | {'speedup':>7} | same scores")
+    print("-" * 54)
+    print(f"{1:>6} | {baseline_s:>8.2f} | {args.applicants / baseline_s:>9.0f} | {1.0:>6.2f}x | yes")
+    for shards in range(2, args.max_shards + 1):
+        scores, seconds = run(backend, resumes, shards)
+        same = "yes" if scores == baseline else "NO"
+        print(f"{shards:>6} | {seconds:>8.2f} | {args.applicants / seconds:>9.0f} | {baseline_s / seconds:>6.2f}x | {same}")
+    ai_processor.shutdown_ranking_pool()
+
+
+if __name__ == "__main__":
+    main()
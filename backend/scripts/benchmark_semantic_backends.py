@@ -0,0 +1,84 @@
+"""
+Benchmark: semantic scoring throughput of the SEMANTIC_BACKEND engines on one core.
+
+Scores a synthetic applicant pool with rank_resumes under each backend and reports
+resumes per second, separately for the semantic engine alone (tfidf_similarities, or
+SentenceTransformer encoding) and for the whole ranking call. Also prints how far the
+two engines agree on the top of the ranking (overlap of the top K) when both are
+available. The transformer rows are skipped when sentence-transformers is not installed.
+
+Run:
+    cd backend
+    python scripts/benchmark_semantic_backends.py --applicants 5000
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import ai_processor
+from benchmark_ranking_shards import REQUIREMENTS, synthetic_resumes
+
+
+def time_engine(backend, resumes):
+    texts = [r["extracted_text"] for r in resumes]
+    query = " ".join(REQUIREMENTS)
+    started = time.perf_counter()
+    if backend == "tfidf":
+        ai_processor.tfidf_similarities(query, texts)
+    else:
+        model = ai_processor.get_sentence_model()
+        model.encode(texts, batch_size=ai_processor.ENCODE_BATCH_SIZE)
+    return time.perf_counter() - started
+
+
+def time_ranking(backend, resumes):
+    ai_processor.SEMANTIC_BACKEND = backend
+    batch = [dict(r) for r in resumes]
+    modes = []
+    started = time.perf_counter()
+    scores = ai_processor.rank_resumes(batch, REQUIREMENTS, score_modes=modes)
+    return scores, modes, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--applicants", type=int, default=5000)
+    parser.add_argument("--top", type=int, default=50)
+    args = parser.parse_args()
+
+    resumes = synthetic_resumes(args.applicants)
+    backends = ["tfidf"]
+    try:
+        ai_processor.get_sentence_model()
+        backends.append("transformer")
+    except Exception as e:
+        print(f"transformer backend unavailable ({e}); measuring tfidf only")
+
+    # Warm-up: import scikit-learn / load the model outside the timed runs
+    for backend in backends:
+        time_engine(backend, resumes[:10])
+
+    print(f"\nSemantic backends, {args.applicants} resumes, one process")
+    print(f"{'backend':>11} | {'engine res/s':>12} | {'ranking res/s':>13} | modes")
+    print("-" * 60)
+    rankings = {}
+    for backend in backends:
+        engine_s = time_engine(backend, resumes)
+        scores, modes, ranking_s = time_ranking(backend, resumes)
+        rankings[backend] = scores
+        tags = ", ".join(f"{m}={modes.count(m)}" for m in sorted(set(modes)))
+        print(f"{backend:>11} | {args.applicants / engine_s:>12.0f} | {args.applicants / ranking_s:>13.0f} | {tags}")
+
+    if len(rankings) == 2:
+        def top(scores):
+            return set(sorted(range(len(scores)), key=lambda i: -scores[i])[:args.top])
+        overlap = len(top(rankings["tfidf"]) & top(rankings["transformer"])) / args.top
+        print(f"\nTop-{args.top} overlap between tfidf and transformer rankings: {overlap:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Benchmark the section-aware extract_structured_data against the previous parser.
+
+Builds a deterministic corpus of synthetic resumes (sectioned and unsectioned,
+short and long) and times both parsers. Skill extraction is identical in both
+and dominates the total, so the pattern stage is also timed on its own with
+skill extraction stubbed out.
+
+Run:
+    cd backend
+    python scripts/benchmark_structured_parser.py --resumes 300
+"""
+
+import re
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+from datetime import datetime
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import ai_processor
+from ai_processor import extract_structured_data
+
+ROLES = ["Software Engineer", "Data Scientist", "Backend Developer", "Product Manager", "ML Engineer", "QA Analyst"]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella Labs", "Stark Industries", "Wayne Tech"]
+DEGREES = ["Bachelor of Technology", "Master of Science", "B.Tech", "MBA", "PhD", "B.Sc"]
+FILLER = ("Designed and maintained services, collaborated with cross functional teams, improved "
+          "reliability and reduced costs while becoming the go-to person for the release process. ")
+
+
+def build_corpus(count, seed=42):
+    """Return a list of synthetic resume texts; every third one has no section headings."""
+    rng = random.Random(seed)
+    corpus = []
+    for i in range(count):
+        jobs = []
+        for _ in range(rng.randint(1, 6)):
+            start = rng.randint(2005, 2020)
+            end = rng.choice([str(start + rng.randint(1, 4)), "Present"])
+            jobs.append(f"{rng.choice(ROLES)} at {rng.choice(COMPANIES)} ({start} - {end})\n" + FILLER * rng.randint(1, 8))
+        summary = f"Candidate {i}\n{rng.randint(1, 15)}+ years of experience building products. " + FILLER * rng.randint(1, 4)
+        education = f"{rng.choice(DEGREES)}, State University, {rng.randint(2000, 2020)}"
+        skills = "Python, SQL, Docker, AWS, React, Kubernetes"
+        projects = FILLER * rng.randint(1, 5)
+        if i % 3 == 0:
+            corpus.append("\n".join([summary, *jobs, education, skills, projects]))
+        else:
+            corpus.append("\n".join([summary, "WORK EXPERIENCE", *jobs, "Education", education,
+                                     "Technical Skills:", skills, "Projects", projects]))
+    return corpus
+
+
+def legacy_extract_structured_data(text):
+    """The parser before sectioning: patterns compiled per call and run over the whole text."""
+    skills = ai_processor.extract_skills_from_text(text)
+    skills = [s for s in skills if not re.search(r'\d+\s*(?:year|yr)', s.lower()) and not re.search(r'bachelor|master|phd|b\.tech|m\.tech', s.lower())]
+    experience = []
+    text_lower = text.lower()
+    exp_pattern1 = re.findall(
+        r'([\w\s]+(?:engineer|developer|manager|analyst|scientist|consultant|designer|architect|specialist|lead|director|coordinator|intern|associate|administrator))'
+        r'\s+(?:at|@|,|-|\|)\s+'
+        r'([\w\s\-&\.]+?)'
+        r'(?:\s*[\(\[]?\s*(?:(\d{4})\s*[-–—to]+\s*(\d{4}|present|current))?[\)\]]?)?',
+        text, re.IGNORECASE
+    )
+    for match in exp_pattern1:
+        role, company, start_year, end_year = match[0].strip(), match[1].strip(), match[2], match[3]
+        if role and company and len(role) < 60 and len(company) < 60:
+            exp_entry = {"role": role.title(), "company": company}
+            if start_year and end_year:
+                end = datetime.now().year if end_year.lower() in ['present', 'current'] else int(end_year)
+                if end - int(start_year) > 0:
+                    exp_entry["years"] = end - int(start_year)
+            experience.append(exp_entry)
+    total_years = 0
+    for pattern in [r'(\d+)\+?\s*(?:years?|yrs?)\s+(?:of\s+)?(?:experience|exp)',
+                    r'experience[:\s]+(\d+)\+?\s*(?:years?|yrs?)',
+                    r'total[:\s]+(\d+)\+?\s*(?:years?|yrs?)']:
+        matches = re.findall(pattern, text_lower)
+        if matches:
+            total_years = max([int(m) for m in matches] + [total_years])
+    if total_years > 0 and not any('years' in str(e) for e in experience):
+        if experience:
+            experience[0]["years"] = total_years
+        else:
+            experience.append({"years": total_years})
+    education = []
+    for degree in re.findall(
+        r'(bachelor\'?s?(?:\s+(?:of\s+)?(?:science|arts|engineering|technology))?|'
+        r'master\'?s?(?:\s+(?:of\s+)?(?:science|arts|engineering|technology|business administration))?|'
+        r'phd|doctorate|mba|b\.?tech|m\.?tech|b\.?sc|m\.?sc|b\.?e|m\.?e|b\.?a|m\.?a)',
+        text.lower()
+    ):
+        degree_clean = degree.strip()
+        degree_clean = degree_clean.upper() if "." in degree_clean else degree_clean.title()
+        degree_clean = degree_clean.replace("Bachelor'S", "Bachelor's").replace("Master'S", "Master's")
+        if not any(e.get("degree") == degree_clean for e in education):
+            education.append({"degree": degree_clean})
+    if not experience:
+        job_titles = re.findall(r'\b((?:senior|junior|lead|principal|staff)?\s*(?:software|data|machine learning|frontend|backend|fullstack|full stack)?\s*(?:engineer|developer|scientist|analyst|manager|consultant|designer|architect|programmer|intern|trainee))\b', text_lower)
+        for title in list(dict.fromkeys([t.strip().title() for t in job_titles if len(t.strip()) > 3]))[:3]:
+            experience.append({"role": title})
+    return {"skills": skills, "experience": experience, "education": education}
+
+
+def time_parser(parser, corpus):
+    start = time.perf_counter()
+    results = [parser(text) for text in corpus]
+    return time.perf_counter() - start, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--resumes", type=int, default=300)
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.resumes)
+    print(f"Corpus: {len(corpus)} resumes, {sum(len(t) for t in corpus) / 1e6:.2f}M characters\n")
+
+    full_old, old_results = time_parser(legacy_extract_structured_data, corpus)
+    full_new, new_results = time_parser(extract_structured_data, corpus)
+
+    # Pattern stage only: stub out the (shared) skill extraction
+    real_skills = ai_processor.extract_skills_from_text
+    ai_processor.extract_skills_from_text = lambda text, use_fuzzy=True: []
+    try:
+        patterns_old, _ = time_parser(legacy_extract_structured_data, corpus)
+        patterns_new, _ = time_parser(extract_structured_data, corpus)
+    finally:
+        ai_processor.extract_skills_from_text = real_skills
+
+    old_degrees = sum(len(r["education"]) for r in old_results)
+    new_degrees = sum(len(r["education"]) for r in new_results)
+    print(f"{'stage':<16} | {'old ms/resume':>13} | {'new ms/resume':>13} | {'speedup':>7}")
+    print("-" * 60)
+    for stage, old, new in [("full parse", full_old, full_new), ("patterns only", patterns_old, patterns_new)]:
+        print(f"{stage:<16} | {old / len(corpus) * 1000:>13.2f} | {new / len(corpus) * 1000:>13.2f} | {old / new:>6.1f}x")
+    print(f"\nEducation entries found: old={old_degrees}, new={new_degrees} "
+          f"(old matches 'be'/'ma' inside ordinary words outside the Education section)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+"""
+Bulk resume import for one job posting.
+
+Takes a directory or a .zip archive of resumes, runs extract_text and
+extract_structured_data across a process pool, and writes the results to the
+`resumes` storage bucket and the `resumes` / `applications` tables. Every file
+gets a resume_id derived from the posting, its name and its content, so writing it
+again (storage upsert, then the submit_resume_application function from
+migrations/002, which is a no-op for a stored resume_id) changes nothing. Progress is
+checkpointed after every written file, so an interrupted run can simply be
+restarted with the same arguments.
+
+Each resume is attributed to its own candidate, given in --manifest (a CSV with
+`file,email[,name]` columns). An existing user with that email is reused;
+otherwise a job_seeker account is created (unconfirmed, so the candidate can claim
+it with a password reset). Files missing from the manifest go to --user-id if given;
+otherwise they are reported as unresolved and not imported. Emails found in the
+resume text are never used, since they may belong to a referee or an employer.
+
+Run:
+    cd backend
+    python scripts/bulk_import.py ./campus_drive.zip --jd-id <jd_id> --manifest candidates.csv
+"""
+
+import os
+import csv
+import sys
+import json
+import time
+import uuid
+import zipfile
+import argparse
+import tempfile
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from dotenv import load_dotenv
+
+MIME_TYPES = {
+    ".pdf": "application/pdf",
+    ".doc": "application/msword",
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+}
+
+
+def list_resumes(source):
+    """Return sorted (name, mime_type) pairs for supported files in a directory or zip."""
+    if zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            names = [n for n in archive.namelist() if not n.endswith("/")]
+    else:
+        root = Path(source)
+        names = [str(p.relative_to(root)) for p in root.rglob("*") if p.is_file()]
+    items = []
+    for name in sorted(names):
+        mime = MIME_TYPES.get(Path(name).suffix.lower())
+        if mime and not Path(name).name.startswith("."):
+            items.append((name, mime))
+    return items
+
+
+def read_resume(source, name) -> bytes:
+    if zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            return archive.read(name)
+    return (Path(source) / name).read_bytes()
+
+
+def parse_resume(job):
+    """Worker: extract and parse one resume. Never raises, so one bad file cannot stop the run."""
+    source, name, mime = job
+    from ai_processor import extract_text, extract_structured_data
+    from parse_cache import content_hash
+
+    started = time.perf_counter()
+    try:
+        data = read_resume(source, name)
+        with tempfile.NamedTemporaryFile(suffix=Path(name).suffix) as tmp:
+            tmp.write(data)
+            tmp.flush()
+            text = extract_text(tmp.name, mime)
+        return {
+            "name": name,
+            "mime": mime,
+            "content_hash": content_hash(data),
+            "text": text,
+            "structured": extract_structured_data(text),
+            "elapsed": time.perf_counter() - started,
+        }
+    except Exception as e:
+        return {"name": name, "mime": mime, "error": str(e), "elapsed": time.perf_counter() - started}
+
+
+def load_manifest(path):
+    """Map file name -> (email, name) from a CSV with file,email[,name] columns."""
+    manifest = {}
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            if row.get("file") and row.get("email"):
+                manifest[row["file"].strip()] = (row["email"].strip().lower(), (row.get("name") or "").strip() or None)
+    return manifest
+
+
+def resolve_candidate(client, email, name, known):
+    """
+    Return the user_id for a candidate email, creating the account if needed.
+
+    `known` caches email -> user_id for the run, so a candidate with several
+    files in the import is looked up once.
+    """
+    if email in known:
+        return known[email]
+    existing = client.table("users").select("user_id").eq("email", email).limit(1).execute().data
+    if not existing:
+        # An earlier run may have stopped between creating the profile and the users row
+        existing = client.table("user_profiles").select("user_id").eq("email", email).limit(1).execute().data
+    if existing:
+        user_id = existing[0]["user_id"]
+    else:
+        created = client.auth.admin.create_user({
+            "email": email,
+            "email_confirm": False,
+            "user_metadata": {"role": "job_seeker", "name": name},
+        })
+        user_id = created.user.id
+        profile = {"user_id": user_id, "email": email, "role": "job_seeker", "name": name}
+        client.table("user_profiles").upsert(profile, on_conflict="user_id").execute()
+        # users holds the foreign keys of resumes and applications
+        client.table("users").upsert(profile, on_conflict="user_id").execute()
+        print(f"  + created candidate {email}")
+    known[email] = user_id
+    return user_id
+
+
+def load_checkpoint(path):
+    done = set()
+    if os.path.exists(path):
+        with open(path) as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    done.add(json.loads(line)["name"])
+    return done
+
+
+def append_checkpoint(path, name):
+    with open(path, "a") as f:
+        f.write(json.dumps({"name": name}) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def public_url(client, file_name):
+    resp = client.storage.from_("resumes").get_public_url(file_name)
+    if isinstance(resp, dict):
+        return resp.get("data", {}).get("publicUrl") or resp.get("publicUrl") or resp.get("public_url")
+    return str(resp)
+
+
+def import_resume_id(jd_id, parsed) -> str:
+    """Stable resume_id for a file, so a rerun addresses the rows and object it already wrote."""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"bulk-import:{jd_id}:{parsed['name']}:{parsed['content_hash']}"))
+
+
+def _is_missing_function_error(error) -> bool:
+    return getattr(error, "code", None) == "PGRST202" or "Could not find the function" in str(error)
+
+
+def write_resume(client, source, parsed, jd_id, known):
+    """
+    Upload one parsed resume and record its resume and application rows.
+
+    Every step is keyed on the pre-assigned resume_id, so repeating the call after a
+    failure part-way through completes the write without duplicating anything.
+
+    Returns:
+        True if the rows were created, False if they already existed
+    """
+    from parse_cache import store_parse
+
+    user_id = parsed.get("user_id") or resolve_candidate(client, parsed["email"], parsed.get("candidate_name"), known)
+    resume_id = import_resume_id(jd_id, parsed)
+    file_name = f"{resume_id}_{Path(parsed['name']).name}"
+    client.storage.from_("resumes").upload(
+        file_name,
+        read_resume(source, parsed["name"]),
+        {"upsert": "true", "contentType": parsed["mime"], "cacheControl": "3600"},
+    )
+    file_url = public_url(client, file_name)
+    store_parse(client, parsed["content_hash"], parsed["text"], parsed["structured"],
+                user_id=user_id, file_name=file_name, file_url=file_url)
+    structured = parsed["structured"]
+    resume = {
+        "resume_id": resume_id,
+        "user_id": user_id,
+        "jd_id": jd_id,
+        "file_url": file_url,
+        "extracted_text": parsed["text"],
+        "insights": "" if "project" in parsed["text"].lower() else "Add specific project details for stronger impact.",
+        "content_hash": parsed["content_hash"],
+        "skills": structured.get("skills", []),
+        "experience": structured.get("experience", []),
+        "education": structured.get("education", []),
+    }
+    application = {"user_id": user_id, "jd_id": jd_id, "status": "applied"}
+    try:
+        # Resume and application in one transaction; returns created = false for a stored resume_id
+        result = client.rpc("submit_resume_application", {
+            "p_resume": resume, "p_application": application, "p_notification": None,
+        }).execute().data or {}
+        return bool(result.get("created"))
+    except Exception as e:
+        if not _is_missing_function_error(e):
+            raise
+    # migrations/002 not applied: upsert on the resume_id, then add the application if it is missing
+    client.table("resumes").upsert(resume, on_conflict="resume_id").execute()
+    if client.table("applications").select("application_id").eq("resume_id", resume_id).execute().data:
+        return False
+    client.table("applications").insert({**application, "resume_id": resume_id}).execute()
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("source", help="Directory or .zip archive of resumes")
+    parser.add_argument("--jd-id", required=True, help="Job posting the resumes apply to")
+    parser.add_argument("--manifest", help="CSV with file,email[,name] columns naming each file's candidate")
+    parser.add_argument("--user-id", help="Existing users.user_id for files not in the manifest (default: skip them as unresolved)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: .bulk_import_<jd_id>.jsonl)")
+    parser.add_argument("--dry-run", action="store_true", help="Parse only; do not write to storage or the database")
+    args = parser.parse_args()
+
+    if not args.manifest and not args.user_id:
+        parser.error("pass --manifest (one candidate per file) and/or --user-id")
+
+    load_dotenv()
+    manifest = load_manifest(args.manifest) if args.manifest else {}
+    checkpoint = args.checkpoint or f".bulk_import_{args.jd_id}.jsonl"
+    done = load_checkpoint(checkpoint)
+    items = [(name, mime) for name, mime in list_resumes(args.source) if name not in done]
+    unresolved = [] if args.user_id else [name for name, _ in items if name not in manifest]
+    items = [(name, mime) for name, mime in items if name not in unresolved]
+    print(f"Found {len(items) + len(done) + len(unresolved)} resumes, {len(done)} already imported, "
+          f"{len(unresolved)} not in the manifest, {len(items)} to go")
+    for name in unresolved:
+        print(f"  ? {name}: unresolved (no manifest entry)")
+    if not items:
+        return
+
+    client = None
+    if not args.dry_run:
+        from supabase import create_client
+        client = create_client(
+            os.getenv("SUPABASE_URL"),
+            os.getenv("SUPABASE_SERVICE_ROLE_KEY") or os.getenv("SUPABASE_KEY"),
+        )
+
+    started = time.perf_counter()
+    parsed_count = written = failed = 0
+    known = {}
+
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        jobs = [(args.source, name, mime) for name, mime in items]
+        for result in pool.map(parse_resume, jobs, chunksize=4):
+            parsed_count += 1
+            if not result.get("error"):
+                if result["name"] in manifest:
+                    result["email"], result["candidate_name"] = manifest[result["name"]]
+                else:
+                    result["user_id"] = args.user_id
+            if not result.get("error") and client is not None:
+                try:
+                    written += write_resume(client, args.source, result, args.jd_id, known)
+                    append_checkpoint(checkpoint, result["name"])
+                except Exception as e:
+                    # Not checkpointed, so the next run retries it
+                    result["error"] = f"write failed: {e}"
+            if result.get("error"):
+                failed += 1
+                print(f"  ✗ {result['name']}: {result['error']}")
+            if parsed_count % 100 == 0:
+                rate = parsed_count / (time.perf_counter() - started)
+                print(f"  {parsed_count}/{len(items)} parsed, {written} written ({rate:.1f} files/s)")
+
+    elapsed = time.perf_counter() - started
+    print("\nImport complete")
+    print(f"  Processed: {parsed_count - failed} ok, {failed} failed")
+    print(f"  Unresolved (not imported): {len(unresolved)}")
+    print(f"  Written: {written}")
+    print(f"  Time:    {elapsed:.1f}s with {args.workers} workers")
+    print(f"  Throughput: {parsed_count / elapsed:.1f} files/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Evaluate the lexical prefilter cascade in rank_resumes against full scoring.
+
+Scores one applicant pool with semantic scoring for every resume, then with the
+cascade at several RANKING_SEMANTIC_FRACTION cut-offs, and reports for each cut-off
+how many resumes skipped the transformer, the time taken, and recall@K: the share of
+the full-scoring top K that the cascade also ranks in its top K. Pick the smallest
+fraction whose recall is acceptable for the K HR actually reviews. Each run scores the
+whole pool in one rank_resumes call, so the cut-off and calibration are made over all
+of it, as _rank_posting does for a posting.
+
+The pool is synthetic by default; pass --resumes with a JSON list of resume rows
+(extracted_text, skills, experience, education) exported from a real posting for a
+meaningful number. Without the SentenceTransformer installed every run uses the
+keyword fallback, so the comparison is trivially identical.
+
+Run:
+    cd backend
+    python scripts/evaluate_ranking_cascade.py --fractions 0.25 0.5 0.75 --top 10 50
+"""
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import ai_processor
+from benchmark_ranking_shards import REQUIREMENTS, synthetic_resumes
+
+
+def top_ids(resumes, scores, k):
+    order = sorted(range(len(scores)), key=lambda i: -scores[i])
+    return {resumes[i]["resume_id"] for i in order[:k]}
+
+
+def run(resumes, requirements, fraction):
+    modes = []
+    started = time.perf_counter()
+    scores = ai_processor.rank_resumes(resumes, requirements, semantic_fraction=fraction, score_modes=modes)
+    return scores, modes.count("lexical"), time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--applicants", type=int, default=1000, help="Size of the synthetic pool")
+    parser.add_argument("--resumes", type=Path, help="JSON list of resume rows to use instead")
+    parser.add_argument("--requirements", nargs="+", default=REQUIREMENTS)
+    parser.add_argument("--fractions", type=float, nargs="+", default=[0.25, 0.5, 0.75])
+    parser.add_argument("--top", type=int, nargs="+", default=[10, 50])
+    args = parser.parse_args()
+
+    if args.resumes:
+        resumes = json.loads(args.resumes.read_text())
+        for i, r in enumerate(resumes):
+            r.setdefault("resume_id", str(i))
+            r.pop("embedding", None)
+    else:
+        resumes = synthetic_resumes(args.applicants)
+
+    # Encode once up front so every run compares scoring, not encoding
+    run(resumes, args.requirements, 1.0)
+    full_scores, _, full_s = run(resumes, args.requirements, 1.0)
+
+    header = f"{'fraction':>8} | {'skipped':>7} | {'seconds':>7} | " + " | ".join(f"{f'recall@{k}':>9}" for k in args.top)
+    print(f"\nCascade vs full scoring, {len(resumes)} resumes")
+    print(header)
+    print("-" * len(header))
+    print(f"{1.0:>8.2f} | {0:>7} | {full_s:>7.2f} | " + " | ".join(f"{1.0:>9.3f}" for _ in args.top))
+    for fraction in sorted(args.fractions, reverse=True):
+        scores, skipped, seconds = run(resumes, args.requirements, fraction)
+        recalls = [len(top_ids(resumes, scores, k) & top_ids(resumes, full_scores, k)) / min(k, len(resumes))
+                   for k in args.top]
+        print(f"{fraction:>8.2f} | {skipped:>7} | {seconds:>7.2f} | " + " | ".join(f"{r:>9.3f}" for r in recalls))
+    print("\nTimes above reuse the embeddings computed by the first run; encoding, which the cascade")
+    print("also skips, is the larger saving in production.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Fuzz and timing checks for the linear-time experience extractor.
+
+Feeds extract_experience_entries adversarial inputs (long word runs without a
+separator, keyword floods, separator floods, unterminated brackets and dates,
+one giant line, random token soup) at doubling sizes and asserts that:
+- it never raises and always returns well-formed tuples
+- runtime grows roughly linearly (doubling the input at most ~3x the time)
+- every input stays under an absolute per-megabyte budget
+
+The old backtracking regex is timed on the smallest size for contrast.
+
+Run:
+    cd backend
+    python scripts/fuzz_experience_extraction.py
+"""
+
+import re
+import sys
+import time
+import random
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from experience_extractor import extract_experience_entries
+
+SIZES = [25_000, 50_000, 100_000, 200_000, 400_000]
+MAX_GROWTH_PER_DOUBLING = 3.0
+MAX_SECONDS_PER_MB = 5.0
+
+LEGACY_PATTERN = re.compile(
+    r'([\w\s]+(?:engineer|developer|manager|analyst|scientist|consultant|designer|architect|specialist|lead|director|coordinator|intern|associate|administrator))'
+    r'\s+(?:at|@|,|-|\|)\s+'
+    r'([\w\s\-&\.]+?)'
+    r'(?:\s*[\(\[]?\s*(?:(\d{4})\s*[-–—to]+\s*(\d{4}|present|current))?[\)\]]?)?',
+    re.IGNORECASE
+)
+
+
+def repeat_to(unit, size):
+    return (unit * (size // len(unit) + 1))[:size]
+
+
+def random_soup(size, seed=7):
+    rng = random.Random(seed)
+    vocabulary = ["engineer", "at", "@", ",", "-", "|", "(", ")", "[", "]", "2019", "present", "to",
+                  "Acme", "&", ".", "lead", "manager", "\n", "–", "senior", "x" * 50]
+    parts, length = [], 0
+    while length < size:
+        token = rng.choice(vocabulary)
+        parts.append(token)
+        parts.append(rng.choice([" ", "", "  "]))
+        length += len(token) + 1
+    return "".join(parts)[:size]
+
+
+GENERATORS = {
+    "word run, no separator": lambda n: repeat_to("software data systems ", n - 8) + "engineer",
+    "keyword flood": lambda n: repeat_to("engineer ", n),
+    "separator flood": lambda n: repeat_to("engineer at ", n),
+    "company with no end": lambda n: "Engineer at " + repeat_to("Acme & Sons. - ", n),
+    "unterminated dates": lambda n: repeat_to("Engineer at Acme (2019 - - - ", n),
+    "one giant line": lambda n: repeat_to("Lead Developer, Initech 2015-2018 ", n),
+    "many short lines": lambda n: repeat_to("Analyst | Globex [2012 to present]\n", n),
+    "random token soup": random_soup,
+}
+
+
+def timed(func, text, repeat=3):
+    """Best-of-`repeat` wall time, to keep the growth ratios stable on a noisy machine."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(text)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def check_entries(entries):
+    for entry in entries:
+        assert isinstance(entry, tuple) and len(entry) == 4, f"malformed entry: {entry!r}"
+        assert all(isinstance(part, str) for part in entry), f"malformed entry: {entry!r}"
+
+
+def main():
+    failures = 0
+    for name, generate in GENERATORS.items():
+        timings = []
+        for size in SIZES:
+            text = generate(size)
+            elapsed, entries = timed(extract_experience_entries, text)
+            check_entries(entries)
+            timings.append(elapsed)
+            budget = MAX_SECONDS_PER_MB * max(len(text), 1) / 1e6
+            if elapsed > budget:
+                print(f"  ❌ {name}: {elapsed:.3f}s on {len(text)} chars exceeds budget {budget:.3f}s")
+                failures += 1
+
+        growth = [later / max(earlier, 1e-4) for earlier, later in zip(timings, timings[1:])]
+        worst = max(growth)
+        status = "✅" if worst <= MAX_GROWTH_PER_DOUBLING else "❌"
+        if worst > MAX_GROWTH_PER_DOUBLING:
+            failures += 1
+        print(f"{status} {name:<24} " + "  ".join(f"{t * 1000:7.1f}ms" for t in timings) + f"   worst growth x{worst:.2f}")
+
+    # Contrast: the old regex on the smallest adversarial input
+    text = GENERATORS["word run, no separator"](SIZES[0] // 10)
+    legacy_elapsed, _ = timed(LEGACY_PATTERN.findall, text, repeat=1)
+    new_elapsed, _ = timed(extract_experience_entries, text)
+    print(f"\nLegacy regex on {len(text)} chars of 'word run, no separator': {legacy_elapsed:.3f}s "
+          f"(new extractor: {new_elapsed * 1000:.2f}ms)")
+
+    if failures:
+        print(f"\n{failures} check(s) failed")
+        sys.exit(1)
+    print("\nAll fuzz checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+Load test: how request throughput scales with concurrency on ONE uvicorn worker.
+
+By default this starts a stub Supabase (GoTrue + PostgREST) that answers every
+call after a fixed latency, launches the backend with `--workers 1` pointed at the
+stub, and fires batches of authenticated GET /hr/jobs requests (one auth round
+trip plus one PostgREST round trip each) at increasing concurrency.
+
+With the awaited, pooled db layer, throughput should grow almost linearly with
+concurrency until the pool or CPU saturates. With blocking `.execute()` calls it
+stays flat at ~1 / (2 x latency) requests per second, whatever the concurrency.
+
+Run:
+    cd backend
+    python scripts/load_test_async_db.py --latency-ms 50 --concurrency 1 4 16 64
+
+    # Before/after: run the same test against another checkout (e.g. a git worktree)
+    git worktree add /tmp/before <older-commit>
+    python scripts/load_test_async_db.py --backend-dir /tmp/before/backend
+
+    # Or against an already-running server
+    python scripts/load_test_async_db.py --base-url http://localhost:10000 --token <access_token>
+
+Everything (load generator, stub and backend) shares the machine's CPUs, so on a
+small box throughput flattens once the cores are busy rather than when the pool fills.
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+import multiprocessing
+import subprocess
+import statistics
+from pathlib import Path
+
+import httpx
+
+BACKEND_DIR = Path(__file__).parent.parent
+STUB_PORT = 18541
+BACKEND_PORT = 18542
+
+
+def _serve_stub_supabase(latency: float, port: int):
+    """Minimal GoTrue/PostgREST stand-in: every call answers after `latency` seconds."""
+    import uvicorn
+    from fastapi import FastAPI, Request
+
+    stub = FastAPI()
+    rows = [{"jd_id": f"jd-{i}", "title": f"Job {i}", "hr_user_id": "load-test-hr", "status": "open"} for i in range(5)]
+
+    @stub.get("/")
+    async def root():
+        return {}
+
+    @stub.get("/auth/v1/user")
+    async def auth_user():
+        await asyncio.sleep(latency)
+        return {"id": "load-test-hr", "aud": "authenticated", "role": "authenticated", "email": "hr@example.com",
+                "app_metadata": {}, "user_metadata": {"role": "HR"}, "created_at": "2024-01-01T00:00:00Z"}
+
+    @stub.api_route("/rest/v1/{table}", methods=["GET", "POST", "PATCH"])
+    async def rest(table: str, request: Request):
+        await asyncio.sleep(latency)
+        return rows
+
+    uvicorn.run(stub, host="127.0.0.1", port=port, log_level="warning", access_log=False)
+
+
+def start_stub_supabase(latency: float, port: int):
+    # Its own process, so the stub never competes with the load generator for the GIL
+    process = multiprocessing.get_context("spawn").Process(target=_serve_stub_supabase, args=(latency, port), daemon=True)
+    process.start()
+    return process
+
+
+def start_backend(stub_url: str, port: int, workdir: str, backend_dir: Path = BACKEND_DIR):
+    env = dict(os.environ)
+    env.update({
+        "SUPABASE_URL": stub_url,
+        "SUPABASE_SERVICE_ROLE_KEY": "load-test-service-key",
+        "SUPABASE_ANON_KEY": "load-test-anon-key",
+        "INGESTION_QUEUE_PATH": os.path.join(workdir, "queue.sqlite3"),
+        "INGESTION_SPOOL_DIR": os.path.join(workdir, "spool"),
+    })
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", "1", "--log-level", "warning", "--no-access-log"],
+        cwd=backend_dir, env=env,
+    )
+
+
+async def wait_until_up(base_url: str, timeout: float = 180):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get(f"{base_url}/")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.5)
+    raise RuntimeError(f"{base_url} did not come up within {timeout:.0f}s")
+
+
+async def run_level(base_url: str, path: str, token: str, concurrency: int, requests_per_level: int):
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        async def one():
+            nonlocal errors
+            async with semaphore:
+                started = time.perf_counter()
+                resp = await client.get(path, headers={"Authorization": f"Bearer {token}"})
+                latencies.append(time.perf_counter() - started)
+                if resp.status_code != 200:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests_per_level)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "rps": requests_per_level / elapsed,
+        "p50": statistics.median(latencies) * 1000,
+        "p95": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "errors": errors,
+    }
+
+
+async def run(args):
+    base_url = args.base_url or f"http://127.0.0.1:{BACKEND_PORT}"
+    await wait_until_up(base_url)
+    # Warm-up: first requests open the pooled connections
+    await run_level(base_url, args.path, args.token, 4, 8)
+
+    results = []
+    for concurrency in args.concurrency:
+        results.append(await run_level(base_url, args.path, args.token, concurrency,
+                                       max(args.requests, concurrency * 4)))
+
+    baseline = results[0]["rps"]
+    print(f"\nGET {args.path} on one uvicorn worker" +
+          (f" (stub upstream latency {args.latency_ms:.0f}ms per call)" if not args.base_url else ""))
+    print(f"{'concurrency':>11} | {'req/s':>8} | {'p50 ms':>8} | {'p95 ms':>8} | {'speedup':>7} | {'errors':>6}")
+    print("-" * 64)
+    for r in results:
+        print(f"{r['concurrency']:>11} | {r['rps']:>8.1f} | {r['p50']:>8.1f} | {r['p95']:>8.1f} | "
+              f"{r['rps'] / baseline:>6.1f}x | {r['errors']:>6}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--base-url", help="Target an already-running server instead of starting one against a stub")
+    parser.add_argument("--token", default="load-test-token", help="Bearer token (any value works against the stub)")
+    parser.add_argument("--backend-dir", type=Path, default=BACKEND_DIR,
+                        help="Backend checkout to launch (default: this one)")
+    parser.add_argument("--path", default="/hr/jobs")
+    parser.add_argument("--latency-ms", type=float, default=50, help="Stub latency per Supabase call")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--requests", type=int, default=200, help="Requests per concurrency level (at least 4x the level)")
+    args = parser.parse_args()
+
+    backend = stub = None
+    workdir = tempfile.mkdtemp(prefix="load_test_")
+    try:
+        if not args.base_url:
+            stub = start_stub_supabase(args.latency_ms / 1000, STUB_PORT)
+            backend = start_backend(f"http://127.0.0.1:{STUB_PORT}", BACKEND_PORT, workdir, args.backend_dir)
+        asyncio.run(run(args))
+    finally:
+        if backend is not None:
+            backend.terminate()
+            backend.wait(timeout=10)
+        if stub is not None:
+            stub.terminate()
+
+
+if __name__ == "__main__":
+    main()
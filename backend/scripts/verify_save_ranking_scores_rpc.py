@@ -0,0 +1,123 @@
+"""
+Verify the save_ranking_scores migrations (003 to 007) against a real Postgres.
+
+Uses the stand-in tables from verify_submit_application_rpc.py, seeds resumes with
+applications and checks that one call updates every listed resume's score and
+explanation, score_fingerprint, score_components and score_mode plus the matching applications'
+match_score, leaves other rows alone, keeps columns an entry omits, and returns the
+number of resumes updated. Also times a 1,000-resume write.
+
+Uses --dsn (or $VERIFY_PG_DSN) if given; otherwise starts a temporary local server
+with the `pgserver` package. Requires `psycopg` (v3).
+
+Run:
+    cd backend
+    pip install "psycopg[binary]" pgserver
+    python scripts/verify_save_ranking_scores_rpc.py
+"""
+
+import os
+import sys
+import time
+import uuid
+import argparse
+import tempfile
+from pathlib import Path
+
+import psycopg
+from psycopg.types.json import Jsonb
+
+sys.path.insert(0, str(Path(__file__).parent))
+from verify_submit_application_rpc import STAND_IN_TABLES, SCHEMA, check
+
+MIGRATIONS = [Path(__file__).parent.parent / "migrations" / name
+              for name in ("003_save_ranking_scores.sql", "004_score_fingerprint.sql", "005_score_components.sql",
+                           "007_score_mode.sql")]
+
+
+def seed(conn, jd_id, n):
+    user_id = str(uuid.uuid4())
+    resume_ids = [str(uuid.uuid4()) for _ in range(n)]
+    with conn.cursor() as cur:
+        cur.executemany("insert into resumes (resume_id, user_id, jd_id) values (%s, %s, %s)",
+                        [(rid, user_id, jd_id) for rid in resume_ids])
+        cur.executemany("insert into applications (user_id, jd_id, resume_id, status) values (%s, %s, %s, 'applied')",
+                        [(user_id, jd_id, rid) for rid in resume_ids])
+    return resume_ids
+
+
+def save(conn, rows):
+    return conn.execute("select save_ranking_scores(%s)", (Jsonb(rows),)).fetchone()[0]
+
+
+def run_checks(conn):
+    jd_id = conn.execute("insert into job_descriptions (title) values ('Data Engineer') returning jd_id::text").fetchone()[0]
+
+    print("Scores and explanations")
+    resume_ids = seed(conn, jd_id, 3)
+    rows = [{"resume_id": rid, "score": 0.5 + i / 10, "explanation": f"Match Score: {50 + i * 10}%",
+             "score_fingerprint": "f1", "score_components": {"skills": 0.5}, "score_mode": "fast"}
+            for i, rid in enumerate(resume_ids[:2])]
+    check(save(conn, rows) == 2, "returns the number of resumes updated")
+    stored = dict(conn.execute("select resume_id::text, score from resumes where jd_id = %s and score is not null",
+                               (jd_id,)).fetchall())
+    check(stored == {rows[0]["resume_id"]: 0.5, rows[1]["resume_id"]: 0.6}, "resumes.score written for listed resumes only")
+    explanation = conn.execute("select explanation from resumes where resume_id = %s", (resume_ids[1],)).fetchone()[0]
+    check(explanation == "Match Score: 60%", "resumes.explanation written")
+    fingerprints = conn.execute("select count(*) from resumes where jd_id = %s and score_fingerprint = 'f1'",
+                                (jd_id,)).fetchone()[0]
+    check(fingerprints == 2, "resumes.score_fingerprint written")
+    modes = conn.execute("select count(*) from resumes where jd_id = %s and score_mode = 'fast'", (jd_id,)).fetchone()[0]
+    check(modes == 2, "resumes.score_mode written")
+
+    save(conn, [{"resume_id": resume_ids[1], "score": 0.9, "score_fingerprint": "f2"}])
+    explanation, components, mode, score = conn.execute(
+        "select explanation, score_components, score_mode, score from resumes where resume_id = %s", (resume_ids[1],)).fetchone()
+    check(score == 0.9 and explanation == "Match Score: 60%" and components == {"skills": 0.5} and mode == "fast",
+          "a score-only entry keeps the stored explanation, components and mode")
+    save(conn, [{"resume_id": resume_ids[1], "score": 0.6, "score_fingerprint": "f1"}])
+    match = dict(conn.execute("select resume_id::text, match_score from applications where jd_id = %s", (jd_id,)).fetchall())
+    check(match[resume_ids[0]] == 0.5 and match[resume_ids[1]] == 0.6 and match[resume_ids[2]] is None,
+          "applications.match_score follows the resume scores")
+    check(save(conn, [{"resume_id": str(uuid.uuid4()), "score": 1.0, "explanation": ""}]) == 0,
+          "unknown resume ids are ignored")
+
+    print("1,000 resumes in one call")
+    resume_ids = seed(conn, jd_id, 1000)
+    rows = [{"resume_id": rid, "score": i / 1000, "explanation": "Match Score"} for i, rid in enumerate(resume_ids)]
+    started = time.perf_counter()
+    updated = save(conn, rows)
+    elapsed = (time.perf_counter() - started) * 1000
+    check(updated == 1000, f"all rows updated ({elapsed:.0f}ms)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--dsn", default=os.getenv("VERIFY_PG_DSN"), help="Postgres DSN (default: temporary pgserver)")
+    args = parser.parse_args()
+
+    dsn = args.dsn
+    if not dsn:
+        try:
+            import pgserver
+        except ImportError:
+            sys.exit("Pass --dsn or `pip install pgserver` for a temporary local Postgres")
+        server = pgserver.get_server(tempfile.mkdtemp(prefix="rpc_verify_"), cleanup_mode="delete")
+        dsn = server.get_uri()
+
+    with psycopg.connect(dsn, autocommit=True) as conn:
+        conn.execute(f"drop schema if exists {SCHEMA} cascade")
+        conn.execute(f"create schema {SCHEMA}")
+        conn.execute(f"set search_path to {SCHEMA}, public")
+        try:
+            conn.execute(STAND_IN_TABLES)
+            for migration in MIGRATIONS:
+                conn.execute(migration.read_text())
+            run_checks(conn)
+        finally:
+            conn.execute(f"drop schema if exists {SCHEMA} cascade")
+    print("\nAll checks passed")
+
+
+if __name__ == "__main__":
+    main()
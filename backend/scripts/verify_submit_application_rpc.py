@@ -0,0 +1,167 @@
+"""
+Verify migrations/002_submit_resume_application.sql against a real Postgres.
+
+Creates stand-in `job_descriptions`, `resumes`, `applications` and `notifications`
+tables in a throwaway schema, applies the migration there and checks that:
+- one call inserts all three rows and returns their ids (column defaults still apply)
+- repeating the call with the same resume_id returns the same ids and inserts nothing
+- a failing application or notification insert rolls the resume back as well
+
+Uses --dsn (or $VERIFY_PG_DSN) if given; otherwise starts a temporary local server
+with the `pgserver` package. Requires `psycopg` (v3).
+
+Run:
+    cd backend
+    pip install "psycopg[binary]" pgserver
+    python scripts/verify_submit_application_rpc.py
+"""
+
+import os
+import sys
+import uuid
+import argparse
+import tempfile
+from pathlib import Path
+
+import psycopg
+from psycopg.types.json import Jsonb
+
+MIGRATION = Path(__file__).parent.parent / "migrations" / "002_submit_resume_application.sql"
+SCHEMA = "rpc_verify"
+
+STAND_IN_TABLES = """
+create table job_descriptions (
+    jd_id uuid primary key default gen_random_uuid(),
+    title text
+);
+create table resumes (
+    resume_id      uuid primary key default gen_random_uuid(),
+    user_id        uuid not null,
+    jd_id          uuid references job_descriptions (jd_id),
+    file_url       text,
+    extracted_text text,
+    insights       text,
+    content_hash   text,
+    skills         text[],
+    experience     jsonb,
+    education      jsonb,
+    decision       text default 'pending',
+    score          double precision,
+    explanation    text,
+    uploaded_at    timestamptz not null default now()
+);
+create table applications (
+    application_id uuid primary key default gen_random_uuid(),
+    user_id        uuid not null,
+    jd_id          uuid not null references job_descriptions (jd_id),
+    resume_id      uuid references resumes (resume_id),
+    status         text not null check (status in ('applied', 'selected', 'rejected')),
+    match_score    double precision,
+    updated_at     timestamptz not null default now()
+);
+create table notifications (
+    notif_id   uuid primary key default gen_random_uuid(),
+    user_id    uuid not null,
+    message    text not null,
+    type       text,
+    read       boolean not null default false,
+    created_at timestamptz not null default now()
+);
+"""
+
+
+def submit(conn, resume, application, notification):
+    with conn.transaction():
+        row = conn.execute(
+            "select submit_resume_application(%s, %s, %s)",
+            (Jsonb(resume), Jsonb(application), Jsonb(notification) if notification is not None else None),
+        ).fetchone()
+    return row[0]
+
+
+def count(conn, table, column, value):
+    return conn.execute(f"select count(*) from {table} where {column}::text = %s", (str(value),)).fetchone()[0]
+
+
+def check(condition, message):
+    print(f"  {'✅' if condition else '❌'} {message}")
+    if not condition:
+        raise SystemExit(1)
+
+
+def run_checks(conn):
+    jd_id = conn.execute("insert into job_descriptions (title) values ('Backend Engineer') returning jd_id::text").fetchone()[0]
+    user_id = str(uuid.uuid4())
+
+    def payloads(resume_id, status="applied", message="Resume uploaded successfully for job posting"):
+        resume = {
+            "resume_id": resume_id, "user_id": user_id, "jd_id": jd_id,
+            "file_url": "https://example.com/r.pdf", "extracted_text": "Python developer",
+            "insights": "", "content_hash": "abc", "skills": ["Python", "SQL"],
+            "experience": [{"role": "Developer", "years": 3}], "education": [{"degree": "B.Tech"}],
+        }
+        application = {"user_id": user_id, "jd_id": jd_id, "status": status}
+        notification = {"user_id": user_id, "message": message, "type": "system"}
+        return resume, application, notification
+
+    print("Happy path")
+    resume_id = str(uuid.uuid4())
+    result = submit(conn, *payloads(resume_id))
+    check(result["created"] is True and result["resume_id"] == resume_id, "returns the pre-assigned resume id")
+    check(result["application_id"] and result["notification_id"], "returns application and notification ids")
+    check(count(conn, "resumes", "resume_id", resume_id) == 1, "resume row inserted")
+    check(count(conn, "applications", "resume_id", resume_id) == 1, "application row linked to the resume")
+    check(count(conn, "notifications", "notif_id", result["notification_id"]) == 1, "notification row inserted")
+    decision, skills = conn.execute("select decision, skills from resumes where resume_id = %s", (resume_id,)).fetchone()
+    check(decision == "pending" and skills == ["Python", "SQL"], "column defaults apply and JSON arrays become text[]")
+
+    print("Retry with the same resume_id")
+    again = submit(conn, *payloads(resume_id))
+    check(again["created"] is False, "reports created = false")
+    check(again["application_id"] == result["application_id"], "returns the existing application id")
+    check(count(conn, "applications", "resume_id", resume_id) == 1, "no duplicate application")
+    check(count(conn, "notifications", "user_id", user_id) == 1, "no duplicate notification")
+
+    print("Failure rolls back every insert")
+    for label, kwargs in [("application insert fails (bad status)", {"status": "bogus"}),
+                          ("notification insert fails (null message)", {"message": None})]:
+        failing_id = str(uuid.uuid4())
+        try:
+            submit(conn, *payloads(failing_id, **kwargs))
+            raised = False
+        except psycopg.Error:
+            raised = True
+        check(raised, f"{label}: the call raises")
+        check(count(conn, "resumes", "resume_id", failing_id) == 0, f"{label}: no orphan resume row")
+        check(count(conn, "applications", "resume_id", failing_id) == 0, f"{label}: no orphan application row")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--dsn", default=os.getenv("VERIFY_PG_DSN"), help="Postgres DSN (default: temporary pgserver)")
+    args = parser.parse_args()
+
+    dsn = args.dsn
+    if not dsn:
+        try:
+            import pgserver
+        except ImportError:
+            sys.exit("Pass --dsn or `pip install pgserver` for a temporary local Postgres")
+        server = pgserver.get_server(tempfile.mkdtemp(prefix="rpc_verify_"), cleanup_mode="delete")
+        dsn = server.get_uri()
+
+    with psycopg.connect(dsn, autocommit=True) as conn:
+        conn.execute(f"drop schema if exists {SCHEMA} cascade")
+        conn.execute(f"create schema {SCHEMA}")
+        conn.execute(f"set search_path to {SCHEMA}, public")
+        try:
+            conn.execute(STAND_IN_TABLES)
+            conn.execute(MIGRATION.read_text())
+            run_checks(conn)
+        finally:
+            conn.execute(f"drop schema if exists {SCHEMA} cascade")
+    print("\nAll checks passed")
+
+
+if __name__ == "__main__":
+    main()
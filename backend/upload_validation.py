@@ -0,0 +1,98 @@
+"""
+Early validation for resume uploads.
+
+The declared Content-Type comes from the client, so it is checked against the
+file's leading bytes (magic numbers) before anything else happens. The body is read
+in chunks with a hard size cap: an oversized or mislabeled upload is rejected before
+it is fully buffered in memory, spooled, or sent to storage.
+"""
+import os
+from typing import Optional
+
+RESUME_MAX_UPLOAD_BYTES = int(os.getenv("RESUME_MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+
+# Enough for every signature below; a PDF header may follow a little leading junk
+SNIFF_BYTES = 1024
+_READ_CHUNK = 64 * 1024
+
+_PDF = b"%PDF-"
+_ZIP = b"PK\x03\x04"
+_OLE = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+_PNG = b"\x89PNG\r\n\x1a\n"
+_JPEG = b"\xff\xd8\xff"
+
+DOCX_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+
+class UploadRejected(Exception):
+    """An upload that failed validation; status_code is the HTTP status to answer with."""
+
+    def __init__(self, status_code: int, reason: str, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.reason = reason
+        self.detail = detail
+
+
+def sniff_content_type(head: bytes) -> Optional[str]:
+    """Identify a resume file type from its first bytes, or None if it is not one we parse."""
+    if head.startswith(_ZIP):
+        return DOCX_TYPE
+    if head.startswith(_PNG):
+        return "image/png"
+    if head.startswith(_JPEG):
+        return "image/jpeg"
+    if head.startswith(_OLE):
+        return "application/msword"
+    if _PDF in head[:SNIFF_BYTES]:
+        return "application/pdf"
+    return None
+
+
+def check_size(size: Optional[int], max_bytes: int = RESUME_MAX_UPLOAD_BYTES):
+    """Reject a declared or stored size over the limit; unknown sizes pass."""
+    if size is not None and size > max_bytes:
+        raise UploadRejected(413, "too_large", f"File is {size} bytes; the limit is {max_bytes} bytes")
+
+
+def check_content(head: bytes, declared_type: str):
+    """
+    Check that the leading bytes match the declared type.
+
+    Word uploads labeled application/msword are accepted when they are really DOCX
+    (the extractor reads those); legacy binary .doc files cannot be parsed, so they
+    are rejected here instead of failing later in the background.
+    """
+    actual = sniff_content_type(head)
+    if actual == "application/msword":
+        raise UploadRejected(415, "unsupported_format", "Legacy .doc files are not supported; save the file as .docx or PDF")
+    if actual is None:
+        raise UploadRejected(415, "unrecognized_content", "File is not a PDF, DOCX, PNG or JPEG")
+    if actual != declared_type and not (actual == DOCX_TYPE and declared_type == "application/msword"):
+        raise UploadRejected(415, "type_mismatch", f"File content is {actual} but it was uploaded as {declared_type}")
+
+
+async def read_upload(file, declared_type: str, max_bytes: int = RESUME_MAX_UPLOAD_BYTES) -> bytes:
+    """
+    Read a FastAPI UploadFile after validating its size and leading bytes.
+
+    Raises:
+        UploadRejected: declared size over the limit, content not matching the
+            declared type, or more than max_bytes actually read
+    """
+    check_size(getattr(file, "size", None), max_bytes)
+    head = await file.read(SNIFF_BYTES)
+    check_content(head, declared_type)
+
+    chunks = [head]
+    total = len(head)
+    while True:
+        chunk = await file.read(_READ_CHUNK)
+        if not chunk:
+            break
+        total += len(chunk)
+        if total > max_bytes:
+            # The declared size was missing or wrong; stop before holding the rest
+            raise UploadRejected(413, "too_large", f"File exceeds the {max_bytes} byte limit")
+        chunks.append(chunk)
+    return b"".join(chunks)
@@ -387,20 +387,61 @@ function CandidateDashboard() {
     try {
       console.log('Sending request to:', `${API_URL}/upload-resume/${jd_id}`);
       console.log('Authorization header:', `Bearer ${usedToken.substring(0, 20)}...`);
-      const resp = await withAuth(async (token) => (
-        axios.post(
+      const resp = await withAuth(async (token) => {
+        const authHeaders = { Authorization: `Bearer ${token}` };
+        // Send the file straight to storage with a presigned URL, then ask the backend to parse it
+        let presigned = null;
+        try {
+          presigned = (await axios.post(
+            `${API_URL}/upload-resume/${jd_id}/presign`,
+            { filename: file.name, content_type: file.type, size: file.size },
+            { headers: authHeaders }
+          )).data;
+        } catch (presignError) {
+          if (presignError.response && presignError.response.status === 401) throw presignError;
+          console.warn('Presigned upload unavailable, uploading through the backend:', presignError);
+        }
+        if (presigned) {
+          await axios.put(presigned.upload_url, file, { headers: { 'Content-Type': file.type } });
+          return axios.post(
+            `${API_URL}/upload-resume/${jd_id}/complete`,
+            { resume_id: presigned.resume_id },
+            { headers: authHeaders }
+          );
+        }
+        return axios.post(
           `${API_URL}/upload-resume/${jd_id}`,
           formData,
           {
             headers: {
-              Authorization: `Bearer ${token}`,
+              ...authHeaders,
               refresh_token: localStorage.getItem('refresh_token') || '',
             },
           }
-        )
-      ));
-      console.log('Upload successful:', resp.data);
-      setAlertMessage('Resume uploaded successfully! ' + (resp.data.insights || '')); setAlertType('success'); setShowAlertModal(true);
+        );
+      });
+      console.log('Upload accepted:', resp.data);
+
+      // Parsing runs in the background; poll until the resume has been processed
+      let status = resp.data;
+      for (let attempt = 0; ['processing', 'awaiting_upload'].includes(status.status) && attempt < 60; attempt++) {
+        await new Promise((resolve) => setTimeout(resolve, 2000));
+        const statusResp = await withAuth(async (token) => (
+          axios.get(`${API_URL}/upload-status/${resp.data.resume_id}`, {
+            headers: { Authorization: `Bearer ${token}` },
+          })
+        ));
+        status = statusResp.data;
+      }
+      if (status.status === 'failed') {
+        setAlertMessage('We could not read your resume. Please upload a different file.'); setAlertType('error'); setShowAlertModal(true);
+        return;
+      }
+      if (status.status === 'processing') {
+        setAlertMessage('Resume uploaded! It is still being processed; you will get a notification when it is ready.'); setAlertType('success'); setShowAlertModal(true);
+      } else {
+        setAlertMessage('Resume uploaded successfully! ' + (status.insights || '')); setAlertType('success'); setShowAlertModal(true);
+      }
       
       // Store jd_id and user_id for chatbot
       const userId = localStorage.getItem('user_id');
@@ -85,15 +85,71 @@ function HrDashboard() {
     }
   };
 
+  // Follow a background ranking job over server-sent events until it finishes.
+  // fetch() is used instead of EventSource so the Authorization header can be sent.
+  const followRankingJob = async (jobId, token) => {
+    const resp = await fetch(`${API_URL}/rank-resumes/jobs/${jobId}/events`, {
+      headers: { Authorization: `Bearer ${token}` },
+    });
+    if (!resp.ok || !resp.body) {
+      throw Object.assign(new Error(`Progress stream failed (${resp.status})`), { response: { status: resp.status } });
+    }
+    const reader = resp.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let last = null;
+    for (;;) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+      const events = buffer.split('\n\n');
+      buffer = events.pop();
+      for (const event of events) {
+        const data = event.split('\n').filter((line) => line.startsWith('data:')).map((line) => line.slice(5)).join('');
+        if (!data) continue;
+        last = JSON.parse(data);
+        setRankingProgress(last);
+      }
+    }
+    if (!last || last.status !== 'done') {
+      const detail = last?.status === 'cancelled' ? 'Ranking was cancelled' : (last?.error || 'Ranking did not finish');
+      throw Object.assign(new Error(detail), { response: { data: { detail } } });
+    }
+    return last;
+  };
+
+  const handleCancelRanking = async () => {
+    if (!rankingProgress?.job_id) return;
+    try {
+      await withAuth(async (token) => (
+        axios.post(`${API_URL}/rank-resumes/jobs/${rankingProgress.job_id}/cancel`, {}, {
+          headers: { Authorization: `Bearer ${token}` },
+        })
+      ));
+    } catch (error) {
+      console.error('Cancel ranking error:', error);
+    }
+  };
+
+  const rankingLabel = (progress) => {
+    if (!progress || !progress.total) return 'Ranking...';
+    const eta = progress.eta_seconds ? ` ~${Math.ceil(progress.eta_seconds)}s` : '';
+    return `Ranking: ${progress.phase} ${progress.processed}/${progress.total}${eta}`;
+  };
+
   // Handler for ranking resumes for a job
   const handleRankResumes = async (jdId) => {
     setRankingJob(jdId);
+    setRankingProgress(null);
     setCandidatesLoading(true);
     try {
       const list = await withAuth(async (token) => {
-        await axios.post(`${API_URL}/rank-resumes/${jdId}`, {}, {
+        // Ranking runs as a background job; progress streams in while it works
+        const job = await axios.post(`${API_URL}/rank-resumes/${jdId}/jobs`, {}, {
           headers: { Authorization: `Bearer ${token}` },
         });
+        setRankingProgress(job.data);
+        await followRankingJob(job.data.job_id, token);
         const res = await axios.get(`${API_URL}/resumes/${jdId}`, {
           headers: { Authorization: `Bearer ${token}` },
         });
@@ -159,6 +215,7 @@ function HrDashboard() {
       setAlertType('error'); setAlertMessage(msg); setShowAlertModal(true);
     }
     setRankingJob(null);
+    setRankingProgress(null);
     setCandidatesLoading(false);
   };
 
@@ -193,6 +250,7 @@ function HrDashboard() {
   const [currentJobId, setCurrentJobId] = useState(null); // Track which job's candidates are being viewed
   const [openCandidatesDialog, setOpenCandidatesDialog] = useState(false);
   const [rankingJob, setRankingJob] = useState(null);
+  const [rankingProgress, setRankingProgress] = useState(null);
   const [showProfileDropdown, setShowProfileDropdown] = useState(false);
   const [showSideDrawer, setShowSideDrawer] = useState(false);
   const [hrJobsHistory, setHrJobsHistory] = useState([]);
@@ -1185,8 +1243,13 @@ function HrDashboard() {
                         onClick={() => handleRankResumes(job.jd_id)}
                         disabled={job.status === 'closed' || rankingJob === job.jd_id}
                       >
-                        {rankingJob === job.jd_id ? 'Ranking...' : job.status === 'closed' ? 'Ranked' : 'Close & Rank'}
+                        {rankingJob === job.jd_id ? rankingLabel(rankingProgress) : job.status === 'closed' ? 'Ranked' : 'Close & Rank'}
                       </button>
+                      {rankingJob === job.jd_id && rankingProgress?.job_id && (
+                        <button className="dashboard-btn-secondary" onClick={handleCancelRanking}>
+                          Cancel
+                        </button>
+                      )}
                     </td>
                   </tr>
                 ))}